@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the trackers and assignment modes of ObjectCounter.
+
+Simulates dense traffic (objects moving at constant speed with detection
+jitter) and reports, for each tracker and assignment mode, the association
+time per frame, the number of identity switches (a track being handed to a
+different object than the one it followed on the previous frame) and the
+number of tracks created (ideally one per object).
+
+Usage:
+    python benchmarks/bench_assignment.py [--sizes 100 500 2000] [--spacing 60] [--speed 6]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.counter import ObjectCounter  # noqa: E402
+from src.core.detections import Detections  # noqa: E402
+
+
+def simulate(n: int, frames: int, spacing: float, speed: float, jitter: float, seed: int = 0):
+    """
+    Yield (ground-truth IDs, Detections) per frame for n moving objects.
+
+    The scene area is chosen so objects are `spacing` pixels apart on average.
+    """
+    rng = np.random.default_rng(seed)
+    side = spacing * np.sqrt(n)
+    positions = rng.uniform(0, side, size=(n, 2))
+    velocities = rng.normal(0, speed, size=(n, 2))
+
+    for _ in range(frames):
+        positions += velocities
+        # Bounce off the scene borders
+        out = (positions < 0) | (positions > side)
+        velocities[out] *= -1
+        positions = np.clip(positions, 0, side)
+
+        centers = (positions + rng.normal(0, jitter, size=(n, 2))).astype(np.int32)
+        order = rng.permutation(n)
+        boxes = np.concatenate([centers - 8, centers + 8], axis=1)[order]
+        yield order, Detections.from_arrays(boxes, np.ones(n), np.zeros(n, dtype=np.int64))
+
+
+def run(tracker: str, assignment: str, args, n: int):
+    """Track a simulated scene; returns (ms per frame, identity switches, tracks created)."""
+    counter = ObjectCounter(max_distance=args.max_distance, assignment=assignment, tracker=tracker)
+    owner = {}          # track ID -> ground-truth object ID
+    switches = 0
+    elapsed = 0.0
+
+    for truth, detections in simulate(n, args.frames, args.spacing, args.speed, args.jitter):
+        start = time.perf_counter()
+        matched, unmatched = counter._associate_detections(detections)
+        elapsed += time.perf_counter() - start
+
+        for track_id, det_idx in matched:
+            if owner.get(track_id) != truth[det_idx]:
+                switches += 1
+            owner[track_id] = truth[det_idx]
+        for offset, det_idx in enumerate(unmatched):
+            owner[counter.next_track_id + offset] = truth[det_idx]
+
+        counter.update(detections)
+
+    return elapsed * 1000 / args.frames, switches, counter.next_track_id - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--spacing', type=float, default=60.0,
+                        help="Mean distance between objects in pixels")
+    parser.add_argument('--speed', type=float, default=6.0, help="Object speed spread in pixels/frame")
+    parser.add_argument('--jitter', type=float, default=3.0, help="Detection center noise in pixels")
+    parser.add_argument('--max-distance', type=int, default=40)
+    parser.add_argument('--trackers', nargs='+', default=["centroid", "kalman"])
+    args = parser.parse_args()
+
+    print(f"{'objects':>8} {'tracker':>9} {'mode':>8} {'ms/frame':>9} {'id switches':>12} {'tracks':>7}")
+    for n in args.sizes:
+        for tracker in args.trackers:
+            for assignment in ("greedy", "optimal"):
+                ms, switches, tracks = run(tracker, assignment, args, n)
+                print(f"{n:>8} {tracker:>9} {assignment:>8} {ms:>9.2f} {switches:>12} {tracks:>7}")
+
+
+if __name__ == "__main__":
+    main()
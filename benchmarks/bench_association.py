@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark of track-to-detection association in ObjectCounter.
+
+Compares the grid-indexed association against the previous nested-loop
+implementation on synthetic crowds and checks that both produce the same
+matches.
+
+Usage:
+    python benchmarks/bench_association.py [--sizes 50 200 1000 5000 10000] [--width 3840 --height 2160]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.counter import ObjectCounter  # noqa: E402
+from src.core.detections import Detections  # noqa: E402
+
+
+def legacy_associate(counter: ObjectCounter, detections: Detections):
+    """Nested-loop association as it was before vectorization (reference)."""
+    matched = []
+    track_ids = list(counter.tracked_objects.keys())
+    tracks = [counter.tracked_objects[tid] for tid in track_ids]
+    det_centers = detections.center.tolist()
+    det_classes = detections.class_id.tolist()
+    track_centers = [t.current_center for t in tracks]
+
+    distances = np.zeros((len(track_centers), len(det_centers)))
+    for i, tc in enumerate(track_centers):
+        for j, dc in enumerate(det_centers):
+            distances[i, j] = np.sqrt((tc[0] - dc[0])**2 + (tc[1] - dc[1])**2)
+
+    pairs = []
+    for i in range(len(track_centers)):
+        for j in range(len(det_centers)):
+            if distances[i, j] < counter.max_distance and tracks[i].class_id == det_classes[j]:
+                pairs.append((distances[i, j], i, j))
+    pairs.sort(key=lambda x: x[0])
+
+    used_tracks, used_detections = set(), set()
+    for _, track_idx, det_idx in pairs:
+        if track_idx not in used_tracks and det_idx not in used_detections:
+            matched.append((track_ids[track_idx], det_idx))
+            used_tracks.add(track_idx)
+            used_detections.add(det_idx)
+    unmatched = [j for j in range(len(det_centers)) if j not in used_detections]
+    return matched, unmatched
+
+
+def make_scene(n: int, seed: int = 0, width: int = 1920, height: int = 1080, num_classes: int = 3):
+    """Counter with n tracks and the next frame's (jittered, shuffled) detections."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform((0, 0), (width, height), size=(n, 2)).astype(np.int32)
+    classes = rng.integers(0, num_classes, n)
+
+    counter = ObjectCounter()
+    counter.tracks.add(np.arange(1, n + 1), classes, centers)
+    counter.next_track_id = n + 1
+
+    moved = centers + rng.normal(0, 8, size=(n, 2)).astype(np.int32)
+    order = rng.permutation(n)
+    boxes = np.concatenate([moved - 10, moved + 10], axis=1)[order]
+    detections = Detections.from_arrays(boxes, np.ones(n), classes[order])
+    return counter, detections
+
+
+def timed(fn, repeat: int) -> float:
+    """Best wall time of fn over repeat runs, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 500, 1000, 2000, 5000, 10000])
+    parser.add_argument('--legacy-max', type=int, default=1000,
+                        help="Largest size the nested-loop reference is run for")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--width', type=int, default=3840, help="Scene width in pixels")
+    parser.add_argument('--height', type=int, default=2160, help="Scene height in pixels")
+    args = parser.parse_args()
+
+    print(f"{'objects':>8} {'legacy ms':>11} {'grid ms':>14} {'speed-up':>9} {'same':>5}")
+    for n in args.sizes:
+        counter, detections = make_scene(n, width=args.width, height=args.height)
+        fast = timed(lambda: counter._associate_detections(detections), args.repeat)
+
+        if n <= args.legacy_max:
+            slow = timed(lambda: legacy_associate(counter, detections), 1)
+            same = legacy_associate(counter, detections) == counter._associate_detections(detections)
+            print(f"{n:>8} {slow:>11.1f} {fast:>14.2f} {slow / fast:>8.0f}x {str(same):>5}")
+        else:
+            print(f"{n:>8} {'-':>11} {fast:>14.2f} {'-':>9} {'-':>5}")
+
+
+if __name__ == "__main__":
+    main()
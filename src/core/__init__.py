@@ -1,18 +1,46 @@
 """
 Core modules for detection, tracking, and counting
+
+Submodules are imported lazily on first attribute access, so importing
+e.g. ObjectCounter does not pull in the detector or any ML framework.
 """
 
-from .detector import ObjectDetector, draw_detections
-from .drawing_tools import DrawingCanvas, CountingLine, CountingPolygon
-from .counter import ObjectCounter, TrackedObject
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule that defines it
+_LAZY_ATTRS = {
+    "InferenceBackend": ".backends",
+    "register_backend": ".backends",
+    "available_backends": ".backends",
+    "preload_backend": ".backends",
+    "Detections": ".detections",
+    "ObjectDetector": ".detector",
+    "draw_detections": ".detector",
+    "DrawingCanvas": ".drawing_tools",
+    "CountingLine": ".drawing_tools",
+    "CountingPolygon": ".drawing_tools",
+    "ObjectCounter": ".counter",
+    "TrackedObject": ".counter",
+}
+
+if TYPE_CHECKING:
+    from .backends import InferenceBackend, register_backend, available_backends, preload_backend
+    from .detections import Detections
+    from .detector import ObjectDetector, draw_detections
+    from .drawing_tools import DrawingCanvas, CountingLine, CountingPolygon
+    from .counter import ObjectCounter, TrackedObject
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
 
-__all__ = [
-    "ObjectDetector",
-    "draw_detections",
-    "DrawingCanvas",
-    "CountingLine",
-    "CountingPolygon",
-    "ObjectCounter",
-    "TrackedObject",
-]
 
+def __dir__():
+    return sorted(list(globals()) + __all__)
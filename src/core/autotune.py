@@ -0,0 +1,221 @@
+"""
+Hardware Auto-Tuning
+Times backend, thread count, input size and batch size on this machine
+and remembers the best setting per host and model
+"""
+
+import inspect
+import json
+import os
+import socket
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .backends import available_backends, get_backend
+from .model_cache import ModelCache
+from .resolution import rect_shape
+
+DEFAULT_TUNING_FILE = os.environ.get(
+    "YOLO_UI_TUNING_FILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "yolo_ui", "tuning.json")
+)
+
+
+@dataclass
+class TuningResult:
+    """Measured speed of one configuration."""
+    backend: str
+    threads: int        # Intra-op threads (0 = backend default)
+    input_size: int     # Long side of the network input
+    batch_size: int
+    fps: float
+    latency_ms: float   # Per-batch latency
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TuningResult':
+        return cls(**data)
+
+
+def supports_threads(backend: str) -> bool:
+    """Whether a backend accepts a num_threads option."""
+    return 'num_threads' in inspect.signature(get_backend(backend)).parameters
+
+
+def warmup(detector, frame_w: int, frame_h: int, batch_size: int = 1, runs: int = 2):
+    """Run a few inferences on blank frames so the first real frame is not slow."""
+    frames = [np.zeros((frame_h, frame_w, 3), dtype=np.uint8)] * batch_size
+    for _ in range(runs):
+        detector.detect_batch(frames)
+
+
+class AutoTuner:
+    """
+    Benchmarks a grid of configurations for a model and persists the winner.
+
+    Results are stored in a JSON file keyed by host name and weights hash,
+    so every machine keeps its own best setting for each model.
+    """
+
+    def __init__(self, path: Optional[str] = None, model_cache: Optional[ModelCache] = None):
+        """
+        Initialize the tuner.
+
+        Args:
+            path: Tuning file (default: $YOLO_UI_TUNING_FILE or ~/.cache/yolo_ui/tuning.json)
+            model_cache: Cache used to hash weights files (default: new ModelCache)
+        """
+        self.path = path or DEFAULT_TUNING_FILE
+        self.model_cache = model_cache or ModelCache()
+
+    def key(self, weights_path: str) -> str:
+        """Build the tuning key of a model on this host."""
+        if os.path.exists(weights_path):
+            model = self.model_cache.file_hash(weights_path)[:16]
+        else:
+            model = os.path.basename(weights_path)
+        return f"{socket.gethostname()}|{model}"
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, weights_path: str) -> Optional[TuningResult]:
+        """Get the stored setting of a model on this host, if any."""
+        entry = self._read().get(self.key(weights_path))
+        if not entry:
+            return None
+        try:
+            return TuningResult.from_dict(entry['best'])
+        except (KeyError, TypeError):
+            return None
+
+    def save(self, weights_path: str, best: TuningResult, target_fps: float):
+        """Persist the chosen setting of a model on this host."""
+        data = self._read()
+        data[self.key(weights_path)] = {
+            'best': best.to_dict(),
+            'target_fps': target_fps,
+            'created': time.time(),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def measure(
+        self,
+        detector,
+        frames: List[np.ndarray],
+        input_size: int,
+        batch_size: int
+    ) -> Tuple[float, float]:
+        """
+        Time a detector at one input and batch size.
+
+        Returns:
+            (frames per second, mean latency per batch in ms)
+        """
+        frame_h, frame_w = frames[0].shape[:2]
+        detector.set_input_size(rect_shape(frame_w, frame_h, input_size))
+        warmup(detector, frame_w, frame_h, batch_size, runs=1)
+
+        batches = [frames[i:i + batch_size] for i in range(0, len(frames), batch_size)]
+        start = time.perf_counter()
+        for batch in batches:
+            detector.detect_batch(batch)
+        elapsed = time.perf_counter() - start
+        return len(frames) / elapsed, elapsed * 1000 / len(batches)
+
+    def calibrate(
+        self,
+        detector,
+        frames: List[np.ndarray],
+        target_fps: float = 0.0,
+        backends: Optional[Sequence[str]] = None,
+        input_sizes: Sequence[int] = (320, 480, 640),
+        batch_sizes: Sequence[int] = (1, 4),
+        thread_counts: Optional[Sequence[int]] = None,
+        progress: Optional[Callable[[str], None]] = None
+    ) -> Tuple[Optional[TuningResult], List[TuningResult]]:
+        """
+        Benchmark the configuration grid and store the best setting.
+
+        The best setting is the largest input size that reaches target_fps,
+        using the fastest backend/threads/batch combination at that size;
+        when nothing reaches the target, the fastest configuration wins.
+
+        Args:
+            detector: Loaded ObjectDetector (its weights and classes are reused)
+            frames: Sample frames (BGR format) used for timing
+            target_fps: Required processing FPS (0 = any)
+            backends: Backends to try (default: all registered model backends)
+            input_sizes: Long sides of the input to try
+            batch_sizes: Batch sizes to try
+            thread_counts: Intra-op thread counts for backends that support them
+                (default: backend default, all cores, half the cores)
+            progress: Optional callback receiving status messages
+
+        Returns:
+            (best result or None if nothing could run, all results)
+        """
+        from .detector import ObjectDetector
+
+        if not frames:
+            raise ValueError("No frames to calibrate on")
+
+        if thread_counts is None:
+            cores = os.cpu_count() or 1
+            thread_counts = sorted({0, cores, max(1, cores // 2)})
+
+        results: List[TuningResult] = []
+        if backends is None:
+            # Stateful engines (e.g. background subtraction) are not models to compare
+            backends = [b for b in available_backends() if not get_backend(b).stateful]
+
+        for backend in backends:
+            for threads in (thread_counts if supports_threads(backend) else (0,)):
+                options = {'num_threads': threads} if threads else None
+                try:
+                    candidate = ObjectDetector(
+                        detector.weights_path, detector.classes_path, detector.confidence,
+                        device=detector.device, backend=backend,
+                        cache_dir=detector.model_cache.cache_dir, backend_options=options
+                    )
+                except Exception as e:
+                    if progress:
+                        progress(f"Skipping {backend}: {e}")
+                    break
+
+                for input_size in input_sizes:
+                    for batch_size in batch_sizes:
+                        if progress:
+                            progress(f"{backend} threads={threads or 'auto'} size={input_size} batch={batch_size}")
+                        try:
+                            fps, latency = self.measure(candidate, frames, input_size, batch_size)
+                        except Exception as e:
+                            if progress:
+                                progress(f"{backend} failed at size={input_size} batch={batch_size}: {e}")
+                            continue
+                        results.append(TuningResult(backend, threads, input_size, batch_size, fps, latency))
+
+        if not results:
+            return None, results
+
+        passing = [r for r in results if r.fps >= target_fps]
+        if passing:
+            largest = max(r.input_size for r in passing)
+            best = max((r for r in passing if r.input_size == largest), key=lambda r: r.fps)
+        else:
+            best = max(results, key=lambda r: r.fps)
+
+        self.save(detector.weights_path, best, target_fps)
+        return best, results
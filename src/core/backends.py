@@ -0,0 +1,553 @@
+"""
+Inference Backends
+Pluggable engines that run a detection model on batches of frames
+"""
+
+import ast
+import importlib
+import os
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple, Type
+import numpy as np
+import cv2
+
+from .model_cache import ModelCache
+from .ops import LetterBox, nms, xywh_to_xyxy
+
+# Raw per-frame output of a backend: (xyxy boxes, confidences, class IDs)
+RawDetections = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+_BACKENDS: Dict[str, Type['InferenceBackend']] = {}
+
+
+def register_backend(name: str) -> Callable[[Type['InferenceBackend']], Type['InferenceBackend']]:
+    """Class decorator that registers a backend under a name."""
+    def decorator(cls: Type['InferenceBackend']) -> Type['InferenceBackend']:
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def get_backend(name: str) -> Type['InferenceBackend']:
+    """Get a registered backend class by name."""
+    if name not in _BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend '{name}'. "
+            f"Available: {', '.join(available_backends())}"
+        )
+    return _BACKENDS[name]
+
+
+def available_backends() -> List[str]:
+    """Get names of all registered backends."""
+    return list(_BACKENDS.keys())
+
+
+def preload_backend(name: str):
+    """
+    Import the heavy third-party modules a backend needs.
+
+    Meant to run in a background thread at startup so that the first model
+    load does not pay the framework import cost. Missing modules are ignored
+    here; they are reported when the backend is actually used.
+    """
+    for module in get_backend(name).requires:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+class InferenceBackend:
+    """
+    Base class for inference engines used by ObjectDetector.
+
+    Subclasses load a model in __init__, expose its class names as `names`
+    and implement predict() for a batch of BGR frames.
+    """
+
+    name = "base"
+    requires: Tuple[str, ...] = ()  # Modules imported lazily when the backend loads
+    stateful = False  # True if results depend on previous frames (frames must arrive in order)
+
+    def __init__(
+        self,
+        weights_path: str,
+        device: str = "auto",
+        model_cache: Optional[ModelCache] = None
+    ):
+        self.weights_path = weights_path
+        self.device = device
+        self.model_cache = model_cache
+        self.names: Dict[int, str] = {}
+
+    def predict(
+        self,
+        frames: List[np.ndarray],
+        confidence: float,
+        target_classes: Optional[List[int]] = None,
+        imgsz: Optional[Tuple[int, int]] = None
+    ) -> List[RawDetections]:
+        """
+        Run the model on a batch of frames.
+
+        Args:
+            frames: List of frames as numpy arrays (BGR format)
+            confidence: Minimum confidence of returned boxes
+            target_classes: List of class IDs to keep (None = all classes)
+            imgsz: Network input (height, width) (None = model default)
+
+        Returns:
+            One (xyxy, confidence, class_id) tuple of arrays per frame
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget per-video state (stateful backends only)."""
+
+
+@register_backend("ultralytics")
+class UltralyticsBackend(InferenceBackend):
+    """
+    Runs models through the ultralytics YOLO wrapper (PyTorch).
+
+    .pt weights are loaded from a copy with the Conv and BatchNorm layers
+    already fused, kept in the model cache, so later loads skip fusing
+    the model before the first prediction.
+    """
+
+    requires = ("ultralytics",)
+
+    def __init__(
+        self,
+        weights_path: str,
+        device: str = "auto",
+        model_cache: Optional[ModelCache] = None
+    ):
+        super().__init__(weights_path, device, model_cache)
+        from ultralytics import YOLO
+
+        self.cache_entry: Optional[str] = None
+        if not os.path.exists(weights_path):
+            print(f"Weights file not found at {weights_path}, attempting to download...")
+        elif weights_path.lower().endswith('.pt'):
+            cache = self.model_cache or ModelCache()
+            entry = cache.get_or_create(weights_path, "fused", None, self._export_fused)
+            self.cache_entry = entry['path']
+            weights_path = os.path.join(entry['path'], entry['artifact'])
+
+        self.model = YOLO(weights_path)
+        self.names = self.model.names
+
+    def _export_fused(self, target_dir: str) -> dict:
+        """Save the .pt checkpoint with its layers fused inside target_dir."""
+        import torch
+        from ultralytics import YOLO
+
+        model = YOLO(self.weights_path)
+        model.model.fuse(verbose=False)
+        # Same checkpoint layout as ultralytics, with the fused float model
+        torch.save({**model.ckpt, 'model': model.model, 'ema': None}, os.path.join(target_dir, "fused.pt"))
+        return {
+            'artifact': "fused.pt",
+            'names': {str(k): v for k, v in model.names.items()},
+        }
+
+    def predict(
+        self,
+        frames: List[np.ndarray],
+        confidence: float,
+        target_classes: Optional[List[int]] = None,
+        imgsz: Optional[Tuple[int, int]] = None
+    ) -> List[RawDetections]:
+        options = {}
+        if imgsz:
+            options['imgsz'] = list(imgsz)
+        if self.device != "auto":
+            options['device'] = self.device
+
+        results = self.model(
+            list(frames),
+            conf=confidence,
+            classes=target_classes,
+            verbose=False,
+            **options
+        )
+
+        outputs = []
+        for result in results:
+            if result.boxes is None:
+                outputs.append(_empty_raw())
+                continue
+            outputs.append((
+                result.boxes.xyxy.cpu().numpy(),
+                result.boxes.conf.cpu().numpy(),
+                result.boxes.cls.cpu().numpy()
+            ))
+        return outputs
+
+
+class YoloGraphBackend(InferenceBackend):
+    """
+    Shared logic for engines that run an exported YOLOv8 ONNX graph.
+
+    Handles letterbox preprocessing into reusable buffers and decoding of
+    the raw (N, 4 + num_classes, anchors) output with vectorized NMS.
+    Subclasses only provide _load() and _forward().
+
+    .pt weights are exported to ONNX once (with dynamic batch and input
+    shape) and kept in the model cache, so later loads of the same weights,
+    by any of these backends, skip the export entirely. Graphs with a
+    static input shape ignore the requested imgsz.
+    """
+
+    iou_threshold = 0.45
+    max_det = 300
+    default_size = 640
+
+    def __init__(
+        self,
+        weights_path: str,
+        device: str = "auto",
+        model_cache: Optional[ModelCache] = None
+    ):
+        super().__init__(weights_path, device, model_cache)
+        self.cache_entry: Optional[str] = None
+        self.onnx_path = self._resolve_onnx(weights_path)
+        self.input_shape = (self.default_size, self.default_size)
+        self.dynamic_batch = False
+        self.dynamic_shape = False
+        self._load(self.onnx_path)
+        self.letterbox = LetterBox(*self.input_shape)
+
+    def _resolve_onnx(self, weights_path: str) -> str:
+        """Get an ONNX graph for the weights, exporting .pt files through the cache."""
+        if weights_path.lower().endswith('.onnx'):
+            if not os.path.exists(weights_path):
+                raise FileNotFoundError(f"ONNX model not found: {weights_path}")
+            return weights_path
+
+        if not os.path.exists(weights_path):
+            raise FileNotFoundError(f"Weights file not found: {weights_path}")
+
+        cache = self.model_cache or ModelCache()
+        entry = cache.get_or_create(weights_path, "onnx", self.default_size, self._export_onnx)
+        self.cache_entry = entry['path']
+        self.dynamic_shape = entry.get('dynamic', False)
+        self.names = {int(k): v for k, v in entry.get('names', {}).items()}
+        return os.path.join(entry['path'], entry['artifact'])
+
+    def _export_onnx(self, target_dir: str) -> dict:
+        """Export the .pt weights to an ONNX graph inside target_dir."""
+        from ultralytics import YOLO
+
+        model = YOLO(self.weights_path)
+        exported = model.export(format="onnx", imgsz=self.default_size, dynamic=True, verbose=False)
+        shutil.move(exported, os.path.join(target_dir, "model.onnx"))
+        return {
+            'artifact': "model.onnx",
+            'dynamic': True,
+            'names': {str(k): v for k, v in model.names.items()},
+        }
+
+    def _load(self, onnx_path: str):
+        """Load the graph and fill input_shape, dynamic_batch, dynamic_shape and names."""
+        raise NotImplementedError
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        """Run the graph on an (N, 3, H, W) blob and return its raw output."""
+        raise NotImplementedError
+
+    def _names_from_metadata(self, metadata: Dict[str, str]):
+        """Read class names written into the graph by the ultralytics exporter."""
+        if self.names or 'names' not in metadata:
+            return
+        try:
+            self.names = {int(k): v for k, v in ast.literal_eval(metadata['names']).items()}
+        except (ValueError, SyntaxError):
+            pass
+
+    def predict(
+        self,
+        frames: List[np.ndarray],
+        confidence: float,
+        target_classes: Optional[List[int]] = None,
+        imgsz: Optional[Tuple[int, int]] = None
+    ) -> List[RawDetections]:
+        if not frames:
+            return []
+
+        shape = tuple(imgsz) if imgsz and self.dynamic_shape else self.input_shape
+        self.letterbox.set_shape(*shape)
+
+        outputs = []
+        step = len(frames) if self.dynamic_batch else 1
+        for start in range(0, len(frames), step):
+            chunk = frames[start:start + step]
+            blob, transforms = self.letterbox(chunk)
+            raw = self._forward(blob)
+            for i, frame in enumerate(chunk):
+                outputs.append(self._decode(
+                    raw[i], transforms[i], frame.shape[:2], confidence, target_classes
+                ))
+        return outputs
+
+    def _decode(
+        self,
+        raw: np.ndarray,
+        transform: np.ndarray,
+        frame_shape: Tuple[int, int],
+        confidence: float,
+        target_classes: Optional[List[int]]
+    ) -> RawDetections:
+        """Turn one image's raw graph output into boxes in frame coordinates."""
+        preds = raw.T  # (anchors, 4 + num_classes)
+        scores = preds[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confs = scores[np.arange(len(scores)), class_ids]
+
+        mask = confs >= confidence
+        if target_classes is not None:
+            mask &= np.isin(class_ids, target_classes)
+        if not mask.any():
+            return _empty_raw()
+
+        boxes = xywh_to_xyxy(preds[mask, :4])
+        confs = confs[mask]
+        class_ids = class_ids[mask]
+
+        keep = nms(boxes, confs, self.iou_threshold, class_ids, self.max_det)
+        boxes, confs, class_ids = boxes[keep], confs[keep], class_ids[keep]
+
+        # Undo letterbox
+        scale, pad_x, pad_y = transform
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / scale
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / scale
+        h, w = frame_shape
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+
+        return boxes, confs, class_ids
+
+    def _fill_missing_names(self, num_classes: int):
+        """Fall back to generic names when the graph carries none."""
+        if not self.names:
+            self.names = {i: f"class_{i}" for i in range(num_classes)}
+
+
+@register_backend("onnxruntime")
+class OnnxRuntimeBackend(YoloGraphBackend):
+    """
+    Runs exported ONNX graphs with ONNX Runtime (no torch needed).
+
+    For cached graphs the ORT-optimized (fused) graph is saved next to the
+    export, so later sessions start from the pre-optimized model.
+    """
+
+    requires = ("onnxruntime",)
+
+    def __init__(
+        self,
+        weights_path: str,
+        device: str = "auto",
+        model_cache: Optional[ModelCache] = None,
+        num_threads: int = 0
+    ):
+        self.num_threads = num_threads
+        super().__init__(weights_path, device, model_cache)
+
+    def _load(self, onnx_path: str):
+        import onnxruntime as ort
+
+        providers = ['CPUExecutionProvider']
+        if self.device in ("auto", "cuda") and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+
+        if self.cache_entry:
+            optimized_path = os.path.join(self.cache_entry, "optimized.onnx")
+            if not os.path.exists(optimized_path):
+                # Apply the portable graph optimizations once and keep the result;
+                # written under a per-process name and moved into place so pool
+                # workers loading the same entry never see a partial graph
+                tmp_path = os.path.join(self.cache_entry, f"optimized.{os.getpid()}.tmp.onnx")
+                offline = ort.SessionOptions()
+                offline.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+                offline.optimized_model_filepath = tmp_path
+                try:
+                    ort.InferenceSession(onnx_path, offline, providers=['CPUExecutionProvider'])
+                    os.replace(tmp_path, optimized_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            onnx_path = optimized_path
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads > 0:
+            options.intra_op_num_threads = self.num_threads
+
+        self.session = ort.InferenceSession(onnx_path, options, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        batch, _, height, width = model_input.shape
+        self.dynamic_batch = not isinstance(batch, int)
+        self.dynamic_shape = not (isinstance(height, int) and isinstance(width, int))
+        if not self.dynamic_shape:
+            self.input_shape = (height, width)
+
+        self._names_from_metadata(self.session.get_modelmeta().custom_metadata_map)
+        output_channels = self.session.get_outputs()[0].shape[1]
+        if isinstance(output_channels, int):
+            self._fill_missing_names(output_channels - 4)
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+@register_backend("opencv")
+class OpenCVDnnBackend(YoloGraphBackend):
+    """Runs exported ONNX graphs with the OpenCV DNN module."""
+
+    def _load(self, onnx_path: str):
+        self.net = cv2.dnn.readNetFromONNX(onnx_path)
+        if self.device == "cuda":
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+        else:
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+        metadata = _read_onnx_metadata(onnx_path)
+        self._names_from_metadata(metadata)
+        if 'imgsz' in metadata:
+            height, width = ast.literal_eval(metadata['imgsz'])
+            self.input_shape = (int(height), int(width))
+
+        self.dynamic_batch = self.dynamic_shape
+
+        # Warm-up pass, also reveals the number of classes
+        blob = np.zeros((1, 3, *self.input_shape), dtype=np.float32)
+        self._fill_missing_names(self._forward(blob).shape[1] - 4)
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        self.net.setInput(blob)
+        return self.net.forward()
+
+
+@register_backend("blobs")
+class BlobBackend(InferenceBackend):
+    """
+    Model-free detector for fixed cameras: MOG2 background subtraction,
+    morphology and connected components.
+
+    Every foreground blob within the size limits becomes a box of a single
+    class with confidence 1.0. The weights file is not used; the class name
+    comes from the classes file if one is given.
+    """
+
+    stateful = True
+
+    def __init__(
+        self,
+        weights_path: str,
+        device: str = "auto",
+        model_cache: Optional[ModelCache] = None,
+        min_area: int = 400,
+        max_area: int = 0,
+        history: int = 500,
+        var_threshold: float = 16.0,
+        scale: float = 0.5,
+        class_name: str = "object"
+    ):
+        """
+        Initialize the blob detector.
+
+        Args:
+            min_area: Smallest blob area in frame pixels
+            max_area: Largest blob area in frame pixels (0 = no limit)
+            history: Frames the background model remembers
+            var_threshold: MOG2 variance threshold (higher = less sensitive)
+            scale: Processing scale when no input size is set
+            class_name: Label of every blob
+        """
+        super().__init__(weights_path, device, model_cache)
+        self.min_area = min_area
+        self.max_area = max_area
+        self.history = history
+        self.var_threshold = var_threshold
+        self.scale = scale
+        self.names = {0: class_name}
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self.reset()
+
+    def reset(self):
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=self.history, varThreshold=self.var_threshold, detectShadows=True
+        )
+
+    def predict(
+        self,
+        frames: List[np.ndarray],
+        confidence: float,
+        target_classes: Optional[List[int]] = None,
+        imgsz: Optional[Tuple[int, int]] = None
+    ) -> List[RawDetections]:
+        outputs = []
+        for frame in frames:
+            frame_h, frame_w = frame.shape[:2]
+            if imgsz:
+                small = cv2.resize(frame, (imgsz[1], imgsz[0]), interpolation=cv2.INTER_AREA)
+            else:
+                small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            sx, sy = frame_w / small.shape[1], frame_h / small.shape[0]
+
+            # Foreground without shadows (MOG2 marks shadows as 127)
+            mask = self.subtractor.apply(small)
+            _, mask = cv2.threshold(mask, 200, 255, cv2.THRESH_BINARY)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel, iterations=2)
+
+            if target_classes is not None and 0 not in target_classes:
+                outputs.append(_empty_raw())
+                continue
+
+            _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+            stats = stats[1:]  # Label 0 is the background
+            area = stats[:, cv2.CC_STAT_AREA] * (sx * sy)
+            keep = area >= self.min_area
+            if self.max_area > 0:
+                keep &= area <= self.max_area
+            stats = stats[keep]
+
+            boxes = np.empty((len(stats), 4), dtype=np.float32)
+            boxes[:, 0] = stats[:, cv2.CC_STAT_LEFT] * sx
+            boxes[:, 1] = stats[:, cv2.CC_STAT_TOP] * sy
+            boxes[:, 2] = (stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH]) * sx
+            boxes[:, 3] = (stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT]) * sy
+            outputs.append((
+                boxes,
+                np.ones(len(stats), dtype=np.float32),
+                np.zeros(len(stats), dtype=np.int32)
+            ))
+        return outputs
+
+
+def _read_onnx_metadata(onnx_path: str) -> Dict[str, str]:
+    """Read custom metadata of an ONNX graph if an ONNX reader is installed."""
+    try:
+        import onnx
+    except ImportError:
+        return {}
+    model = onnx.load(onnx_path, load_external_data=False)
+    return {prop.key: prop.value for prop in model.metadata_props}
+
+
+def _empty_raw() -> RawDetections:
+    """Raw output of a frame without detections."""
+    return (
+        np.zeros((0, 4), dtype=np.float32),
+        np.zeros(0, dtype=np.float32),
+        np.zeros(0, dtype=np.int32)
+    )
@@ -0,0 +1,147 @@
+"""
+Two-Stage Cascade Detection
+A small model runs on every frame; a large model re-scores only the boxes that matter
+"""
+
+from typing import List, Optional, Tuple
+import numpy as np
+
+from .detections import Detections
+from .ops import box_iou, nms, point_segment_distance
+
+
+class CascadeDetector:
+    """
+    Combines a fast and an accurate detector with the detect_batch() contract
+    of ObjectDetector.
+
+    The small model runs on every frame at a low confidence. Boxes it is
+    unsure about (confidence between `low` and `high`) and boxes close to a
+    counting line or zone edge are cropped with some context and re-scored
+    by the large model in one batch; the large model's matching box replaces
+    the small one, or the box is dropped if the large model finds nothing.
+    Both models must use the same class IDs.
+    """
+
+    def __init__(
+        self,
+        small,
+        large,
+        low: float = 0.2,
+        high: float = 0.6,
+        near_distance: float = 40.0,
+        context: float = 0.5,
+        crop_size: int = 320,
+        match_iou: float = 0.3
+    ):
+        """
+        Initialize the cascade.
+
+        Args:
+            small: Fast detector run on every frame (ObjectDetector or DetectorPool)
+            large: Accurate ObjectDetector used on crops
+            low: Confidence at which small-model boxes become candidates
+            high: Confidence from which small-model boxes are trusted as is
+            near_distance: Distance in pixels from a box center to a line or
+                zone edge below which the box is always re-scored
+            context: Fraction of the box size added around a crop on each side
+            crop_size: Network input side of the large model
+            match_iou: Minimum IoU between a small box and the large model's box
+        """
+        self.small = small
+        self.large = large
+        self.low = low
+        self.high = high
+        self.near_distance = near_distance
+        self.context = context
+        self.match_iou = match_iou
+        self.large.set_input_size((crop_size, crop_size))
+
+        self.segments = np.zeros((0, 4), dtype=np.float32)
+
+        # Statistics
+        self.candidates = 0
+        self.refined = 0
+
+    def set_geometry(self, segments: Optional[np.ndarray]):
+        """Set the counting line and zone edge segments as an (S, 4) array."""
+        self.segments = np.zeros((0, 4), dtype=np.float32) if segments is None else segments
+
+    def _needs_refinement(self, detections: Detections) -> np.ndarray:
+        """Mask of detections to send to the large model."""
+        mask = detections.conf < self.high
+        if len(self.segments) and len(detections):
+            distances = point_segment_distance(detections.center, self.segments)
+            mask |= distances.min(axis=1) <= self.near_distance
+        return mask
+
+    def _crop_box(self, box: np.ndarray, frame_w: int, frame_h: int) -> Tuple[int, int, int, int]:
+        """Square crop around a box with context, clamped to the frame."""
+        cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        side = max(box[2] - box[0], box[3] - box[1]) * (1 + 2 * self.context)
+        side = max(side, 32.0)
+        x1 = int(max(0, cx - side / 2))
+        y1 = int(max(0, cy - side / 2))
+        x2 = int(min(frame_w, cx + side / 2))
+        y2 = int(min(frame_h, cy + side / 2))
+        return x1, y1, max(x2, x1 + 1), max(y2, y1 + 1)
+
+    def detect_batch(
+        self,
+        frames: List[np.ndarray],
+        target_classes: Optional[List[int]] = None,
+        confidence: Optional[float] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None
+    ) -> List[Detections]:
+        """
+        Run the cascade on several frames.
+
+        Arguments and results match ObjectDetector.detect_batch().
+        """
+        if not frames:
+            return []
+        if confidence is None:
+            confidence = self.small.confidence
+
+        stage1 = self.small.detect_batch(frames, target_classes, min(self.low, confidence), roi)
+
+        # Collect crops of all frames for a single large-model batch
+        crops, owners = [], []
+        kept = []
+        for i, (frame, detections) in enumerate(zip(frames, stage1)):
+            refine = self._needs_refinement(detections)
+            kept.append(detections[~refine].filter(confidence))
+            frame_h, frame_w = frame.shape[:2]
+            for index in np.flatnonzero(refine):
+                x1, y1, x2, y2 = self._crop_box(detections.xyxy[index], frame_w, frame_h)
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append((i, index, x1, y1))
+        self.candidates += len(crops)
+
+        refined = [[] for _ in frames]
+        if crops:
+            stage2 = self.large.detect_batch(crops, target_classes, confidence)
+            for (i, index, x1, y1), found in zip(owners, stage2):
+                if len(found) == 0:
+                    continue
+                boxes = found.xyxy + np.array([x1, y1, x1, y1], dtype=np.float32)
+                original = stage1[i].xyxy[index:index + 1]
+                ious = box_iou(original, boxes)[0]
+                best = int(np.argmax(ious))
+                if ious[best] >= self.match_iou:
+                    refined[i].append((boxes[best], found.conf[best], found.class_id[best]))
+                    self.refined += 1
+
+        results = []
+        for i, detections in enumerate(kept):
+            if refined[i]:
+                boxes, confs, class_ids = zip(*refined[i])
+                extra = Detections.from_arrays(
+                    np.stack(boxes), np.array(confs), np.array(class_ids), detections.class_names
+                )
+                detections = Detections.concatenate([detections, extra], detections.class_names)
+                # Crops of neighbouring boxes can find the same object twice
+                keep = nms(detections.xyxy, detections.conf, 0.6, detections.class_id, len(detections))
+                detections = detections[np.sort(keep)]
+            results.append(detections)
+        return results
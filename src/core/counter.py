@@ -3,89 +3,142 @@ Object Counting Logic
 Handles line crossing detection and zone counting
 """
 
-from typing import List, Dict, Optional, Tuple, Set
-from collections import defaultdict
-from dataclasses import dataclass
+from typing import List, Dict, Mapping, Optional, Tuple, Union
 import numpy as np
 
+from .detections import Detections
 from .drawing_tools import CountingLine, CountingPolygon
-
-
-@dataclass
-class TrackedObject:
-    """Represents a tracked object with history."""
-    track_id: int
-    class_id: int
-    class_name: str
-    current_center: Tuple[int, int]
-    previous_center: Optional[Tuple[int, int]] = None
-    bbox: Optional[List[int]] = None
-    confidence: float = 0.0
-
-    # Crossing state for each line
-    line_sides: Dict[str, int] = None
-    crossed_lines: Set[str] = None
-
-    # Zone state
-    in_zones: Set[str] = None
-
-    def __post_init__(self):
-        if self.line_sides is None:
-            self.line_sides = {}
-        if self.crossed_lines is None:
-            self.crossed_lines = set()
-        if self.in_zones is None:
-            self.in_zones = set()
-
-    def update_position(self, new_center: Tuple[int, int], bbox: List[int], confidence: float):
-        """Update object position."""
-        self.previous_center = self.current_center
-        self.current_center = new_center
-        self.bbox = bbox
-        self.confidence = confidence
+from .counts import CountTable
+from .ops import (
+    greedy_match_pairs, line_sides, optimal_match_pairs, paired_iou, points_in_polygon, segment_crossings
+)
+from .kalman import KalmanTracks
+from .spatial_grid import SpatialGrid
+from .tracks import TrackTable, TrackViews, TrackedObject, pack_bits, unpack_bits
 
 
 class ObjectCounter:
     """
     Counts objects crossing lines and entering/exiting zones.
-    Uses simple centroid tracking for object persistence.
+    Uses centroid tracking for object persistence, optionally with a
+    constant-velocity Kalman filter predicting where each track will be
+    and ByteTrack-style matching that also uses low-confidence boxes.
+
+    Tracks are rows of a TrackTable, so matching, line crossing, zone
+    occupancy and pruning run over all tracks at once, and counts are
+    CountTable arrays updated with all of a frame's events at once.
     """
 
-    def __init__(self, max_distance: int = 100, max_frames_missing: int = 30):
+    def __init__(
+        self,
+        max_distance: int = 100,
+        max_frames_missing: int = 30,
+        assignment: str = "greedy",
+        tracker: str = "centroid",
+        high_confidence: float = 0.5,
+        low_confidence: float = 0.1
+    ):
         """
         Initialize counter.
 
         Args:
             max_distance: Maximum distance to associate detection with existing track
             max_frames_missing: Number of frames before removing missing track
+            assignment: 'greedy' (nearest pairs first) or 'optimal' (minimum
+                total squared distance per cluster of nearby objects)
+            tracker: 'centroid' (match against last positions), 'kalman'
+                (match against constant-velocity predictions) or 'bytetrack'
+                (Kalman predictions, two-stage IoU matching with high- and
+                low-confidence boxes); a change takes effect on the next reset
+            high_confidence: With 'bytetrack', boxes from this confidence are
+                matched first and may start tracks
+            low_confidence: With 'bytetrack', lowest confidence the detector
+                should report; boxes below high_confidence only extend tracks
         """
+        if assignment not in ("greedy", "optimal"):
+            raise ValueError(f"Unknown assignment '{assignment}'")
+        if tracker not in ("centroid", "kalman", "bytetrack"):
+            raise ValueError(f"Unknown tracker '{tracker}'")
+
         self.max_distance = max_distance
         self.max_frames_missing = max_frames_missing
+        self.assignment = assignment
+        self.tracker = tracker
+        self.high_confidence = high_confidence
+        self.low_confidence = low_confidence
+        self.high_iou = 0.2     # Minimum IoU with high-confidence boxes
+        self.low_iou = 0.5      # Minimum IoU with low-confidence boxes
 
         # Tracked objects
-        self.tracked_objects: Dict[int, TrackedObject] = {}
+        self.tracks = TrackTable()
         self.next_track_id = 1
-        self.frames_missing: Dict[int, int] = {}
+        self.grid = SpatialGrid(max_distance)
+        self.kalman: Optional[KalmanTracks] = KalmanTracks() if tracker != "centroid" else None
 
         # Counting lines and zones
         self.lines: List[CountingLine] = []
         self.polygons: List[CountingPolygon] = []
 
-        # Counts
-        self.line_counts: Dict[str, Dict[str, int]] = defaultdict(
-            lambda: {'in': 0, 'out': 0, 'total': 0}
-        )
-        self.zone_counts: Dict[str, Dict[str, int]] = defaultdict(
-            lambda: {'count': 0, 'entered': 0, 'exited': 0}
-        )
+        # Counts per line/zone, class and direction
+        self.line_events = CountTable(('in', 'out'))
+        self.zone_events = CountTable(('entered', 'exited'))
+
+    @property
+    def tracked_objects(self) -> Mapping[int, TrackedObject]:
+        """Read-only mapping of track_id -> TrackedObject view."""
+        return TrackViews(self.tracks)
+
+    @property
+    def frames_missing(self) -> Dict[int, int]:
+        """Frames since each track was last detected."""
+        return dict(zip(self.tracks.ids.tolist(), self.tracks.missing.tolist()))
+
+    @property
+    def line_counts(self) -> Dict[str, Dict[str, int]]:
+        """In/out/total crossings per line ID."""
+        counts = {
+            line_id: {'in': n_in, 'out': n_out, 'total': n_in + n_out}
+            for line_id, (n_in, n_out) in zip(self.line_events.ids, self.line_events.totals().tolist())
+        }
+        for line in self.lines:
+            counts.setdefault(line.id, {'in': 0, 'out': 0, 'total': 0})
+        return counts
 
-        # Class-specific counts
-        self.line_class_counts: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(
-            lambda: defaultdict(lambda: {'in': 0, 'out': 0})
-        )
-        self.zone_class_counts: Dict[str, Dict[str, int]] = defaultdict(
-            lambda: defaultdict(int)
-        )
+    @property
+    def zone_counts(self) -> Dict[str, Dict[str, int]]:
+        """Current occupancy and entries/exits per zone ID."""
+        events = self.zone_events
+        counts = {
+            zone_id: {'count': count, 'entered': entered, 'exited': exited}
+            for zone_id, count, (entered, exited) in zip(events.ids, events.current.tolist(), events.totals().tolist())
+        }
+        for poly in self.polygons:
+            counts.setdefault(poly.id, {'count': 0, 'entered': 0, 'exited': 0})
+        return counts
+
+    @property
+    def line_class_counts(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """In/out crossings per line ID and class name (classes with crossings only)."""
+        events = self.line_events
+        breakdown = {line_id: {} for line_id in events.ids}
+        for row, class_id in zip(*np.nonzero(events.counts.any(axis=2))):
+            n_in, n_out = events.counts[row, class_id].tolist()
+            counts = breakdown[events.ids[row]].setdefault(self.tracks.class_name(class_id), {'in': 0, 'out': 0})
+            counts['in'] += n_in
+            counts['out'] += n_out
+        return breakdown
+
+    @property
+    def zone_class_counts(self) -> Dict[str, Dict[str, int]]:
+        """Entries minus exits per zone ID and class name (classes with events only)."""
+        events = self.zone_events
+        breakdown = {zone_id: {} for zone_id in events.ids}
+        for row, class_id in zip(*np.nonzero(events.counts.any(axis=2))):
+            entered, exited = events.counts[row, class_id].tolist()
+            counts = breakdown[events.ids[row]]
+            class_name = self.tracks.class_name(class_id)
+            counts[class_name] = counts.get(class_name, 0) + entered - exited
+        return breakdown
 
     def set_lines(self, lines: List[CountingLine]):
         """Set counting lines."""
@@ -97,20 +150,16 @@ class ObjectCounter:
 
     def reset_counts(self):
         """Reset all counts."""
-        self.line_counts.clear()
-        self.zone_counts.clear()
-        self.line_class_counts.clear()
-        self.zone_class_counts.clear()
-
-        for line in self.lines:
-            self.line_counts[line.id] = {'in': 0, 'out': 0, 'total': 0}
-        for poly in self.polygons:
-            self.zone_counts[poly.id] = {'count': 0, 'entered': 0, 'exited': 0}
+        self.line_events.clear()
+        self.zone_events.clear()
+        self.line_events.rows([line.id for line in self.lines])
+        self.zone_events.rows([poly.id for poly in self.polygons])
 
     def reset_tracking(self):
         """Reset all tracking state."""
-        self.tracked_objects.clear()
-        self.frames_missing.clear()
+        self.tracks.clear()
+        self.grid.clear()
+        self.kalman = KalmanTracks() if self.tracker != "centroid" else None
         self.next_track_id = 1
         self.reset_counts()
     
@@ -121,192 +170,317 @@ class ObjectCounter:
     def get_counts(self) -> Dict[str, int]:
         """Get simple count summary for display."""
         counts = {}
+        line_counts, zone_counts = self.line_counts, self.zone_counts
         
         # Line counts
         for line in self.lines:
-            lc = self.line_counts.get(line.id, {})
+            lc = line_counts.get(line.id, {})
             counts[f"{line.name}"] = lc.get('total', 0)
         
         # Zone counts
         for poly in self.polygons:
-            zc = self.zone_counts.get(poly.id, {})
+            zc = zone_counts.get(poly.id, {})
             counts[f"{poly.name}"] = zc.get('count', 0)
         
         return counts
 
-    def update(self, detections: List[dict], lines: List = None, polygons: List = None) -> Dict[int, TrackedObject]:
+    def update(
+        self,
+        detections: Union[Detections, List[dict]],
+        lines: List = None,
+        polygons: List = None,
+        zone_mask: Optional[np.ndarray] = None
+    ) -> Mapping[int, TrackedObject]:
         """
         Update tracking with new detections.
 
         Args:
-            detections: List of detection dicts
+            detections: Detections for the frame (a legacy list of dicts is also accepted)
             lines: Optional list of counting lines
             polygons: Optional list of counting polygons
+            zone_mask: Optional rasterized bitmask of the polygons, as returned
+                by DrawingCanvas.get_zone_mask(), used instead of testing
+                every track against every polygon
 
         Returns:
-            Dictionary of track_id -> TrackedObject
+            Mapping of track_id -> TrackedObject
         """
         # Update lines and polygons if provided
         if lines is not None:
             self.lines = lines
         if polygons is not None:
             self.polygons = polygons
-        
-        matched_tracks, unmatched_detections = self._associate_detections(detections)
 
-        # Update matched tracks
-        for track_id, det in matched_tracks:
-            track = self.tracked_objects[track_id]
-            track.update_position(det['center'], det['bbox'], det['confidence'])
-            self.frames_missing[track_id] = 0
+        if not isinstance(detections, Detections):
+            detections = Detections.from_dicts(detections)
 
-        # Create new tracks for unmatched detections
-        for det in unmatched_detections:
-            track = TrackedObject(
-                track_id=self.next_track_id,
-                class_id=det['class_id'],
-                class_name=det['class_name'],
-                current_center=det['center'],
-                bbox=det['bbox'],
-                confidence=det['confidence']
-            )
-            self.tracked_objects[self.next_track_id] = track
-            self.frames_missing[self.next_track_id] = 0
-            self.next_track_id += 1
+        tracks = self.tracks
+        tracks.set_layout([line.id for line in self.lines], [poly.id for poly in self.polygons])
+        tracks.class_names.update(detections.class_names)
+
+        rows, det_idx, new_idx = self._match(detections)
+        boxes = detections.xyxy.astype(np.int32)
 
-        # Increment missing frames for unmatched tracks
-        matched_ids = {t[0] for t in matched_tracks}
-        for track_id in list(self.tracked_objects.keys()):
-            if track_id not in matched_ids:
-                self.frames_missing[track_id] = self.frames_missing.get(track_id, 0) + 1
+        # Update matched tracks
+        tracks.move(rows, detections.center[det_idx], boxes[det_idx], detections.conf[det_idx])
+        matched_ids = tracks.ids[rows]
+        if self.kalman is not None:
+            self.kalman.update(matched_ids, detections.center[det_idx])
+        else:
+            for track_id, center, class_id in zip(
+                matched_ids.tolist(), detections.center[det_idx].tolist(), tracks.class_id[rows].tolist()
+            ):
+                self.grid.move(track_id, center, class_id)
 
-                if self.frames_missing[track_id] > self.max_frames_missing:
-                    del self.tracked_objects[track_id]
-                    del self.frames_missing[track_id]
+        # Create new tracks for unmatched detections
+        new_ids = np.arange(self.next_track_id, self.next_track_id + len(new_idx), dtype=np.int64)
+        new_centers = detections.center[new_idx]
+        new_classes = detections.class_id[new_idx]
+        tracks.add(new_ids, new_classes, new_centers, boxes[new_idx], detections.conf[new_idx])
+        if self.kalman is not None:
+            self.kalman.add(new_ids, new_centers)
+        for track_id, center, class_id in zip(new_ids.tolist(), new_centers.tolist(), new_classes.tolist()):
+            self.grid.add(track_id, center, class_id)
+        self.next_track_id += len(new_idx)
+
+        # Count missed frames (tracks created this frame included) and drop
+        # expired tracks in one step
+        matched = np.zeros(len(tracks), dtype=bool)
+        matched[rows] = True
+        tracks.missing[matched] = 0
+        tracks.missing[~matched] += 1
+        removed = tracks.prune(self.max_frames_missing)
+        for track_id in removed.tolist():
+            self.grid.remove(track_id)
+
+        if self.kalman is not None:
+            # Tracks are matched against where they will be on the next frame
+            self.kalman.remove(removed)
+            self.kalman.predict()
+            for track_id, center, class_id in zip(
+                tracks.ids.tolist(), self._track_positions().tolist(), tracks.class_id.tolist()
+            ):
+                self.grid.move(track_id, center, class_id)
 
         self._check_line_crossings()
-        self._check_zone_occupancy()
+        self._check_zone_occupancy(zone_mask)
 
         return self.tracked_objects
 
-    def _associate_detections(self, detections: List[dict]) -> Tuple[List, List]:
-        """Associate detections with existing tracks."""
-        matched = []
-        unmatched = list(detections)
-
-        if not self.tracked_objects:
-            return matched, unmatched
-
-        track_ids = list(self.tracked_objects.keys())
-        tracks = [self.tracked_objects[tid] for tid in track_ids]
-
-        det_centers = [d['center'] for d in detections]
-        track_centers = [t.current_center for t in tracks]
-
-        if not det_centers or not track_centers:
-            return matched, unmatched
-
-        distances = np.zeros((len(track_centers), len(det_centers)))
-        for i, tc in enumerate(track_centers):
-            for j, dc in enumerate(det_centers):
-                distances[i, j] = np.sqrt((tc[0] - dc[0])**2 + (tc[1] - dc[1])**2)
-
-        used_detections = set()
-        used_tracks = set()
+    def _associate_detections(self, detections: Detections) -> Tuple[List, List]:
+        """
+        Associate detections with existing tracks.
 
-        pairs = []
-        for i in range(len(track_centers)):
-            for j in range(len(det_centers)):
-                if distances[i, j] < self.max_distance:
-                    if tracks[i].class_id == detections[j]['class_id']:
-                        pairs.append((distances[i, j], i, j))
+        Returns:
+            Tuple of (list of (track_id, detection index), list of unmatched
+            detection indices that start new tracks)
+        """
+        rows, det_idx, new_idx = self._match(detections)
+        matched = list(zip(self.tracks.ids[rows].tolist(), det_idx.tolist()))
+        return matched, new_idx.tolist()
 
-        pairs.sort(key=lambda x: x[0])
+    def _match(self, detections: Detections) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Match detections to track rows.
 
-        for dist, track_idx, det_idx in pairs:
-            if track_idx not in used_tracks and det_idx not in used_detections:
-                matched.append((track_ids[track_idx], detections[det_idx]))
-                used_tracks.add(track_idx)
-                used_detections.add(det_idx)
+        Returns:
+            (track rows, detection indices) of matched pairs in matching order,
+            and the indices of unmatched detections that start new tracks
+        """
+        # Low-confidence boxes only extend existing tracks
+        if self.tracker == "bytetrack":
+            can_start = detections.conf >= self.high_confidence
+        else:
+            can_start = np.ones(len(detections), dtype=bool)
+
+        empty = np.zeros(0, dtype=np.int64)
+        if len(self.tracks) == 0 or len(detections) == 0:
+            return empty, empty, np.flatnonzero(can_start)
+
+        grid = self._grid()
+        positions = self._track_positions()
+
+        # Same-class tracks in the grid cells around each detection, gated by
+        # squared distance in integer pixels (exact, same order as distances)
+        candidate_ids, cols = grid.candidates(detections.center, detections.class_id)
+        rows = self.tracks.rows(candidate_ids)
+
+        dx = positions[rows, 0] - detections.center[cols, 0]
+        dy = positions[rows, 1] - detections.center[cols, 1]
+        sq_distances = dx * dx + dy * dy
+        valid = sq_distances < self.max_distance ** 2
+        rows, cols, sq_distances = rows[valid], cols[valid], sq_distances[valid]
+
+        match = optimal_match_pairs if self.assignment == "optimal" else greedy_match_pairs
+        if self.tracker == "bytetrack":
+            track_idx, det_idx = self._associate_two_stage(rows, cols, positions, detections, match)
+        else:
+            track_idx, det_idx = match(rows, cols, sq_distances, len(self.tracks), len(detections))
+
+        used = np.zeros(len(detections), dtype=bool)
+        used[det_idx] = True
+        return track_idx, det_idx, np.flatnonzero(can_start & ~used)
+
+    def _associate_two_stage(self, rows, cols, positions, detections, match):
+        """
+        ByteTrack-style association of candidate (track row, detection) pairs.
 
-        unmatched = [d for i, d in enumerate(detections) if i not in used_detections]
+        Tracks are first matched to high-confidence boxes on IoU with their
+        predicted boxes; tracks left over are then matched to low-confidence
+        boxes with a stricter IoU.
 
-        return matched, unmatched
+        Returns:
+            (track rows, detection indices) of matched pairs
+        """
+        tracks = self.tracks
+
+        # Last box of each track (a point box if it has none) moved to its predicted center
+        boxes = np.where(tracks.has_bbox[:, None], tracks.bbox, np.tile(tracks.center, 2)).astype(np.float32)
+        boxes += np.tile(positions - tracks.center, 2)
+
+        iou = paired_iou(boxes[rows], detections.xyxy[cols])
+        high = detections.conf[cols] >= self.high_confidence
+        n_tracks, n_dets = len(tracks), len(detections)
+
+        first = high & (iou > self.high_iou)
+        track_first, det_first = match(rows[first], cols[first], 1.0 - iou[first], n_tracks, n_dets)
+
+        taken = np.zeros(n_tracks, dtype=bool)
+        taken[track_first] = True
+        second = ~high & (iou > self.low_iou) & ~taken[rows]
+        track_second, det_second = match(rows[second], cols[second], 1.0 - iou[second], n_tracks, n_dets)
+
+        return np.concatenate([track_first, track_second]), np.concatenate([det_first, det_second])
+
+    def _track_positions(self) -> np.ndarray:
+        """Positions tracks are matched against, as an (N, 2) int32 array in row order."""
+        if self.kalman is not None:
+            return np.rint(self.kalman.positions()).astype(np.int32)
+        return self.tracks.center
+
+    def _grid(self) -> SpatialGrid:
+        """The track grid, rebuilt if max_distance or the tracks changed outside update()."""
+        tracks = self.tracks
+        if self.kalman is not None and len(self.kalman) != len(tracks):
+            # Restart the filters from the current positions
+            self.kalman.clear()
+            self.kalman.add(tracks.ids, tracks.center)
+            self.grid.clear()
+
+        if self.grid.cell_size != max(1.0, float(self.max_distance)) or len(self.grid) != len(tracks):
+            self.grid = SpatialGrid(self.max_distance)
+            for track_id, center, class_id in zip(
+                tracks.ids.tolist(), self._track_positions().tolist(), tracks.class_id.tolist()
+            ):
+                self.grid.add(track_id, center, class_id)
+        return self.grid
 
     def _check_line_crossings(self):
-        """Check if any tracked objects crossed counting lines."""
-        for track in self.tracked_objects.values():
-            if track.previous_center is None:
-                continue
-
-            for line in self.lines:
-                if line.id in track.crossed_lines:
-                    continue
-
-                prev_side = track.line_sides.get(line.id)
-                current_side = line.point_side(track.current_center)
-
-                track.line_sides[line.id] = current_side
-
-                if prev_side is not None and prev_side != 0 and current_side != 0:
-                    if prev_side != current_side:
-                        direction = 'in' if current_side > 0 else 'out'
-
-                        self.line_counts[line.id][direction] += 1
-                        self.line_counts[line.id]['total'] += 1
-                        self.line_class_counts[line.id][track.class_name][direction] += 1
-
-                        track.crossed_lines.add(line.id)
+        """Count tracks whose motion this frame crossed a counting line segment."""
+        tracks = self.tracks
+        if not self.lines or len(tracks) == 0:
+            return
+
+        n = len(self.lines)
+        segments = np.array([(*line.start, *line.end) for line in self.lines], dtype=np.float64)
+        was_positive = unpack_bits(tracks.side_pos, n)
+        was_negative = unpack_bits(tracks.side_neg, n)
+
+        # Only tracks detected this frame moved (new tracks have no motion yet)
+        moved = np.flatnonzero(tracks.has_prev & (tracks.missing == 0))
+        start_sides = line_sides(tracks.prev_center[moved], segments)
+        end_sides = line_sides(tracks.center[moved], segments)
+
+        # A start exactly on a line counts from the side the track came from
+        came_from = was_positive[moved].astype(np.int8) - was_negative[moved]
+        start_sides = np.where(start_sides == 0, came_from, start_sides)
+        idx, j, direction = segment_crossings(
+            tracks.prev_center[moved], tracks.center[moved], segments, start_sides, end_sides
+        )
 
-    def _check_zone_occupancy(self):
+        # Remember the last side off each line (the start's when landing on it);
+        # each line is counted once per track
+        last_sides = np.where(end_sides != 0, end_sides, start_sides)
+        was_positive[moved] = last_sides > 0
+        was_negative[moved] = last_sides < 0
+        tracks.side_pos = pack_bits(was_positive)
+        tracks.side_neg = pack_bits(was_negative)
+
+        crossed = unpack_bits(tracks.crossed, n)
+        rows = moved[idx]
+        first = ~crossed[rows, j]
+        rows, j, direction = rows[first], j[first], direction[first]
+        crossed[rows, j] = True
+        tracks.crossed = pack_bits(crossed)
+
+        # Direction 0 ('in') when the track ends up on the positive side
+        line_rows = self.line_events.rows(tracks.line_ids)
+        self.line_events.add(line_rows[j], tracks.class_id[rows], np.where(direction > 0, 0, 1))
+
+    def _check_zone_occupancy(self, zone_mask: Optional[np.ndarray] = None):
         """Check zone occupancy for all tracked objects."""
-        for poly in self.polygons:
-            current_in_zone = set()
-
-            for track in self.tracked_objects.values():
-                if poly.contains_point(track.current_center):
-                    current_in_zone.add(track.track_id)
-
-                    if poly.id not in track.in_zones:
-                        track.in_zones.add(poly.id)
-                        self.zone_counts[poly.id]['entered'] += 1
-                        self.zone_class_counts[poly.id][track.class_name] += 1
-                else:
-                    if poly.id in track.in_zones:
-                        track.in_zones.remove(poly.id)
-                        self.zone_counts[poly.id]['exited'] += 1
-                        self.zone_class_counts[poly.id][track.class_name] -= 1
-
-            self.zone_counts[poly.id]['count'] = len(current_in_zone)
+        tracks = self.tracks
+        if not self.polygons:
+            return
+
+        n = len(self.polygons)
+        inside = np.zeros((len(tracks), n), dtype=bool)
+        off_mask = np.arange(len(tracks))
+        if zone_mask is not None:
+            if zone_mask.shape[2] != -(-n // 64):
+                raise ValueError(f"Zone mask has {zone_mask.shape[2]} words for {n} zones")
+
+            # One lookup per track for all zones; tracks outside the frame are tested below
+            height, width = zone_mask.shape[:2]
+            x, y = tracks.center[:, 0], tracks.center[:, 1]
+            on_mask = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            inside[on_mask] = unpack_bits(zone_mask[y[on_mask], x[on_mask]], n)
+            off_mask = np.flatnonzero(~on_mask)
+
+        if len(off_mask):
+            for j, poly in enumerate(self.polygons):
+                inside[off_mask, j] = points_in_polygon(
+                    tracks.center[off_mask], np.array(poly.points).reshape(-1, 2)
+                )
+
+        was_inside = unpack_bits(tracks.in_zone, n)
+        entered = inside & ~was_inside
+        exited = was_inside & ~inside
+        tracks.in_zone = pack_bits(inside)
+
+        rows, j = np.nonzero(entered | exited)
+        zone_rows = self.zone_events.rows(tracks.zone_ids)
+        self.zone_events.add(zone_rows[j], tracks.class_id[rows], np.where(entered[rows, j], 0, 1))
+        self.zone_events.current[zone_rows] = inside.sum(axis=0)
 
     def get_line_counts(self) -> Dict[str, Dict[str, int]]:
         """Get counts for all lines."""
-        return dict(self.line_counts)
+        return self.line_counts
 
     def get_zone_counts(self) -> Dict[str, Dict[str, int]]:
         """Get counts for all zones."""
-        return dict(self.zone_counts)
+        return self.zone_counts
 
     def get_all_counts(self) -> Dict[str, dict]:
         """Get all counts combined."""
-        counts = {}
-        counts.update(self.line_counts)
+        counts = self.line_counts
         counts.update(self.zone_counts)
         return counts
 
     def get_count_summary(self) -> str:
         """Get a formatted summary of all counts."""
         lines_summary = []
+        line_counts, zone_counts = self.line_counts, self.zone_counts
 
         for line in self.lines:
-            counts = self.line_counts.get(line.id, {})
+            counts = line_counts.get(line.id, {})
             lines_summary.append(
                 f"📍 {line.name}: In={counts.get('in', 0)}, "
                 f"Out={counts.get('out', 0)}, Total={counts.get('total', 0)}"
             )
 
         for poly in self.polygons:
-            counts = self.zone_counts.get(poly.id, {})
+            counts = zone_counts.get(poly.id, {})
             lines_summary.append(
                 f"📦 {poly.name}: Current={counts.get('count', 0)}, "
                 f"Entered={counts.get('entered', 0)}, Exited={counts.get('exited', 0)}"
@@ -317,16 +491,17 @@ class ObjectCounter:
     def get_class_breakdown(self) -> str:
         """Get counts broken down by class."""
         summary = []
+        line_class_counts, zone_class_counts = self.line_class_counts, self.zone_class_counts
 
         for line in self.lines:
-            class_counts = self.line_class_counts.get(line.id, {})
+            class_counts = line_class_counts.get(line.id, {})
             if class_counts:
                 summary.append(f"\n📍 {line.name}:")
                 for cls_name, counts in class_counts.items():
                     summary.append(f"  - {cls_name}: In={counts['in']}, Out={counts['out']}")
 
         for poly in self.polygons:
-            class_counts = self.zone_class_counts.get(poly.id, {})
+            class_counts = zone_class_counts.get(poly.id, {})
             if class_counts:
                 summary.append(f"\n📦 {poly.name}:")
                 for cls_name, count in class_counts.items():
@@ -0,0 +1,65 @@
+"""
+Count Table
+Dense per-geometry, per-class event counters updated in bulk
+"""
+
+from typing import Dict, List, Sequence
+import numpy as np
+
+
+class CountTable:
+    """
+    Event counts of lines or zones in one (geometry, class, direction) array.
+
+    A geometry gets a row the first time its ID is seen and keeps it (with
+    its counts) if it is later removed from the scene. The class axis grows
+    to the largest class ID counted, so a frame's events are added with a
+    single np.add.at whatever the number of lines, zones and classes.
+    """
+
+    def __init__(self, directions: Sequence[str]):
+        """
+        Initialize empty counts.
+
+        Args:
+            directions: Names of the event kinds (e.g. 'in', 'out')
+        """
+        self.directions = tuple(directions)
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def clear(self):
+        """Remove all geometries and counts."""
+        self.ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self.counts = np.zeros((0, 0, len(self.directions)), dtype=np.int64)
+        self.current = np.zeros(0, dtype=np.int64)     # Latest level per geometry (zone occupancy)
+
+    def rows(self, ids: Sequence[str]) -> np.ndarray:
+        """Rows of the given geometry IDs, adding zeroed rows for new ones."""
+        new = [key for key in dict.fromkeys(ids) if key not in self._row_of]
+        if new:
+            for key in new:
+                self._row_of[key] = len(self.ids)
+                self.ids.append(key)
+            _, n_classes, n_directions = self.counts.shape
+            self.counts = np.concatenate([
+                self.counts, np.zeros((len(new), n_classes, n_directions), dtype=np.int64)
+            ])
+            self.current = np.concatenate([self.current, np.zeros(len(new), dtype=np.int64)])
+        return np.array([self._row_of[key] for key in ids], dtype=np.intp)
+
+    def add(self, rows: np.ndarray, class_ids: np.ndarray, directions: np.ndarray):
+        """Count one event per (row, class ID, direction index) triple."""
+        if len(rows) == 0:
+            return
+        n_classes = int(class_ids.max()) + 1
+        if n_classes > self.counts.shape[1]:
+            self.counts = np.pad(self.counts, ((0, 0), (0, n_classes - self.counts.shape[1]), (0, 0)))
+        np.add.at(self.counts, (rows, class_ids, directions), 1)
+
+    def totals(self) -> np.ndarray:
+        """Counts summed over classes, as a (geometries, directions) array."""
+        return self.counts.sum(axis=1)
@@ -0,0 +1,300 @@
+"""
+Detection Persistence Store
+Records every detection of a video once so later runs can skip inference
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+from .detections import Detections
+from .model_cache import _dir_size
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "YOLO_UI_DETECTION_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "yolo_ui", "detections")
+)
+
+META_FILE = "meta.json"
+ROWS_FILE = "detections.f32"   # (rows, 6) float32: x1, y1, x2, y2, conf, class_id
+OFFSETS_FILE = "offsets.i64"   # (frames + 1,) int64 row offsets per frame
+ROW_WIDTH = 6
+
+
+def video_hash(path: str, sample_size: int = 1024 * 1024) -> str:
+    """
+    Content hash of a video file.
+
+    Hashes the file size plus samples from the start, middle and end of the
+    file, so multi-gigabyte videos are identified without reading them fully.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        for offset in (0, max(0, size // 2 - sample_size // 2), max(0, size - sample_size)):
+            f.seek(offset)
+            digest.update(f.read(sample_size))
+    return digest.hexdigest()
+
+
+class RecordedDetections:
+    """
+    Read-only, memory-mapped detections of a fully recorded video.
+
+    Re-filtering by a higher confidence or a class subset is a cheap array
+    operation on the mapped rows, so no inference is needed.
+    """
+
+    def __init__(self, entry_dir: str, meta: dict):
+        self.entry_dir = entry_dir
+        self.meta = meta
+        self.floor_confidence = meta['floor_confidence']
+        self.offsets = np.fromfile(os.path.join(entry_dir, OFFSETS_FILE), dtype=np.int64)
+
+        rows_path = os.path.join(entry_dir, ROWS_FILE)
+        if os.path.getsize(rows_path) > 0:
+            self.rows = np.memmap(rows_path, dtype=np.float32, mode='r').reshape(-1, ROW_WIDTH)
+        else:
+            self.rows = np.zeros((0, ROW_WIDTH), dtype=np.float32)
+
+    def __len__(self) -> int:
+        """Number of recorded frames."""
+        return max(0, len(self.offsets) - 1)
+
+    def get(
+        self,
+        frame_index: int,
+        confidence: float = 0.0,
+        target_classes: Optional[List[int]] = None,
+        class_names: Optional[Dict[int, str]] = None
+    ) -> Detections:
+        """
+        Get the detections of a frame.
+
+        Args:
+            frame_index: Zero-based frame index
+            confidence: Minimum confidence (values below the floor have no effect)
+            target_classes: List of class IDs to keep (None = all classes)
+            class_names: Class name mapping attached to the result
+
+        Returns:
+            Detections of the frame
+        """
+        if frame_index < 0 or frame_index >= len(self):
+            return Detections.empty(class_names)
+
+        rows = self.rows[self.offsets[frame_index]:self.offsets[frame_index + 1]]
+        detections = Detections.from_arrays(rows[:, :4], rows[:, 4], rows[:, 5], class_names)
+        return detections.filter(confidence, target_classes)
+
+
+class DetectionRecorder:
+    """Appends per-frame detections to a new store entry."""
+
+    def __init__(self, store: 'DetectionStore', key: str, meta: dict):
+        self.store = store
+        self.key = key
+        self.meta = meta
+        self.tmp_dir = os.path.join(store.root, f".{key}.tmp-{os.getpid()}")
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+
+        self._rows = open(os.path.join(self.tmp_dir, ROWS_FILE), 'wb')
+        self._offsets = [0]
+
+    def append(self, detections: Detections):
+        """Record the detections of the next frame."""
+        rows = np.empty((len(detections), ROW_WIDTH), dtype=np.float32)
+        rows[:, :4] = detections.xyxy
+        rows[:, 4] = detections.conf
+        rows[:, 5] = detections.class_id
+        self._rows.write(rows.tobytes())
+        self._offsets.append(self._offsets[-1] + len(detections))
+
+    def finish(self, frames_read: int, video_frames: int = 0) -> Optional[RecordedDetections]:
+        """
+        Complete the recording and publish it to the store.
+
+        A recording that missed frames is discarded instead, so a replay
+        never runs out of detections before the end of the video.
+
+        Args:
+            frames_read: Number of frames read from the video
+            video_frames: Frame count reported by the video container (0 = unknown)
+
+        Returns:
+            The recorded detections, or None if the recording was incomplete
+        """
+        recorded = len(self._offsets) - 1
+        if recorded != frames_read or recorded < video_frames:
+            self.abort()
+            return None
+
+        self._rows.close()
+        np.asarray(self._offsets, dtype=np.int64).tofile(os.path.join(self.tmp_dir, OFFSETS_FILE))
+
+        self.meta['frames'] = recorded
+        self.meta['rows'] = self._offsets[-1]
+        self.meta['created'] = time.time()
+        self.meta['last_used'] = time.time()
+        with open(os.path.join(self.tmp_dir, META_FILE), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+        final_dir = self.store.entry_dir(self.key)
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(self.tmp_dir, final_dir)
+        self.store.evict(keep=self.key)
+        return RecordedDetections(final_dir, self.meta)
+
+    def abort(self):
+        """Discard a partial recording."""
+        self._rows.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class DetectionStore:
+    """
+    Persistent per-video detection store.
+
+    Entries are keyed by video content hash, model ID and input size and
+    hold every detection at or above a floor confidence, stored as flat
+    binary arrays that are memory-mapped when read back. Entries are
+    evicted least-recently-used first once the store exceeds its entry or
+    size limits.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        floor_confidence: float = 0.1,
+        max_entries: int = 50,
+        max_bytes: int = 2 * 1024 ** 3
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            root: Store directory (default: $YOLO_UI_DETECTION_DIR or ~/.cache/yolo_ui/detections)
+            floor_confidence: Confidence used when recording; later runs may filter above it
+            max_entries: Maximum number of stored recordings
+            max_bytes: Maximum total size of stored recordings in bytes
+        """
+        self.root = root or DEFAULT_STORE_DIR
+        self.floor_confidence = floor_confidence
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._video_hashes: Dict[tuple, str] = {}
+
+    def make_key(self, video_path: str, model_id: str, imgsz=None) -> str:
+        """Build the entry key for a video, model and input size."""
+        stat = os.stat(video_path)
+        memo_key = (os.path.abspath(video_path), stat.st_mtime, stat.st_size)
+        if memo_key not in self._video_hashes:
+            self._video_hashes[memo_key] = video_hash(video_path)
+
+        if isinstance(imgsz, (list, tuple)):
+            imgsz = "x".join(str(int(v)) for v in imgsz)
+        digest = hashlib.sha256(f"{model_id}|{imgsz}".encode()).hexdigest()[:16]
+        return f"{self._video_hashes[memo_key][:16]}_{digest}"
+
+    def entry_dir(self, key: str) -> str:
+        """Get the directory of a store entry."""
+        return os.path.join(self.root, key)
+
+    def open(self, video_path: str, model_id: str, imgsz=None, frames: int = 0) -> Optional[RecordedDetections]:
+        """
+        Open a complete recording for a video and mark it as recently used.
+
+        Args:
+            video_path: Video file
+            model_id: Model ID the detections were recorded with
+            imgsz: Input size the detections were recorded at
+            frames: Frame count of the video (0 = unknown); shorter recordings are rejected
+
+        Returns:
+            The recorded detections, or None if the video was never fully recorded
+        """
+        entry = self.entry_dir(self.make_key(video_path, model_id, imgsz))
+        try:
+            with open(os.path.join(entry, META_FILE), 'r') as f:
+                meta = json.load(f)
+            recording = RecordedDetections(entry, meta)
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(recording) < max(frames, meta.get('frames', 0)):
+            return None
+
+        meta['last_used'] = time.time()
+        try:
+            self._write_meta(entry, meta)
+        except OSError:
+            pass    # Evicted meanwhile; the mapped files stay readable
+        return recording
+
+    def recorder(self, video_path: str, model_id: str, imgsz=None) -> DetectionRecorder:
+        """Start a new recording for a video."""
+        os.makedirs(self.root, exist_ok=True)
+        key = self.make_key(video_path, model_id, imgsz)
+        meta = {
+            'video': os.path.abspath(video_path),
+            'model': model_id,
+            'imgsz': imgsz,
+            'floor_confidence': self.floor_confidence,
+        }
+        return DetectionRecorder(self, key, meta)
+
+    def entries(self) -> List[dict]:
+        """List all recordings, most recently used first."""
+        if not os.path.isdir(self.root):
+            return []
+
+        result = []
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if name.startswith('.'):
+                continue
+            try:
+                with open(os.path.join(entry, META_FILE), 'r') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta['path'] = entry
+            meta['key'] = name
+            meta['size'] = _dir_size(entry)
+            result.append(meta)
+
+        result.sort(key=lambda m: m.get('last_used', m.get('created', 0)), reverse=True)
+        return result
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Remove least-recently-used recordings beyond the configured limits.
+
+        Args:
+            keep: Key of a recording that is never removed (counted as the most recent)
+        """
+        entries = self.entries()
+        entries.sort(key=lambda m: m['key'] != keep)
+        total = 0
+        for index, meta in enumerate(entries):
+            total += meta['size']
+            if meta['key'] == keep:
+                continue
+            if index >= self.max_entries or total > self.max_bytes:
+                shutil.rmtree(meta['path'], ignore_errors=True)
+
+    def clear(self):
+        """Remove all recordings."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write_meta(self, entry_dir: str, meta: dict):
+        """Write entry metadata atomically (per-process temp file, safe across processes)."""
+        data = {k: v for k, v in meta.items() if k not in ('path', 'key', 'size')}
+        tmp_path = os.path.join(entry_dir, f"{META_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, os.path.join(entry_dir, META_FILE))
@@ -0,0 +1,152 @@
+"""
+Columnar Detection Results
+Compact array container shared by the detector, counter and renderer
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+import numpy as np
+
+
+@dataclass(eq=False)
+class Detections:
+    """
+    Detections of a single frame stored as contiguous arrays.
+
+    Class names are not repeated per box: ``class_id`` indexes into the
+    shared ``class_names`` mapping of the detector that produced them.
+    """
+    xyxy: np.ndarray        # (N, 4) float32 boxes as x1, y1, x2, y2
+    conf: np.ndarray        # (N,) float32 confidences
+    class_id: np.ndarray    # (N,) int32 class IDs
+    center: np.ndarray      # (N, 2) int32 box centers
+    class_names: Dict[int, str] = field(default_factory=dict)
+
+    @classmethod
+    def empty(cls, class_names: Optional[Dict[int, str]] = None) -> 'Detections':
+        """Create an empty result."""
+        return cls(
+            xyxy=np.zeros((0, 4), dtype=np.float32),
+            conf=np.zeros(0, dtype=np.float32),
+            class_id=np.zeros(0, dtype=np.int32),
+            center=np.zeros((0, 2), dtype=np.int32),
+            class_names=class_names if class_names is not None else {}
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        xyxy: np.ndarray,
+        conf: np.ndarray,
+        class_id: np.ndarray,
+        class_names: Optional[Dict[int, str]] = None
+    ) -> 'Detections':
+        """Build detections from raw box, confidence and class arrays."""
+        xyxy = np.ascontiguousarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        center = ((xyxy[:, :2] + xyxy[:, 2:]) / 2).astype(np.int32)
+        return cls(
+            xyxy=xyxy,
+            conf=np.ascontiguousarray(conf, dtype=np.float32).reshape(-1),
+            class_id=np.ascontiguousarray(class_id, dtype=np.int32).reshape(-1),
+            center=center,
+            class_names=class_names if class_names is not None else {}
+        )
+
+    @classmethod
+    def from_dicts(
+        cls,
+        detections: List[dict],
+        class_names: Optional[Dict[int, str]] = None
+    ) -> 'Detections':
+        """Build detections from the legacy list-of-dicts format."""
+        names = dict(class_names) if class_names is not None else {}
+        if not detections:
+            return cls.empty(names)
+
+        for det in detections:
+            if 'class_name' in det:
+                names.setdefault(det['class_id'], det['class_name'])
+
+        result = cls.from_arrays(
+            np.array([d['bbox'] for d in detections], dtype=np.float32),
+            np.array([d.get('confidence', 0.0) for d in detections], dtype=np.float32),
+            np.array([d['class_id'] for d in detections], dtype=np.int32),
+            names
+        )
+        if all('center' in d for d in detections):
+            result.center = np.array([d['center'] for d in detections], dtype=np.int32)
+        return result
+
+    @classmethod
+    def concatenate(
+        cls,
+        items: Iterable['Detections'],
+        class_names: Optional[Dict[int, str]] = None
+    ) -> 'Detections':
+        """Join several results into one."""
+        items = list(items)
+        if class_names is None:
+            class_names = items[0].class_names if items else {}
+        if not items:
+            return cls.empty(class_names)
+
+        return cls(
+            xyxy=np.concatenate([d.xyxy for d in items]),
+            conf=np.concatenate([d.conf for d in items]),
+            class_id=np.concatenate([d.class_id for d in items]),
+            center=np.concatenate([d.center for d in items]),
+            class_names=class_names
+        )
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray, List[int]]) -> 'Detections':
+        """Select a subset of detections by index, slice or boolean mask."""
+        if isinstance(index, (int, np.integer)):
+            index = [index]
+        return Detections(
+            xyxy=self.xyxy[index],
+            conf=self.conf[index],
+            class_id=self.class_id[index],
+            center=self.center[index],
+            class_names=self.class_names
+        )
+
+    def filter(
+        self,
+        confidence: float = 0.0,
+        target_classes: Optional[List[int]] = None
+    ) -> 'Detections':
+        """Keep detections at or above a confidence and within a class subset."""
+        mask = self.conf >= confidence
+        if target_classes is not None:
+            mask &= np.isin(self.class_id, target_classes)
+        return self if mask.all() else self[mask]
+
+    def in_region(self, region: Tuple[int, int, int, int]) -> 'Detections':
+        """Keep detections whose center lies inside an (x1, y1, x2, y2) region."""
+        x1, y1, x2, y2 = region
+        cx, cy = self.center[:, 0], self.center[:, 1]
+        mask = (cx >= x1) & (cx < x2) & (cy >= y1) & (cy < y2)
+        return self if mask.all() else self[mask]
+
+    def class_name(self, class_id: int) -> str:
+        """Get the class name for a class ID."""
+        return self.class_names.get(int(class_id), f"class_{int(class_id)}")
+
+    def to_dicts(self) -> List[dict]:
+        """Convert to the legacy list-of-dicts format."""
+        boxes = self.xyxy.astype(np.int32).tolist()
+        centers = self.center.tolist()
+        return [
+            {
+                'id': i,
+                'bbox': boxes[i],
+                'confidence': float(self.conf[i]),
+                'class_id': int(self.class_id[i]),
+                'class_name': self.class_name(self.class_id[i]),
+                'center': tuple(centers[i])
+            }
+            for i in range(len(self))
+        ]
@@ -3,17 +3,25 @@ Object Detection Engine
 Supports any YOLO weight file and custom class definitions
 """
 
+import hashlib
+import json
 import os
 from typing import List, Optional, Tuple
 import numpy as np
 import cv2
-from ultralytics import YOLO
+
+from .backends import InferenceBackend, get_backend
+from .detections import Detections
+from .model_cache import ModelCache
 
 
 class ObjectDetector:
     """
     Flexible object detector that works with any YOLO weight file
     and custom class definitions.
+
+    Inference is delegated to a pluggable backend (see backends.py), so the
+    same detect() contract holds for PyTorch, ONNX Runtime and OpenCV DNN.
     """
 
     def __init__(
@@ -21,20 +29,31 @@ class ObjectDetector:
         weights_path: str = "yolov8n.pt",
         classes_path: Optional[str] = None,
         confidence: float = 0.5,
-        device: str = "auto"
+        device: str = "auto",
+        backend: str = "ultralytics",
+        cache_dir: Optional[str] = None,
+        backend_options: Optional[dict] = None
     ):
         """
         Initialize the detector.
 
         Args:
-            weights_path: Path to YOLO weights file (.pt)
+            weights_path: Path to YOLO weights file (.pt or exported .onnx)
             classes_path: Path to classes.txt file (optional, uses model default if None)
             confidence: Detection confidence threshold
             device: Device to run inference on ('cpu', 'cuda', or 'auto')
+            backend: Inference backend name ('ultralytics', 'onnxruntime', 'opencv')
+            cache_dir: Directory for exported model artifacts (None = default cache)
+            backend_options: Extra keyword arguments for the backend (e.g. num_threads)
         """
         self.weights_path = weights_path
+        self.classes_path = classes_path
         self.confidence = confidence
         self.device = device
+        self.backend = backend
+        self.backend_options = backend_options or {}
+        self.model_cache = ModelCache(cache_dir)
+        self.imgsz: Optional[Tuple[int, int]] = None  # None = model default
 
         # Load the model
         self.model = self._load_model(weights_path)
@@ -47,13 +66,12 @@ class ObjectDetector:
         # Get class names from model or custom file
         self.class_names = self.custom_classes if self.custom_classes else self.model.names
 
-    def _load_model(self, weights_path: str) -> YOLO:
-        """Load YOLO model from weights file."""
-        if not os.path.exists(weights_path):
-            print(f"Weights file not found at {weights_path}, attempting to download...")
-
-        model = YOLO(weights_path)
-        return model
+    def _load_model(self, weights_path: str) -> InferenceBackend:
+        """Load model from weights file with the configured backend."""
+        backend_cls = get_backend(self.backend)
+        return backend_cls(
+            weights_path, device=self.device, model_cache=self.model_cache, **self.backend_options
+        )
 
     def _load_classes(self, classes_path: str) -> dict:
         """Load class names from text file."""
@@ -65,60 +83,98 @@ class ObjectDetector:
                     classes[idx] = class_name
         return classes
 
+    @property
+    def model_id(self) -> str:
+        """Identifier of the loaded weights, backend and backend options (used as a cache key)."""
+        if os.path.exists(self.weights_path):
+            weights_id = self.model_cache.file_hash(self.weights_path)[:16]
+        else:
+            weights_id = os.path.basename(self.weights_path)
+
+        # Options that change the detections (e.g. blob area limits); thread counts don't
+        options = {k: v for k, v in self.backend_options.items() if k != 'num_threads'}
+        if not options:
+            return f"{weights_id}_{self.backend}"
+        options_id = hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode()).hexdigest()[:8]
+        return f"{weights_id}_{self.backend}_{options_id}"
+
     def detect(
         self,
         frame: np.ndarray,
-        target_classes: Optional[List[int]] = None
-    ) -> List[dict]:
+        target_classes: Optional[List[int]] = None,
+        confidence: Optional[float] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None
+    ) -> Detections:
         """
         Run detection on a single frame.
 
         Args:
             frame: Input image/frame as numpy array (BGR format)
             target_classes: List of class IDs to detect (None = all classes)
+            confidence: Confidence threshold override (None = detector setting)
+            roi: Optional (x1, y1, x2, y2) region; only this crop is processed
 
         Returns:
-            List of detection dictionaries
+            Detections for the frame
         """
-        results = self.model(
-            frame,
-            conf=self.confidence,
-            classes=target_classes,
-            verbose=False
-        )
+        return self.detect_batch([frame], target_classes, confidence, roi)[0]
 
-        detections = []
+    def detect_batch(
+        self,
+        frames: List[np.ndarray],
+        target_classes: Optional[List[int]] = None,
+        confidence: Optional[float] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None
+    ) -> List[Detections]:
+        """
+        Run detection on several frames in a single forward pass.
 
-        if len(results) > 0:
-            result = results[0]
+        Args:
+            frames: List of input frames as numpy arrays (BGR format)
+            target_classes: List of class IDs to detect (None = all classes)
+            confidence: Confidence threshold override (None = detector setting)
+            roi: Optional (x1, y1, x2, y2) region; only this crop is processed
+                and boxes are mapped back to frame coordinates
+
+        Returns:
+            List with one Detections result per input frame
+        """
+        if not frames:
+            return []
 
-            if result.boxes is not None:
-                boxes = result.boxes.xyxy.cpu().numpy()
-                confidences = result.boxes.conf.cpu().numpy()
-                class_ids = result.boxes.cls.cpu().numpy().astype(int)
+        if confidence is None:
+            confidence = self.confidence
 
-                for i, (box, conf, cls_id) in enumerate(zip(boxes, confidences, class_ids)):
-                    x1, y1, x2, y2 = box
-                    class_name = self.class_names.get(cls_id, f"class_{cls_id}")
+        frames = list(frames)
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            frames = [frame[y1:y2, x1:x2] for frame in frames]
 
-                    detections.append({
-                        'id': i,
-                        'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                        'confidence': float(conf),
-                        'class_id': int(cls_id),
-                        'class_name': class_name,
-                        'center': (int((x1 + x2) / 2), int((y1 + y2) / 2))
-                    })
+        outputs = self.model.predict(frames, confidence, target_classes, self.imgsz)
 
-        return detections
+        results = []
+        for boxes, confidences, class_ids in outputs:
+            if roi is not None:
+                boxes = boxes + np.array([x1, y1, x1, y1], dtype=np.float32)
+            results.append(Detections.from_arrays(boxes, confidences, class_ids, self.class_names))
+        return results
 
     def update_confidence(self, confidence: float):
         """Update confidence threshold."""
         self.confidence = max(0.0, min(1.0, confidence))
 
+    def set_input_size(self, imgsz: Optional[Tuple[int, int]]):
+        """Set the network input (height, width), or None for the model default."""
+        self.imgsz = tuple(imgsz) if imgsz else None
+
+    def reset_state(self):
+        """Reset per-video model state (e.g. the background model of 'blobs')."""
+        self.model.reset()
+
     def reload_model(self, weights_path: str, classes_path: Optional[str] = None):
         """Reload model with new weights and classes."""
         self.weights_path = weights_path
+        self.classes_path = classes_path
         self.model = self._load_model(weights_path)
 
         if classes_path and os.path.exists(classes_path):
@@ -142,7 +198,7 @@ class ObjectDetector:
 
 def draw_detections(
     frame: np.ndarray,
-    detections: List[dict],
+    detections: Detections,
     color_map: Optional[dict] = None,
     thickness: int = 2,
     font_scale: float = 0.6
@@ -152,7 +208,7 @@ def draw_detections(
 
     Args:
         frame: Input frame
-        detections: List of detection dictionaries
+        detections: Detections to draw (a legacy list of dicts is also accepted)
         color_map: Optional dictionary mapping class_id to BGR color tuple
         thickness: Line thickness
         font_scale: Font scale for labels
@@ -165,9 +221,15 @@ def draw_detections(
     if color_map is None:
         color_map = {}
 
-    for det in detections:
-        cls_id = det['class_id']
+    if not isinstance(detections, Detections):
+        detections = Detections.from_dicts(detections)
 
+    boxes = detections.xyxy.astype(np.int32).tolist()
+    centers = detections.center.tolist()
+    confidences = detections.conf.tolist()
+    class_ids = detections.class_id.tolist()
+
+    for (x1, y1, x2, y2), center, conf, cls_id in zip(boxes, centers, confidences, class_ids):
         # Generate consistent color for class
         if cls_id not in color_map:
             # Use simple hash for consistent colors
@@ -177,14 +239,12 @@ def draw_detections(
             color_map[cls_id] = (b, g, r)  # BGR for OpenCV
 
         color = color_map[cls_id]
-        bbox = det['bbox']
-        x1, y1, x2, y2 = int(bbox[0]), int(bbox[1]), int(bbox[2]), int(bbox[3])
 
         # Draw bounding box
         cv2.rectangle(annotated, (x1, y1), (x2, y2), color, thickness)
 
         # Draw label background
-        label = f"{det['class_name']} {det['confidence']:.2f}"
+        label = f"{detections.class_name(cls_id)} {conf:.2f}"
         (label_w, label_h), _ = cv2.getTextSize(
             label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness
         )
@@ -209,8 +269,6 @@ def draw_detections(
         )
 
         # Draw center point
-        center = (int(det['center'][0]), int(det['center'][1]))
-        cv2.circle(annotated, center, 4, color, -1)
+        cv2.circle(annotated, tuple(center), 4, color, -1)
 
     return annotated
-
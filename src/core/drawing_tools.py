@@ -9,6 +9,8 @@ import numpy as np
 import cv2
 from dataclasses import dataclass, asdict
 
+from .ops import points_in_polygon
+
 
 @dataclass
 class CountingLine:
@@ -99,6 +101,10 @@ class DrawingCanvas:
         # Custom colors (BGR format for OpenCV)
         self.line_color: Tuple[int, int, int] = (255, 165, 0)  # Orange
         self.zone_color: Tuple[int, int, int] = (255, 0, 255)  # Magenta
+
+        # Rasterized zones, rebuilt when the polygons or the canvas size change
+        self._zone_mask: Optional[np.ndarray] = None
+        self._zone_mask_key = None
     
     def set_line_color(self, color: Tuple[int, int, int]):
         """Set color for new lines (BGR format)."""
@@ -244,6 +250,115 @@ class DrawingCanvas:
         self.width = width
         self.height = height
 
+    def get_regions(self, padding: int = 0) -> List[Tuple[int, int, int, int]]:
+        """
+        Get the padded bounding box of every line and polygon.
+
+        Args:
+            padding: Margin in pixels added around each shape
+
+        Returns:
+            List of (x1, y1, x2, y2) boxes clamped to the canvas
+        """
+        shapes = [[line.start, line.end] for line in self.lines]
+        shapes += [poly.points for poly in self.polygons if poly.points]
+
+        regions = []
+        for points in shapes:
+            pts = np.array(points, dtype=np.int32)
+            x1, y1 = pts.min(axis=0) - padding
+            x2, y2 = pts.max(axis=0) + padding
+            regions.append((
+                int(max(0, x1)), int(max(0, y1)),
+                int(min(self.width, x2)), int(min(self.height, y2))
+            ))
+        return regions
+
+    def get_segments(self) -> np.ndarray:
+        """
+        Get all counting lines and polygon edges as segments.
+
+        Returns:
+            (S, 4) float32 array of x1, y1, x2, y2
+        """
+        segments = [(*line.start, *line.end) for line in self.lines]
+        for poly in self.polygons:
+            points = poly.points
+            if len(points) < 2:
+                continue
+            segments += [(*points[i], *points[(i + 1) % len(points)]) for i in range(len(points))]
+        return np.array(segments, dtype=np.float32).reshape(-1, 4)
+
+    def get_zone_mask(self) -> Optional[np.ndarray]:
+        """
+        Get all polygons rasterized into one per-pixel zone bitmask.
+
+        Bit j % 64 of word j // 64 is set at every pixel inside (or on the
+        border of) polygon j, so overlapping zones are all marked and the
+        zones of many points are found with a single lookup. The mask is
+        cached and only rebuilt when the polygons or the canvas size change.
+
+        Returns:
+            (height, width, ceil(zones / 64)) uint64 array, or None if there are no zones
+        """
+        key = (self.width, self.height, tuple(tuple(poly.points) for poly in self.polygons))
+        if key != self._zone_mask_key:
+            self._zone_mask = self._rasterize_zones() if self.polygons else None
+            self._zone_mask_key = key
+        return self._zone_mask
+
+    def _rasterize_zones(self) -> np.ndarray:
+        """Fill every polygon into its bit of a new zone bitmask."""
+        words = -(-len(self.polygons) // 64)
+        mask = np.zeros((self.height, self.width, words), dtype=np.uint64)
+        for j, poly in enumerate(self.polygons):
+            if len(poly.points) < 3:
+                continue
+            pts = np.array(poly.points, dtype=np.int32)
+            x1, y1 = np.maximum(pts.min(axis=0), 0)
+            x2, y2 = np.minimum(pts.max(axis=0) + 1, (self.width, self.height))
+            if x1 >= x2 or y1 >= y2:
+                continue
+
+            # Fill only the polygon's bounding box
+            local = pts - (x1, y1)
+            fill = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+            cv2.fillPoly(fill, [local], 1)
+
+            # Pixels along the edges, and along the canvas borders where the
+            # polygon was clipped, follow OpenCV's rasterization rules;
+            # recompute them with the exact test used for points
+            edge = np.zeros_like(fill)
+            cv2.polylines(edge, [local], True, 1, thickness=3)
+            lo, hi = pts.min(axis=0), pts.max(axis=0)
+            edge[:, 0] |= lo[0] < 0
+            edge[:, -1] |= hi[0] >= self.width
+            edge[0] |= lo[1] < 0
+            edge[-1] |= hi[1] >= self.height
+            ys, xs = np.nonzero(edge)
+            fill[ys, xs] = points_in_polygon(np.stack([xs, ys], axis=1), local)
+            mask[y1:y2, x1:x2, j // 64] |= fill.astype(np.uint64) << np.uint64(j % 64)
+        return mask
+
+    def get_roi(self, padding: int = 100) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Get the region of interest around all lines and polygons.
+
+        Args:
+            padding: Margin in pixels added around the drawn geometry
+
+        Returns:
+            (x1, y1, x2, y2) clamped to the canvas, or None if nothing is drawn
+        """
+        regions = self.get_regions(padding)
+        if not regions:
+            return None
+
+        boxes = np.array(regions, dtype=np.int32)
+        x1, y1 = boxes[:, :2].min(axis=0)
+        x2, y2 = boxes[:, 2:].max(axis=0)
+        return int(x1), int(y1), int(x2), int(y2)
+
     def draw_on_frame(
         self,
         frame: np.ndarray,
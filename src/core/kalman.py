@@ -0,0 +1,112 @@
+"""
+Constant-Velocity Kalman Filter
+Batched SORT-style motion model for all tracks at once
+"""
+
+from typing import Optional
+import numpy as np
+
+# State [cx, cy, vx, vy] with one frame per step
+_F = np.array([
+    [1, 0, 1, 0],
+    [0, 1, 0, 1],
+    [0, 0, 1, 0],
+    [0, 0, 0, 1],
+], dtype=np.float64)
+
+
+class KalmanTracks:
+    """
+    Constant-velocity Kalman filters of many tracks in stacked arrays.
+
+    States are (K, 4) and covariances (K, 4, 4), so predict() and update()
+    are a handful of batched matrix operations whatever the number of
+    tracks. Rows are kept in increasing track ID order, which lets track
+    IDs be mapped to rows with searchsorted.
+    """
+
+    def __init__(
+        self,
+        measurement_noise: float = 4.0,
+        acceleration_noise: float = 2.0,
+        velocity_noise: float = 20.0
+    ):
+        """
+        Initialize an empty set of filters.
+
+        Args:
+            measurement_noise: Std of detected centers in pixels
+            acceleration_noise: Std of the per-frame change in velocity (pixels/frame²)
+            velocity_noise: Std of the unknown initial velocity (pixels/frame)
+        """
+        # Discrete white-noise acceleration model
+        g = np.array([0.5, 0.5, 1.0, 1.0])
+        self.Q = np.diag(g * g) * acceleration_noise ** 2
+        self.Q[0, 2] = self.Q[2, 0] = self.Q[1, 3] = self.Q[3, 1] = 0.5 * acceleration_noise ** 2
+        self.R = np.eye(2) * measurement_noise ** 2
+        self.P0 = np.diag([measurement_noise ** 2] * 2 + [velocity_noise ** 2] * 2)
+
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def clear(self):
+        """Remove all tracks."""
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.x = np.zeros((0, 4))
+        self.P = np.zeros((0, 4, 4))
+
+    def rows(self, ids) -> np.ndarray:
+        """Rows of the given track IDs."""
+        return np.searchsorted(self.ids, np.asarray(ids, dtype=np.int64))
+
+    def add(self, ids, centers: np.ndarray):
+        """Start filters at rest for new tracks (IDs larger than any existing one)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return
+        x = np.zeros((len(ids), 4))
+        x[:, :2] = centers
+        self.ids = np.concatenate([self.ids, ids])
+        self.x = np.concatenate([self.x, x])
+        self.P = np.concatenate([self.P, np.broadcast_to(self.P0, (len(ids), 4, 4))])
+
+    def remove(self, ids):
+        """Drop the filters of the given tracks."""
+        if len(ids) == 0:
+            return
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[self.rows(ids)] = False
+        self.ids, self.x, self.P = self.ids[keep], self.x[keep], self.P[keep]
+
+    def predict(self):
+        """Advance every filter by one frame."""
+        self.x = self.x @ _F.T
+        self.P = _F @ self.P @ _F.T + self.Q
+
+    def update(self, ids, centers: np.ndarray):
+        """Correct the filters of the given tracks with their detected centers."""
+        if len(ids) == 0:
+            return
+        rows = self.rows(ids)
+        x, P = self.x[rows], self.P[rows]
+
+        # The measurement is the position part of the state (H = [I 0])
+        S = P[:, :2, :2] + self.R
+        K = P[:, :, :2] @ np.linalg.inv(S)
+        innovation = np.asarray(centers, dtype=np.float64) - x[:, :2]
+        self.x[rows] = x + (K @ innovation[:, :, None])[:, :, 0]
+        self.P[rows] = P - K @ P[:, :2, :]
+
+    def positions(self, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Predicted centers as an (N, 2) array (all tracks, or the given IDs)."""
+        if ids is None:
+            return self.x[:, :2]
+        return self.x[self.rows(ids), :2]
+
+    def velocities(self, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Estimated velocities in pixels/frame as an (N, 2) array."""
+        if ids is None:
+            return self.x[:, 2:]
+        return self.x[self.rows(ids), 2:]
@@ -0,0 +1,222 @@
+"""
+Compiled Model Artifact Cache
+Stores exported/optimized model artifacts keyed by weights hash
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "YOLO_UI_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "yolo_ui", "models")
+)
+
+META_FILE = "meta.json"
+
+
+class ModelCache:
+    """
+    On-disk cache of model artifacts such as exported ONNX graphs.
+
+    Each entry is a directory named after the weights file hash, artifact
+    kind (e.g. 'onnx', shared by the backends that run the same export)
+    and input size, holding the artifact files plus a meta.json. Entries
+    are evicted least-recently-used first once the cache exceeds its
+    entry or size limits.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_entries: int = 10,
+        max_bytes: int = 2 * 1024 ** 3
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Cache directory (default: $YOLO_UI_CACHE_DIR or ~/.cache/yolo_ui/models)
+            max_entries: Maximum number of cached artifacts
+            max_bytes: Maximum total size of cached artifacts in bytes
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._hashes: Dict[Tuple[str, float, int], str] = {}
+
+    def file_hash(self, path: str) -> str:
+        """Get the SHA-256 of a file (memoized per path, mtime and size)."""
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+        if memo_key not in self._hashes:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            self._hashes[memo_key] = digest.hexdigest()
+        return self._hashes[memo_key]
+
+    def make_key(self, weights_path: str, kind: str, imgsz=None) -> str:
+        """Build the cache key for a weights file, artifact kind and input size (None = any size)."""
+        key = f"{self.file_hash(weights_path)[:16]}_{kind}"
+        if imgsz is None:
+            return key
+        if isinstance(imgsz, (list, tuple)):
+            imgsz = "x".join(str(int(v)) for v in imgsz)
+        return f"{key}_{imgsz}"
+
+    def entry_dir(self, key: str) -> str:
+        """Get the directory of a cache entry."""
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up an entry and mark it as recently used.
+
+        Returns:
+            Entry metadata (with 'path' set to the entry directory) or None
+        """
+        meta_path = os.path.join(self.entry_dir(key), META_FILE)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        meta['last_used'] = time.time()
+        try:
+            self._write_meta(self.entry_dir(key), meta)
+        except OSError:
+            pass    # Evicted meanwhile; the metadata read is still valid for this lookup
+        meta['path'] = self.entry_dir(key)
+        return meta
+
+    def get_or_create(
+        self,
+        weights_path: str,
+        kind: str,
+        imgsz,
+        build: Callable[[str], dict]
+    ) -> dict:
+        """
+        Get a cached artifact, building it on a miss.
+
+        Args:
+            weights_path: Source weights file
+            kind: Kind of artifact (e.g. 'onnx', 'fused')
+            imgsz: Input size the artifact is built for (None if it works for any size)
+            build: Callback that writes artifacts into the given directory
+                and returns metadata to store (e.g. artifact file name, class names)
+
+        Returns:
+            Entry metadata with 'path' set to the entry directory
+        """
+        key = self.make_key(weights_path, kind, imgsz)
+        meta = self.get(key)
+        if meta is not None:
+            return meta
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = os.path.join(self.cache_dir, f".{key}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        try:
+            meta = dict(build(tmp_dir) or {})
+            meta.update({
+                'weights': os.path.abspath(weights_path),
+                'sha256': self.file_hash(weights_path),
+                'kind': kind,
+                'imgsz': imgsz,
+                'created': time.time(),
+                'last_used': time.time(),
+            })
+            self._write_meta(tmp_dir, meta)
+
+            final_dir = self.entry_dir(key)
+            try:
+                os.replace(tmp_dir, final_dir)
+            except OSError:
+                # Built concurrently by another process; keep theirs
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                existing = self.get(key)
+                if existing is not None:
+                    return existing
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self.evict(keep=key)
+        meta['path'] = final_dir
+        return meta
+
+    def entries(self) -> List[dict]:
+        """List all cache entries, most recently used first."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        result = []
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry, META_FILE)
+            if name.startswith('.') or not os.path.isfile(meta_path):
+                continue
+            try:
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta['path'] = entry
+            meta['key'] = name
+            meta['size'] = _dir_size(entry)
+            result.append(meta)
+
+        result.sort(key=lambda m: m.get('last_used', 0), reverse=True)
+        return result
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Remove least-recently-used entries beyond the configured limits.
+
+        Args:
+            keep: Key of an entry that is never removed (counted as the most recent)
+        """
+        entries = self.entries()
+        entries.sort(key=lambda m: m['key'] != keep)
+        total = 0
+        for index, meta in enumerate(entries):
+            total += meta['size']
+            if meta['key'] == keep:
+                continue
+            if index >= self.max_entries or total > self.max_bytes:
+                shutil.rmtree(meta['path'], ignore_errors=True)
+
+    def clear(self):
+        """Remove all cache entries."""
+        for meta in self.entries():
+            shutil.rmtree(meta['path'], ignore_errors=True)
+
+    def _write_meta(self, entry_dir: str, meta: dict):
+        """Write entry metadata atomically (per-process temp file, safe across processes)."""
+        data = {k: v for k, v in meta.items() if k not in ('path', 'key', 'size')}
+        tmp_path = os.path.join(entry_dir, f"{META_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, os.path.join(entry_dir, META_FILE))
+
+
+def _dir_size(path: str) -> int:
+    """Total size of files in a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
@@ -0,0 +1,602 @@
+"""
+Array Operations for Inference
+Letterbox preprocessing, box conversion, non-maximum suppression, geometry and assignment
+"""
+
+from functools import lru_cache
+from typing import Optional, Tuple
+import numpy as np
+import cv2
+
+
+class LetterBox:
+    """
+    Resize-and-pad preprocessor that writes into reusable buffers.
+
+    The padded canvas and the NCHW float blob are allocated once per
+    input shape and batch capacity, then reused for every frame.
+    """
+
+    def __init__(self, height: int = 640, width: int = 640, pad_value: int = 114):
+        """
+        Initialize the letterbox.
+
+        Args:
+            height: Network input height
+            width: Network input width
+            pad_value: Gray level used for the padded border
+        """
+        self.pad_value = pad_value
+        self._canvas: Optional[np.ndarray] = None
+        self._blob: Optional[np.ndarray] = None
+        self._resized: Optional[np.ndarray] = None
+        self.set_shape(height, width)
+
+    def set_shape(self, height: int, width: int):
+        """Change the network input shape, reallocating buffers if needed."""
+        self.height = int(height)
+        self.width = int(width)
+        if self._canvas is None or self._canvas.shape[:2] != (self.height, self.width):
+            self._canvas = np.empty((self.height, self.width, 3), dtype=np.uint8)
+            self._blob = None
+
+    def _ensure_blob(self, batch: int) -> np.ndarray:
+        """Get a blob buffer that can hold at least `batch` images."""
+        if self._blob is None or self._blob.shape[0] < batch:
+            self._blob = np.empty((batch, 3, self.height, self.width), dtype=np.float32)
+        return self._blob[:batch]
+
+    def __call__(self, frames) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Letterbox a list of BGR frames into an RGB NCHW float blob.
+
+        Args:
+            frames: List of frames as numpy arrays (BGR format)
+
+        Returns:
+            Tuple of (blob of shape (N, 3, H, W), per-frame (scale, pad_x, pad_y) array)
+        """
+        blob = self._ensure_blob(len(frames))
+        transforms = np.empty((len(frames), 3), dtype=np.float32)
+        canvas = self._canvas
+
+        for i, frame in enumerate(frames):
+            h, w = frame.shape[:2]
+            scale = min(self.height / h, self.width / w)
+            new_w, new_h = int(round(w * scale)), int(round(h * scale))
+            pad_x = (self.width - new_w) // 2
+            pad_y = (self.height - new_h) // 2
+
+            canvas.fill(self.pad_value)
+            target = canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+            if (new_w, new_h) == (w, h):
+                target[...] = frame
+            else:
+                if self._resized is None or self._resized.shape[:2] != (new_h, new_w):
+                    self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+                cv2.resize(frame, (new_w, new_h), dst=self._resized, interpolation=cv2.INTER_LINEAR)
+                target[...] = self._resized
+
+            # BGR HWC uint8 -> RGB CHW float in [0, 1], written in place
+            np.multiply(
+                canvas[:, :, ::-1].transpose(2, 0, 1), 1.0 / 255.0,
+                out=blob[i], casting='unsafe'
+            )
+            transforms[i] = (scale, pad_x, pad_y)
+
+        return blob, transforms
+
+
+def xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    """Convert (cx, cy, w, h) boxes to (x1, y1, x2, y2)."""
+    out = np.empty_like(boxes)
+    half_w = boxes[:, 2] / 2
+    half_h = boxes[:, 3] / 2
+    out[:, 0] = boxes[:, 0] - half_w
+    out[:, 1] = boxes[:, 1] - half_h
+    out[:, 2] = boxes[:, 0] + half_w
+    out[:, 3] = boxes[:, 1] + half_h
+    return out
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Compute the pairwise IoU matrix of two sets of xyxy boxes.
+
+    Returns:
+        Array of shape (len(boxes_a), len(boxes_b))
+    """
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+
+    lt = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    rb = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    wh = np.clip(rb - lt, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def paired_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Compute the IoU of corresponding xyxy boxes (row i of a with row i of b).
+
+    Returns:
+        Array of shape (N,)
+    """
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+
+    wh = np.clip(np.minimum(boxes_a[:, 2:], boxes_b[:, 2:]) - np.maximum(boxes_a[:, :2], boxes_b[:, :2]), 0, None)
+    inter = wh[:, 0] * wh[:, 1]
+
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float = 0.45,
+    class_ids: Optional[np.ndarray] = None,
+    max_det: int = 300,
+    metric: str = 'iou',
+    groups: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Greedy non-maximum suppression with vectorized overlap computation.
+
+    When class_ids is given, boxes of different classes never suppress each
+    other (boxes are shifted apart per class before computing overlaps).
+    With metric='ios' the overlap is intersection over the smaller box, which
+    also suppresses boxes cut off at tile borders inside a complete box.
+    When groups is given, boxes of the same group (e.g. from the same tile,
+    already deduplicated by the model) never suppress each other either.
+
+    Returns:
+        Indices of kept boxes, sorted by descending score
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if class_ids is not None:
+        offset = class_ids.astype(np.float32)[:, None] * (float(boxes.max()) + 1.0)
+        boxes = boxes + offset
+
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind='stable')
+
+    keep = []
+    while order.size > 0 and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        xx1 = np.maximum(x1[i], x1[rest])
+        yy1 = np.maximum(y1[i], y1[rest])
+        xx2 = np.minimum(x2[i], x2[rest])
+        yy2 = np.minimum(y2[i], y2[rest])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        if metric == 'ios':
+            overlap = inter / np.maximum(np.minimum(areas[i], areas[rest]), 1e-9)
+        else:
+            overlap = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+
+        suppressed = overlap > iou_threshold
+        if groups is not None:
+            suppressed &= groups[rest] != groups[i]
+        order = rest[~suppressed]
+
+    return np.array(keep, dtype=np.int64)
+
+
+def point_segment_distance(points: np.ndarray, segments: np.ndarray) -> np.ndarray:
+    """
+    Compute distances from points to line segments.
+
+    Args:
+        points: (N, 2) array of x, y
+        segments: (S, 4) array of x1, y1, x2, y2
+
+    Returns:
+        Array of shape (N, S)
+    """
+    points = points.astype(np.float32)[:, None, :]
+    start = segments[None, :, :2].astype(np.float32)
+    direction = segments[None, :, 2:].astype(np.float32) - start
+    length_sq = np.maximum((direction ** 2).sum(axis=2), 1e-9)
+    t = np.clip(((points - start) * direction).sum(axis=2) / length_sq, 0.0, 1.0)
+    closest = start + t[..., None] * direction
+    return np.linalg.norm(points - closest, axis=2)
+
+
+def line_sides(points: np.ndarray, segments: np.ndarray) -> np.ndarray:
+    """
+    Side of the line through each segment for every point.
+
+    The sign of ax + by + c with the coefficients of
+    CountingLine.get_line_equation (exact for integer coordinates).
+
+    Args:
+        points: (N, 2) array of x, y
+        segments: (S, 4) array of x1, y1, x2, y2
+
+    Returns:
+        (N, S) int8 array of -1, 0 (on the line) or 1
+    """
+    x1, y1, x2, y2 = segments.astype(np.float64).T
+    x = points[:, :1].astype(np.float64)
+    y = points[:, 1:].astype(np.float64)
+    value = (y2 - y1) * x + (x1 - x2) * y + (x2 * y1 - x1 * y2)
+    return np.sign(value).astype(np.int8)
+
+
+def segment_crossings(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    segments: np.ndarray,
+    start_sides: Optional[np.ndarray] = None,
+    end_sides: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the motion segments that cross finite line segments, for all pairs at once.
+
+    A motion crosses a segment when its start and end are strictly on
+    opposite sides of the segment's line and the line segment (endpoints
+    included) meets the motion's line. An end exactly on a line is not a
+    crossing yet; callers can pass start sides with the side a start lying
+    on a line came from.
+
+    Args:
+        starts: (N, 2) start points (previous positions)
+        ends: (N, 2) end points (current positions)
+        segments: (S, 4) array of x1, y1, x2, y2
+        start_sides: Optional (N, S) sides of the starts (see line_sides)
+        end_sides: Optional (N, S) sides of the ends
+
+    Returns:
+        (motion indices, segment indices, directions) of the crossings; the
+        direction is the side the motion ends on (1 or -1)
+    """
+    if start_sides is None:
+        start_sides = line_sides(starts, segments)
+    if end_sides is None:
+        end_sides = line_sides(ends, segments)
+    i, j = np.nonzero(start_sides.astype(np.int16) * end_sides < 0)
+
+    # Both segment endpoints on the same side of the motion's line: it passes beyond the segment
+    x1, y1, x2, y2 = segments.astype(np.float64)[j].T
+    px, py = starts[i].astype(np.float64).T
+    dx, dy = (ends[i].astype(np.float64) - starts[i]).T
+    side_a = np.sign(dx * (y1 - py) - dy * (x1 - px))
+    side_b = np.sign(dx * (y2 - py) - dy * (x2 - px))
+    hit = side_a * side_b <= 0
+
+    i, j = i[hit], j[hit]
+    return i, j, end_sides[i, j]
+
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    Test which points lie inside a polygon or on its boundary.
+
+    Matches cv2.pointPolygonTest(polygon, point, False) >= 0 for integer
+    coordinates, vectorized over the points.
+
+    Args:
+        points: (N, 2) array of x, y
+        polygon: (V, 2) array of vertices
+
+    Returns:
+        (N,) boolean array
+    """
+    x = points[:, 0].astype(np.float64)
+    y = points[:, 1].astype(np.float64)
+    inside = np.zeros(len(points), dtype=bool)
+    on_edge = np.zeros(len(points), dtype=bool)
+    if len(polygon) < 3:
+        return inside
+
+    vertices = polygon.astype(np.float64)
+    for (x1, y1), (x2, y2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        cross = (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+        on_edge |= (cross == 0) & (x >= min(x1, x2)) & (x <= max(x1, x2)) \
+            & (y >= min(y1, y2)) & (y <= max(y1, y2))
+
+        # Even-odd rule on a horizontal ray towards +x
+        spans = (y1 > y) != (y2 > y)
+        if y1 != y2:
+            x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            inside ^= spans & (x < x_cross)
+
+    return inside | on_edge
+
+
+def greedy_match(cost: np.ndarray, valid: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy one-to-one assignment in order of increasing cost.
+
+    Args:
+        cost: (R, C) cost matrix
+        valid: Optional (R, C) boolean mask of allowed pairs
+
+    Returns:
+        (row indices, column indices) of matched pairs, in order of increasing cost
+    """
+    if valid is None:
+        valid = np.ones(cost.shape, dtype=bool)
+    rows, cols = np.nonzero(valid)
+    return greedy_match_pairs(rows, cols, cost[rows, cols], *cost.shape)
+
+
+def _pair_order(rows: np.ndarray, cols: np.ndarray, cost: np.ndarray, n_rows: int, n_cols: int) -> np.ndarray:
+    """Order of candidate pairs by cost, then row, then column."""
+    tie = rows.astype(np.int64) * n_cols + cols
+    cells = max(1, n_rows * n_cols)
+    if np.issubdtype(cost.dtype, np.integer) and len(cost) and cost.min() >= 0 \
+            and int(cost.max()) < (1 << 62) // cells:
+        # Integer costs: one sort on a packed (cost, row, column) key
+        return np.argsort(cost.astype(np.int64) * cells + tie)
+    order = np.argsort(tie)
+    return order[np.argsort(cost[order], kind='stable')]
+
+
+def greedy_match_pairs(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    cost: np.ndarray,
+    n_rows: int,
+    n_cols: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy one-to-one assignment of a sparse list of candidate pairs.
+
+    Produces the same pairs as sorting the candidates by cost (ties in
+    row-major order) and taking each pair whose row and column are still
+    free, but without a Python loop over pairs: every pair that is the best
+    remaining choice of both its row and its column is accepted at once,
+    pairs sharing a row or column with it are dropped, and the step repeats
+    on the remaining pairs.
+
+    Args:
+        rows: (P,) row index of each candidate pair
+        cols: (P,) column index of each candidate pair
+        cost: (P,) cost of each candidate pair
+        n_rows: Number of rows
+        n_cols: Number of columns
+
+    Returns:
+        (row indices, column indices) of matched pairs, in order of increasing cost
+    """
+    # Candidates in greedy processing order; a pair's position is its rank
+    order = _pair_order(rows, cols, cost, n_rows, n_cols)
+    rows, cols = rows[order], cols[order]
+    rank = np.arange(len(order))
+
+    matched_rows, matched_cols, matched_rank = [], [], []
+    unused = len(order)
+    while len(rank):
+        row_best = np.full(n_rows, unused, dtype=np.int64)
+        col_best = np.full(n_cols, unused, dtype=np.int64)
+        np.minimum.at(row_best, rows, rank)
+        np.minimum.at(col_best, cols, rank)
+
+        accept = (row_best[rows] == rank) & (col_best[cols] == rank)
+        matched_rows.append(rows[accept])
+        matched_cols.append(cols[accept])
+        matched_rank.append(rank[accept])
+
+        row_taken = np.zeros(n_rows, dtype=bool)
+        col_taken = np.zeros(n_cols, dtype=bool)
+        row_taken[rows[accept]] = True
+        col_taken[cols[accept]] = True
+        keep = ~(row_taken[rows] | col_taken[cols])
+        rows, cols, rank = rows[keep], cols[keep], rank[keep]
+
+    if not matched_rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    order = np.argsort(np.concatenate(matched_rank))
+    return np.concatenate(matched_rows)[order], np.concatenate(matched_cols)[order]
+
+
+@lru_cache(maxsize=None)
+def _scipy():
+    """The scipy package with its sparse graph and optimize modules, or None."""
+    try:
+        import scipy.optimize
+        import scipy.sparse.csgraph
+    except ImportError:
+        return None
+    return scipy
+
+
+def pair_components(rows: np.ndarray, cols: np.ndarray, n_rows: int, n_cols: int) -> np.ndarray:
+    """
+    Label the connected components of a bipartite graph given as a pair list.
+
+    Uses scipy when it is installed, otherwise min-label propagation with
+    pointer jumping (a few vectorized passes for the short chains that
+    gated tracking produces).
+
+    Args:
+        rows: (P,) row index of each pair
+        cols: (P,) column index of each pair
+        n_rows: Number of rows
+        n_cols: Number of columns
+
+    Returns:
+        (P,) component label of each pair
+    """
+    nodes = n_rows + n_cols
+    scipy = _scipy()
+    if scipy is None:
+        labels = np.arange(nodes)
+        while True:
+            edge = np.minimum(labels[rows], labels[n_rows + cols])
+            updated = labels.copy()
+            np.minimum.at(updated, rows, edge)
+            np.minimum.at(updated, n_rows + cols, edge)
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+    else:
+        graph = scipy.sparse.coo_matrix(
+            (np.ones(len(rows), dtype=np.int8), (rows, n_rows + cols)), shape=(nodes, nodes)
+        )
+        _, labels = scipy.sparse.csgraph.connected_components(graph, directed=False)
+    return labels[rows]
+
+
+def _hungarian(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Minimum-cost assignment of a dense (R, C) matrix (shortest augmenting
+    path Hungarian algorithm, inner loop vectorized over columns).
+
+    Returns:
+        (row indices, column indices) of min(R, C) assigned pairs
+    """
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = _hungarian(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)     # Row (1-based) assigned to each column, 0 = free
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            slack = cost[i0 - 1] - u[i0] - v[1:]
+            improve = ~used[1:] & (slack < min_slack[1:])
+            min_slack[1:][improve] = slack[improve]
+            way[1:][improve] = j0
+
+            free = np.flatnonzero(~used[1:]) + 1
+            j1 = free[np.argmin(min_slack[free])]
+            delta = min_slack[j1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_slack[~used] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(owner[1:])
+    rows = owner[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _solve_dense(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Dense minimum-cost assignment, with scipy when it is installed."""
+    scipy = _scipy()
+    if scipy is None:
+        return _hungarian(cost)
+    return scipy.optimize.linear_sum_assignment(cost)
+
+
+def optimal_match(cost: np.ndarray, valid: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Globally optimal one-to-one assignment restricted to valid pairs.
+
+    Args:
+        cost: (R, C) non-negative cost matrix
+        valid: Optional (R, C) boolean mask of allowed pairs
+
+    Returns:
+        (row indices, column indices) of matched pairs, in order of increasing cost
+    """
+    if valid is None:
+        valid = np.ones(cost.shape, dtype=bool)
+    rows, cols = np.nonzero(valid)
+    return optimal_match_pairs(rows, cols, cost[rows, cols], *cost.shape)
+
+
+def optimal_match_pairs(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    cost: np.ndarray,
+    n_rows: int,
+    n_cols: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Globally optimal one-to-one assignment of a sparse list of candidate pairs.
+
+    Matches as many pairs as possible and, among those assignments, minimizes
+    the total cost. The candidates are split into connected components
+    (rows and columns linked by a candidate pair), and each component is
+    solved on its own, so the cost grows with the size of the largest cluster
+    of competing objects rather than with the total number of objects.
+    Components with a single row or column take their cheapest pair
+    without running the solver.
+
+    Args:
+        rows: (P,) row index of each candidate pair
+        cols: (P,) column index of each candidate pair
+        cost: (P,) non-negative cost of each candidate pair
+        n_rows: Number of rows
+        n_cols: Number of columns
+
+    Returns:
+        (row indices, column indices) of matched pairs, in order of increasing cost
+    """
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Group candidates by component, row-major within a component
+    labels = pair_components(rows, cols, n_rows, n_cols)
+    order = np.lexsort((cols, rows, labels))
+    rows, cols, cost, labels = rows[order], cols[order], cost[order], labels[order]
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    sizes = np.diff(np.r_[starts, len(labels)])
+
+    # A component with a single row or column (e.g. an isolated pair) is
+    # solved by its cheapest pair
+    component = np.repeat(np.arange(len(starts)), sizes)
+    first = np.zeros(len(rows), dtype=bool)
+    first[starts] = True
+    rows_per = np.bincount(component, weights=first | np.r_[False, rows[1:] != rows[:-1]])
+    cols_per = np.bincount(np.unique(component * n_cols + cols) // n_cols, minlength=len(starts))
+    trivial = (rows_per == 1) | (cols_per == 1)
+
+    picked = np.flatnonzero(trivial[component])
+    picked = picked[np.lexsort((cost[picked], component[picked]))]
+    picked = picked[np.diff(component[picked], prepend=-1) != 0]
+    matched = [picked]
+
+    for start, size in zip(starts[~trivial].tolist(), sizes[~trivial].tolist()):
+        block = slice(start, start + size)
+        local_rows, ri = np.unique(rows[block], return_inverse=True)
+        local_cols, ci = np.unique(cols[block], return_inverse=True)
+
+        # Invalid pairs cost more than any full valid assignment, so the
+        # solver only uses them when no larger valid matching exists
+        pair_cost = cost[block].astype(np.float64)
+        penalty = pair_cost.max() * min(len(local_rows), len(local_cols)) + 1.0
+        dense = np.full((len(local_rows), len(local_cols)), penalty)
+        dense[ri, ci] = pair_cost
+        pair_index = np.full(dense.shape, -1, dtype=np.int64)
+        pair_index[ri, ci] = np.arange(start, start + size)
+
+        r, c = _solve_dense(dense)
+        found = pair_index[r, c]
+        matched.append(found[found >= 0])
+
+    matched = np.concatenate(matched)
+    matched = matched[_pair_order(rows[matched], cols[matched], cost[matched], n_rows, n_cols)]
+    return rows[matched], cols[matched]
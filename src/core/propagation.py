@@ -0,0 +1,220 @@
+"""
+Keyframe Detection with Optical-Flow Box Propagation
+Runs the detector every N frames and carries boxes forward in between
+"""
+
+import warnings
+from typing import Callable, List, Optional
+import numpy as np
+import cv2
+
+from .detections import Detections
+
+
+class FlowPropagator:
+    """
+    Moves detection boxes from one frame to the next with sparse
+    Lucas-Kanade optical flow (cv2.calcOpticalFlowPyrLK).
+
+    A small grid of points inside each box is tracked forward and back;
+    each box is shifted by the median displacement of its reliable points.
+    """
+
+    def __init__(
+        self,
+        scale: float = 0.5,
+        grid: int = 3,
+        max_fb_error: float = 1.0,
+        win_size: int = 15
+    ):
+        """
+        Initialize the propagator.
+
+        Args:
+            scale: Downscale factor applied to frames before computing flow
+            grid: Points per box side (grid x grid points per box)
+            max_fb_error: Maximum forward-backward error (in scaled pixels) of a reliable point
+            win_size: Lucas-Kanade search window size
+        """
+        self.scale = scale
+        self.grid = grid
+        self.max_fb_error = max_fb_error
+        self.lk_params = dict(
+            winSize=(win_size, win_size),
+            maxLevel=3,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+        )
+
+        self._prev_gray: Optional[np.ndarray] = None
+        self.detections: Optional[Detections] = None
+        self.last_motion = 0.0  # Median box displacement of the last step (full-res pixels)
+
+    def _to_gray(self, frame: np.ndarray) -> np.ndarray:
+        """Convert a frame to a downscaled grayscale image."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def reset(self, frame: np.ndarray, detections: Detections):
+        """Start propagating from a keyframe and its detections."""
+        self._prev_gray = self._to_gray(frame)
+        self.detections = detections
+
+    def propagate(self, frame: np.ndarray) -> Detections:
+        """
+        Move the current boxes onto the next frame.
+
+        Returns:
+            Detections with shifted boxes (same classes and confidences)
+        """
+        gray = self._to_gray(frame)
+        detections = self.detections
+
+        if detections is None or len(detections) == 0 or self._prev_gray is None:
+            self._prev_gray = gray
+            self.last_motion = 0.0
+            return detections if detections is not None else Detections.empty()
+
+        # Grid of points inside each box (inset so points stay on the object)
+        n = len(detections)
+        steps = (np.arange(self.grid, dtype=np.float32) + 1) / (self.grid + 1)
+        gx, gy = np.meshgrid(steps, steps)
+        boxes = detections.xyxy * self.scale
+        sizes = boxes[:, 2:] - boxes[:, :2]
+        points = np.empty((n, self.grid * self.grid, 2), dtype=np.float32)
+        points[..., 0] = boxes[:, None, 0] + sizes[:, None, 0] * gx.ravel()
+        points[..., 1] = boxes[:, None, 1] + sizes[:, None, 1] * gy.ravel()
+        flat = points.reshape(-1, 1, 2)
+
+        forward, status_f, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, flat, None, **self.lk_params)
+        backward, status_b, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, forward, None, **self.lk_params)
+
+        fb_error = np.linalg.norm((flat - backward).reshape(-1, 2), axis=1)
+        valid = (status_f.ravel() == 1) & (status_b.ravel() == 1) & (fb_error < self.max_fb_error)
+
+        displacement = (forward - flat).reshape(n, -1, 2)
+        displacement[~valid.reshape(n, -1)] = np.nan
+        with warnings.catch_warnings():
+            # Boxes without any reliable point stay in place
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            shift = np.nanmedian(displacement, axis=1)
+        shift = np.nan_to_num(shift) / self.scale
+
+        moved = Detections.from_arrays(
+            detections.xyxy + np.tile(shift, 2),
+            detections.conf,
+            detections.class_id,
+            detections.class_names
+        )
+
+        self.last_motion = float(np.median(np.linalg.norm(shift, axis=1)))
+        self._prev_gray = gray
+        self.detections = moved
+        return moved
+
+
+class StridedDetection:
+    """
+    Runs the detector only on keyframes and propagates boxes in between.
+
+    With adaptive stride the keyframe interval follows observed motion: the
+    interval is chosen so boxes drift at most `max_drift` pixels between
+    keyframes, clamped to [min_stride, max_stride].
+    """
+
+    def __init__(
+        self,
+        stride: int = 4,
+        adaptive: bool = True,
+        min_stride: int = 1,
+        max_drift: float = 24.0,
+        propagator: Optional[FlowPropagator] = None
+    ):
+        """
+        Initialize strided detection.
+
+        Args:
+            stride: Keyframe interval (upper bound when adaptive)
+            adaptive: Adapt the interval to the observed motion
+            min_stride: Lower bound of the interval when adaptive
+            max_drift: Pixels boxes may move between keyframes when adaptive
+            propagator: Optical-flow propagator (default: FlowPropagator())
+        """
+        self.max_stride = max(1, stride)
+        self.min_stride = max(1, min(min_stride, self.max_stride))
+        self.adaptive = adaptive
+        self.max_drift = max_drift
+        self.propagator = propagator or FlowPropagator()
+
+        self.stride = self.max_stride
+        self._since_keyframe: Optional[int] = None
+        self._motion = 0.0
+
+        # Statistics
+        self.keyframes = 0
+        self.propagated = 0
+
+    def reset(self):
+        """Forget the current keyframe (e.g. when seeking or restarting)."""
+        self.stride = self.max_stride
+        self._since_keyframe = None
+        self._motion = 0.0
+        self.keyframes = 0
+        self.propagated = 0
+
+    def run(
+        self,
+        frames: List[np.ndarray],
+        detect_fn: Callable[[List[np.ndarray]], List[Detections]]
+    ) -> List[Detections]:
+        """
+        Get detections for consecutive frames.
+
+        Keyframes of the batch are sent to detect_fn in one call; the
+        remaining frames get propagated boxes.
+
+        Args:
+            frames: Consecutive frames as numpy arrays (BGR format)
+            detect_fn: Function running the detector on a list of frames
+
+        Returns:
+            One Detections result per frame
+        """
+        # Plan keyframes with the stride in effect for this batch
+        is_keyframe = []
+        since = self._since_keyframe
+        for _ in frames:
+            key = since is None or since + 1 >= self.stride
+            is_keyframe.append(key)
+            since = 0 if key else since + 1
+
+        keyframes = [f for f, key in zip(frames, is_keyframe) if key]
+        detected = iter(detect_fn(keyframes) if keyframes else [])
+
+        results = []
+        for frame, key in zip(frames, is_keyframe):
+            if key:
+                if self.adaptive and self._since_keyframe is not None:
+                    # Measure motion up to this keyframe so the stride can grow again
+                    self.propagator.propagate(frame)
+                    self._update_motion(self.propagator.last_motion)
+                detections = next(detected)
+                self.propagator.reset(frame, detections)
+                self._since_keyframe = 0
+                self.keyframes += 1
+            else:
+                detections = self.propagator.propagate(frame)
+                self._since_keyframe += 1
+                self.propagated += 1
+                self._update_motion(self.propagator.last_motion)
+            results.append(detections)
+
+        return results
+
+    def _update_motion(self, motion: float):
+        """Update the motion estimate and the adaptive stride."""
+        self._motion = 0.7 * self._motion + 0.3 * motion
+        if self.adaptive:
+            stride = int(self.max_drift / max(self._motion, 1e-3))
+            self.stride = int(np.clip(stride, self.min_stride, self.max_stride))
@@ -0,0 +1,256 @@
+"""
+INT8 Static Quantization
+Calibrates an INT8 ONNX model on frames of the user's video and compares it to fp32
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import cv2
+
+from .backends import get_backend
+from .detection_store import video_hash
+from .ops import LetterBox
+from .resolution import rect_shape
+
+
+def sample_frames(video_path: str, count: int = 32) -> List[np.ndarray]:
+    """Read `count` frames spread evenly over a video."""
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    indices = np.linspace(0, max(0, total - 1), num=min(count, max(1, total)), dtype=np.int64)
+
+    frames = []
+    for index in np.unique(indices):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(frame)
+    cap.release()
+    return frames
+
+
+def read_clip(video_path: str, start: int = 0, count: int = 300) -> List[np.ndarray]:
+    """Read up to `count` consecutive frames starting at `start`."""
+    cap = cv2.VideoCapture(video_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+class FrameCalibrationReader:
+    """
+    Calibration data reader for onnxruntime.quantization.quantize_static.
+
+    Feeds letterboxed video frames to the graph input one at a time
+    (implements the get_next()/rewind() protocol of CalibrationDataReader).
+    """
+
+    def __init__(self, frames: List[np.ndarray], input_name: str, input_shape):
+        letterbox = LetterBox(*input_shape)
+        # The letterbox reuses its blob, so each calibration input is copied out
+        self.inputs = [letterbox([frame])[0].copy() for frame in frames]
+        self.input_name = input_name
+        self._index = 0
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        if self._index >= len(self.inputs):
+            return None
+        blob = self.inputs[self._index]
+        self._index += 1
+        return {self.input_name: blob}
+
+    def rewind(self):
+        self._index = 0
+
+
+def quantize_onnx(
+    onnx_path: str,
+    output_path: str,
+    frames: List[np.ndarray],
+    input_shape,
+    per_channel: bool = True
+) -> str:
+    """
+    Statically quantize an ONNX graph to INT8 (QDQ format).
+
+    Args:
+        onnx_path: fp32 ONNX graph
+        output_path: Where the INT8 graph is written
+        frames: Calibration frames (BGR format)
+        input_shape: Network input (height, width) used for calibration
+        per_channel: Quantize weights per output channel
+
+    Returns:
+        output_path
+    """
+    import onnx
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+
+    input_name = onnx.load(onnx_path, load_external_data=False).graph.input[0].name
+    reader = FrameCalibrationReader(frames, input_name, input_shape)
+    quantize_static(
+        onnx_path,
+        output_path,
+        reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel
+    )
+    return output_path
+
+
+def quantize_for_video(detector, video_path: str, calibration_frames: int = 32) -> str:
+    """
+    Get an INT8 model of the detector's weights calibrated on a video.
+
+    The fp32 graph is exported through the model cache, and the INT8 graph
+    is cached per weights, video and input size.
+
+    Args:
+        detector: Loaded ObjectDetector
+        video_path: Video whose frames are used for calibration
+        calibration_frames: Number of frames sampled for calibration
+
+    Returns:
+        Path to the INT8 ONNX graph
+    """
+    # The ONNX Runtime backend resolves (and caches) the fp32 export
+    fp32 = get_backend("onnxruntime")(detector.weights_path, device="cpu", model_cache=detector.model_cache)
+
+    cap = cv2.VideoCapture(video_path)
+    frame_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    frame_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+
+    input_shape = detector.imgsz
+    if input_shape is None:
+        input_shape = rect_shape(frame_w, frame_h, fp32.default_size) if fp32.dynamic_shape else fp32.input_shape
+
+    def build(target_dir: str) -> dict:
+        frames = sample_frames(video_path, calibration_frames)
+        if not frames:
+            raise ValueError(f"Could not read calibration frames from {video_path}")
+        quantize_onnx(fp32.onnx_path, os.path.join(target_dir, "model_int8.onnx"), frames, input_shape)
+        return {
+            'artifact': "model_int8.onnx",
+            'video': os.path.abspath(video_path),
+            'calibration_frames': len(frames),
+            'names': {str(k): v for k, v in fp32.names.items()},
+        }
+
+    tag = f"int8-{video_hash(video_path)[:12]}"
+    entry = detector.model_cache.get_or_create(detector.weights_path, tag, list(input_shape), build)
+    return os.path.join(entry['path'], entry['artifact'])
+
+
+@dataclass
+class QuantizationReport:
+    """Latency and count comparison of an fp32 and an INT8 model on the same clip."""
+    frames: int
+    fp32_ms: float                      # Median latency per frame
+    int8_ms: float
+    fp32_detections: int                # Total detections over the clip
+    int8_detections: int
+    fp32_counts: Dict[str, int] = field(default_factory=dict)   # Line totals / zone entries
+    int8_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def speedup(self) -> float:
+        return self.fp32_ms / self.int8_ms if self.int8_ms > 0 else 0.0
+
+    def format(self) -> str:
+        """Format the report as a text table."""
+        rows = [
+            f"{'':<18}{'fp32':>10}{'int8':>10}{'delta':>10}",
+            f"{'Latency (ms)':<18}{self.fp32_ms:>10.1f}{self.int8_ms:>10.1f}{self.int8_ms - self.fp32_ms:>+10.1f}",
+            f"{'Detections':<18}{self.fp32_detections:>10}{self.int8_detections:>10}"
+            f"{self.int8_detections - self.fp32_detections:>+10}",
+        ]
+        for name, fp32_count in self.fp32_counts.items():
+            int8_count = self.int8_counts.get(name, 0)
+            rows.append(f"{name[:18]:<18}{fp32_count:>10}{int8_count:>10}{int8_count - fp32_count:>+10}")
+        rows.append(f"Speed-up: {self.speedup:.2f}x on {self.frames} frames")
+        return "\n".join(rows)
+
+
+def _run_clip(detector, frames, target_classes, lines, polygons):
+    """Detect and count on a clip; returns (median ms, detections, counts)."""
+    from .counter import ObjectCounter
+
+    counter = ObjectCounter()
+    counter.set_lines(lines or [])
+    counter.set_polygons(polygons or [])
+    counter.reset_counts()
+
+    detector.detect(frames[0], target_classes)  # Warm-up
+    latencies = []
+    total = 0
+    for frame in frames:
+        start = time.perf_counter()
+        detections = detector.detect(frame, target_classes)
+        latencies.append((time.perf_counter() - start) * 1000)
+        total += len(detections)
+        counter.update(detections, lines, polygons)
+
+    line_counts, zone_counts = counter.line_counts, counter.zone_counts
+    counts = {line.name: line_counts[line.id]['total'] for line in counter.lines}
+    counts.update({poly.name: zone_counts[poly.id]['entered'] for poly in counter.polygons})
+    return float(np.median(latencies)), total, counts
+
+
+def compare_models(
+    fp32_detector,
+    int8_detector,
+    frames: List[np.ndarray],
+    target_classes: Optional[List[int]] = None,
+    lines=None,
+    polygons=None,
+    progress: Optional[Callable[[str], None]] = None
+) -> QuantizationReport:
+    """
+    Run an fp32 and an INT8 detector over the same clip and compare them.
+
+    Args:
+        fp32_detector: Reference ObjectDetector
+        int8_detector: ObjectDetector loaded from the INT8 graph
+        frames: Consecutive frames of the clip
+        target_classes: Class filter applied to both models
+        lines: Counting lines used for the count comparison
+        polygons: Counting zones used for the count comparison
+        progress: Optional callback receiving status messages
+
+    Returns:
+        The comparison report
+    """
+    if not frames:
+        raise ValueError("No frames to compare on")
+
+    int8_detector.set_input_size(fp32_detector.imgsz)
+    int8_detector.update_confidence(fp32_detector.confidence)
+
+    if progress:
+        progress("Running fp32 model...")
+    fp32_ms, fp32_total, fp32_counts = _run_clip(fp32_detector, frames, target_classes, lines, polygons)
+    if progress:
+        progress("Running int8 model...")
+    int8_ms, int8_total, int8_counts = _run_clip(int8_detector, frames, target_classes, lines, polygons)
+
+    return QuantizationReport(
+        frames=len(frames),
+        fp32_ms=fp32_ms,
+        int8_ms=int8_ms,
+        fp32_detections=fp32_total,
+        int8_detections=int8_total,
+        fp32_counts=fp32_counts,
+        int8_counts=int8_counts
+    )
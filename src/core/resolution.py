@@ -0,0 +1,124 @@
+"""
+Adaptive Inference Resolution
+Picks rectangular, aspect-matched input shapes and tunes them to a target FPS
+"""
+
+import math
+from typing import Optional, Tuple
+
+
+def rect_shape(frame_w: int, frame_h: int, long_side: int, stride: int = 32) -> Tuple[int, int]:
+    """
+    Get the network input (height, width) matching a frame's aspect ratio.
+
+    The longer frame side maps to long_side; the shorter side is scaled by
+    the aspect ratio and rounded up to a multiple of stride, so a 16:9 frame
+    at 640 becomes 384x640 instead of being padded to 640x640.
+    """
+    long_side = max(stride, int(math.ceil(long_side / stride) * stride))
+    short = long_side * min(frame_w, frame_h) / max(frame_w, frame_h)
+    short = max(stride, int(math.ceil(short / stride) * stride))
+    if frame_w >= frame_h:
+        return short, long_side
+    return long_side, short
+
+
+class ResolutionController:
+    """
+    Chooses the inference input size per video and adjusts it at runtime.
+
+    The long side starts at base_size. When a target FPS is set, the long
+    side shrinks by one step while the smoothed FPS stays below the target
+    and grows back (up to base_size) when there is enough headroom.
+    """
+
+    def __init__(
+        self,
+        base_size: int = 640,
+        target_fps: float = 0.0,
+        min_size: int = 256,
+        stride: int = 32,
+        step: int = 64,
+        patience: int = 3
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            base_size: Long side of the input shape (also the upper bound)
+            target_fps: Processing FPS to aim for (0 = fixed size)
+            min_size: Smallest allowed long side
+            stride: Model stride; input sides are multiples of it
+            step: Change of the long side per adjustment
+            patience: Consecutive measurements needed before adjusting
+        """
+        self.base_size = base_size
+        self.target_fps = target_fps
+        self.min_size = min(min_size, base_size)
+        self.stride = stride
+        self.step = step
+        self.patience = patience
+
+        self.frame_size: Optional[Tuple[int, int]] = None
+        self.long_side = base_size
+        self.fps = 0.0
+        self._below = 0
+        self._above = 0
+
+    @property
+    def adaptive(self) -> bool:
+        """Whether the controller adjusts the size at runtime."""
+        return self.target_fps > 0
+
+    @property
+    def shape(self) -> Optional[Tuple[int, int]]:
+        """Current input (height, width), or None before configure()."""
+        if self.frame_size is None:
+            return None
+        return rect_shape(*self.frame_size, self.long_side, self.stride)
+
+    def configure(self, frame_w: int, frame_h: int) -> Tuple[int, int]:
+        """Start a new video and return its initial input shape."""
+        self.frame_size = (frame_w, frame_h)
+        self.long_side = self.base_size
+        self.fps = 0.0
+        self._below = 0
+        self._above = 0
+        return self.shape
+
+    def update(self, frames: int, elapsed: float) -> Optional[Tuple[int, int]]:
+        """
+        Report processing speed and adjust the input size.
+
+        Args:
+            frames: Number of frames processed in the measured interval
+            elapsed: Wall time of the interval in seconds
+
+        Returns:
+            The new input shape if it changed, otherwise None
+        """
+        if elapsed <= 0 or frames <= 0:
+            return None
+
+        fps = frames / elapsed
+        self.fps = fps if self.fps == 0 else 0.8 * self.fps + 0.2 * fps
+        if not self.adaptive:
+            return None
+
+        # Hysteresis: shrink below target, grow only with clear headroom
+        self._below = self._below + 1 if self.fps < self.target_fps * 0.95 else 0
+        self._above = self._above + 1 if self.fps > self.target_fps * 1.3 else 0
+
+        new_long = self.long_side
+        if self._below >= self.patience and self.long_side > self.min_size:
+            new_long = max(self.min_size, self.long_side - self.step)
+        elif self._above >= self.patience and self.long_side < self.base_size:
+            new_long = min(self.base_size, self.long_side + self.step)
+
+        if new_long == self.long_side:
+            return None
+
+        self.long_side = new_long
+        self._below = 0
+        self._above = 0
+        return self.shape
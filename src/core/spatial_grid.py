@@ -0,0 +1,128 @@
+"""
+Spatial Hash Grid
+Uniform grid of track positions for finding nearby track/detection pairs
+"""
+
+import itertools
+from typing import Dict, Set, Tuple
+import numpy as np
+
+# Class and cell coordinates are packed into one integer key as
+# (class_id * _ROW + cx) * _ROW + cy
+_ROW = 1 << 21
+_OFFSET = _ROW // 2     # Keeps slightly negative coordinates in range
+
+
+class SpatialGrid:
+    """
+    Buckets track IDs by class and by the grid cell of their center.
+
+    With the cell size equal to the matching distance, every point within
+    that distance of a detection lies in the detection's cell or one of its
+    8 neighbours, so only those cells of the detection's class are searched.
+    Buckets are kept up to date one track at a time as tracks are added,
+    moved and removed.
+    """
+
+    def __init__(self, cell_size: float):
+        """
+        Initialize an empty grid.
+
+        Args:
+            cell_size: Side of a cell in pixels (at least the search radius)
+        """
+        self.cell_size = max(1.0, float(cell_size))
+        self._cells: Dict[int, Set[int]] = {}
+        self._cell_of: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def _key(self, center: Tuple[float, float], class_id: int) -> int:
+        cx = int(center[0] // self.cell_size) + _OFFSET
+        cy = int(center[1] // self.cell_size) + _OFFSET
+        return (class_id * _ROW + cx) * _ROW + cy
+
+    def _keys(self, points: np.ndarray, class_ids: np.ndarray) -> np.ndarray:
+        cells = np.floor_divide(points, self.cell_size).astype(np.int64) + _OFFSET
+        return (class_ids.astype(np.int64) * _ROW + cells[:, 0]) * _ROW + cells[:, 1]
+
+    def add(self, track_id: int, center: Tuple[float, float], class_id: int = 0):
+        """Insert a track."""
+        key = self._key(center, class_id)
+        self._cells.setdefault(key, set()).add(track_id)
+        self._cell_of[track_id] = key
+
+    def move(self, track_id: int, center: Tuple[float, float], class_id: int = 0):
+        """Update the position of a track (buckets change only when it changes cell)."""
+        key = self._key(center, class_id)
+        old = self._cell_of.get(track_id)
+        if key == old:
+            return
+        if old is not None:
+            self._discard(track_id, old)
+        self._cells.setdefault(key, set()).add(track_id)
+        self._cell_of[track_id] = key
+
+    def remove(self, track_id: int):
+        """Remove a track."""
+        old = self._cell_of.pop(track_id, None)
+        if old is not None:
+            self._discard(track_id, old)
+
+    def _discard(self, track_id: int, key: int):
+        bucket = self._cells[key]
+        bucket.discard(track_id)
+        if not bucket:
+            del self._cells[key]
+
+    def clear(self):
+        """Remove all tracks."""
+        self._cells.clear()
+        self._cell_of.clear()
+
+    def candidates(self, points: np.ndarray, class_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the tracks of the same class in the 3x3 cell neighbourhood of each point.
+
+        Args:
+            points: (N, 2) array of x, y
+            class_ids: (N,) class of each point
+
+        Returns:
+            (track IDs, point indices) of the candidate pairs
+        """
+        if not self._cells or len(points) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # Flatten the buckets into cell-sorted arrays for vectorized lookups
+        cell_keys = np.fromiter(self._cells.keys(), dtype=np.int64, count=len(self._cells))
+        counts = np.fromiter(map(len, self._cells.values()), dtype=np.int64, count=len(self._cells))
+        members = np.fromiter(
+            itertools.chain.from_iterable(self._cells.values()), dtype=np.int64, count=len(self._cell_of)
+        )
+        starts = np.cumsum(counts) - counts
+        order = np.argsort(cell_keys)
+        cell_keys, counts, starts = cell_keys[order], counts[order], starts[order]
+
+        # Sorted queries make searchsorted much faster
+        point_keys = self._keys(points, class_ids)
+        point_order = np.argsort(point_keys)
+        point_keys = point_keys[point_order]
+
+        track_ids, point_idx = [], []
+        for dx, dy in itertools.product((-1, 0, 1), repeat=2):
+            neighbour = point_keys + (dx * _ROW + dy)
+            slot = np.minimum(np.searchsorted(cell_keys, neighbour), len(cell_keys) - 1)
+            hit = np.flatnonzero(cell_keys[slot] == neighbour)
+            if len(hit) == 0:
+                continue
+            n = counts[slot[hit]]
+            # Expand each hit into one pair per track in the cell
+            first = np.repeat(starts[slot[hit]] - (np.cumsum(n) - n), n)
+            track_ids.append(members[first + np.arange(n.sum())])
+            point_idx.append(np.repeat(point_order[hit], n))
+
+        if not track_ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(track_ids), np.concatenate(point_idx)
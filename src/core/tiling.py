@@ -0,0 +1,176 @@
+"""
+Tiled (Sliced) Inference
+Splits large frames into overlapping tiles and merges detections across seams
+"""
+
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .detections import Detections
+from .ops import nms
+
+
+def tile_grid(
+    frame_w: int,
+    frame_h: int,
+    tile_size: int = 640,
+    overlap: float = 0.2
+) -> np.ndarray:
+    """
+    Get overlapping, equally sized tiles covering a frame.
+
+    The last tile of each row/column is shifted back inside the frame, so
+    all tiles have the same size and can be sent to the model as one batch.
+
+    Returns:
+        (T, 4) int32 array of x1, y1, x2, y2 tiles
+    """
+    def starts(length: int) -> List[int]:
+        size = min(tile_size, length)
+        step = max(1, int(size * (1 - overlap)))
+        positions = list(range(0, max(1, length - size + 1), step))
+        if positions[-1] + size < length:
+            positions.append(length - size)
+        return positions
+
+    tw, th = min(tile_size, frame_w), min(tile_size, frame_h)
+    tiles = [(x, y, x + tw, y + th) for y in starts(frame_h) for x in starts(frame_w)]
+    return np.array(tiles, dtype=np.int32).reshape(-1, 4)
+
+
+def tiles_touching(tiles: np.ndarray, regions: Sequence[Tuple[int, int, int, int]]) -> np.ndarray:
+    """
+    Get a mask of the tiles overlapping any of the given regions.
+
+    Returns:
+        (T,) boolean mask
+    """
+    if len(regions) == 0:
+        return np.zeros(len(tiles), dtype=bool)
+
+    regions = np.asarray(regions, dtype=np.int32).reshape(-1, 4)
+    overlaps = (
+        (tiles[:, None, 0] < regions[None, :, 2]) & (tiles[:, None, 2] > regions[None, :, 0]) &
+        (tiles[:, None, 1] < regions[None, :, 3]) & (tiles[:, None, 3] > regions[None, :, 1])
+    )
+    return overlaps.any(axis=1)
+
+
+class TiledDetection:
+    """
+    Runs the detector on overlapping tiles instead of one downscaled frame.
+
+    Small, distant objects keep their native resolution. Tiles of all frames
+    in a batch go to the detector in a single call; duplicates along tile
+    seams are merged with class-aware NMS on intersection over the smaller box.
+    """
+
+    def __init__(
+        self,
+        tile_size: int = 640,
+        overlap: float = 0.2,
+        merge_threshold: float = 0.6,
+        full_frame: bool = True
+    ):
+        """
+        Initialize tiled detection.
+
+        Args:
+            tile_size: Side of the square tiles in frame pixels
+            overlap: Fraction of a tile shared with its neighbours
+            merge_threshold: Overlap above which boxes from different tiles are merged
+            full_frame: Also detect on the whole (downscaled) frame to catch
+                objects larger than a tile
+        """
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.merge_threshold = merge_threshold
+        self.full_frame = full_frame
+
+        self.tiles = np.zeros((0, 4), dtype=np.int32)
+        self.total_tiles = 0
+
+    def configure(
+        self,
+        frame_w: int,
+        frame_h: int,
+        regions: Optional[Sequence[Tuple[int, int, int, int]]] = None
+    ) -> int:
+        """
+        Lay out the tiles for a frame size.
+
+        Args:
+            frame_w: Frame width
+            frame_h: Frame height
+            regions: Boxes around counting geometry; tiles touching none of
+                them are skipped (None = keep all tiles)
+
+        Returns:
+            Number of active tiles
+        """
+        tiles = tile_grid(frame_w, frame_h, self.tile_size, self.overlap)
+        self.total_tiles = len(tiles)
+        if regions is not None:
+            tiles = tiles[tiles_touching(tiles, regions)]
+        self.tiles = tiles
+        return len(tiles)
+
+    def run(
+        self,
+        frames: List[np.ndarray],
+        detect_fn: Callable[[List[np.ndarray]], List[Detections]]
+    ) -> List[Detections]:
+        """
+        Get detections for frames from their tiles.
+
+        Args:
+            frames: Frames as numpy arrays (BGR format)
+            detect_fn: Function running the detector on a list of images
+
+        Returns:
+            One Detections result per frame, in frame coordinates
+        """
+        if not frames:
+            return []
+
+        per_frame = len(self.tiles) + int(self.full_frame)
+        if per_frame == 0:
+            return [Detections.empty() for _ in frames]
+
+        images = []
+        for frame in frames:
+            images.extend(frame[y1:y2, x1:x2] for x1, y1, x2, y2 in self.tiles)
+            if self.full_frame:
+                images.append(frame)
+
+        detected = detect_fn(images)
+        offsets = self.tiles[:, [0, 1, 0, 1]].astype(np.float32)
+
+        results = []
+        for i in range(len(frames)):
+            parts = detected[i * per_frame:(i + 1) * per_frame]
+            if len(self.tiles):
+                parts = [
+                    Detections.from_arrays(d.xyxy + offsets[t], d.conf, d.class_id, d.class_names)
+                    if len(d) else d
+                    for t, d in enumerate(parts[:len(self.tiles)])
+                ] + parts[len(self.tiles):]
+            sources = np.repeat(np.arange(len(parts)), [len(d) for d in parts])
+            results.append(self._merge(Detections.concatenate(parts), sources))
+        return results
+
+    def _merge(self, detections: Detections, sources: np.ndarray) -> Detections:
+        """
+        Merge duplicates of the same object found in several tiles.
+
+        Only boxes from different sources (tiles or the full frame) are
+        merged; overlapping boxes within one source are distinct objects
+        the model's own NMS already kept.
+        """
+        if len(detections) < 2:
+            return detections
+        keep = nms(
+            detections.xyxy, detections.conf, self.merge_threshold,
+            detections.class_id, max_det=len(detections), metric='ios', groups=sources
+        )
+        return detections[np.sort(keep)]
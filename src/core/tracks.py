@@ -0,0 +1,248 @@
+"""
+Track Table
+Struct-of-arrays storage of tracks with per-line and per-zone bitmasks
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+import numpy as np
+
+_BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+def pack_bits(mask: np.ndarray) -> np.ndarray:
+    """Pack a (K, N) boolean array into (K, ceil(N / 64)) uint64 words (at least one)."""
+    k, n = mask.shape
+    words = max(1, -(-n // 64))
+    padded = np.zeros((k, words * 64), dtype=bool)
+    padded[:, :n] = mask
+    return (padded.reshape(k, words, 64) * _BITS).sum(axis=2, dtype=np.uint64)
+
+
+def unpack_bits(bits: np.ndarray, n: int) -> np.ndarray:
+    """Unpack (K, W) uint64 words into a (K, n) boolean array."""
+    k, words = bits.shape
+    mask = (bits[:, :, None] & _BITS) != 0
+    return mask.reshape(k, words * 64)[:, :n]
+
+
+class TrackTable:
+    """
+    All tracks of a counter in parallel arrays, one row per track.
+
+    Rows are kept in increasing track ID order (new tracks always get the
+    largest IDs and pruning keeps the order), so IDs map to rows with
+    searchsorted. The side of every line, the lines already crossed and the
+    zones a track is in are bitmasks with one bit per line/zone, laid out in
+    the order of `line_ids` and `zone_ids`.
+    """
+
+    # Per-row arrays, all kept in the same row order
+    _ROW_FIELDS = ('ids', 'class_id', 'center', 'prev_center', 'has_prev', 'bbox', 'has_bbox',
+                   'conf', 'missing', 'side_pos', 'side_neg', 'crossed', 'in_zone')
+
+    def __init__(self):
+        self.line_ids: List[str] = []
+        self.zone_ids: List[str] = []
+        self.class_names: Dict[int, str] = {}
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def clear(self):
+        """Remove all tracks (the line/zone layout is kept)."""
+        line_words = max(1, -(-len(self.line_ids) // 64))
+        zone_words = max(1, -(-len(self.zone_ids) // 64))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.class_id = np.zeros(0, dtype=np.int32)
+        self.center = np.zeros((0, 2), dtype=np.int32)
+        self.prev_center = np.zeros((0, 2), dtype=np.int32)
+        self.has_prev = np.zeros(0, dtype=bool)
+        self.bbox = np.zeros((0, 4), dtype=np.int32)
+        self.has_bbox = np.zeros(0, dtype=bool)
+        self.conf = np.zeros(0, dtype=np.float32)
+        self.missing = np.zeros(0, dtype=np.int32)
+        self.side_pos = np.zeros((0, line_words), dtype=np.uint64)     # Last side > 0
+        self.side_neg = np.zeros((0, line_words), dtype=np.uint64)     # Last side < 0
+        self.crossed = np.zeros((0, line_words), dtype=np.uint64)
+        self.in_zone = np.zeros((0, zone_words), dtype=np.uint64)
+
+    def rows(self, ids) -> np.ndarray:
+        """Rows of the given track IDs (which must exist)."""
+        return np.searchsorted(self.ids, np.asarray(ids, dtype=np.int64))
+
+    def row(self, track_id: int) -> Optional[int]:
+        """Row of a track ID, or None if there is no such track."""
+        row = int(np.searchsorted(self.ids, track_id))
+        if row < len(self.ids) and self.ids[row] == track_id:
+            return row
+        return None
+
+    def add(
+        self,
+        ids: Sequence[int],
+        class_ids: np.ndarray,
+        centers: np.ndarray,
+        boxes: Optional[np.ndarray] = None,
+        confidences: Optional[np.ndarray] = None
+    ):
+        """Append new tracks (IDs larger than any existing one)."""
+        n = len(ids)
+        if n == 0:
+            return
+        new = {
+            'ids': np.asarray(ids, dtype=np.int64),
+            'class_id': np.asarray(class_ids, dtype=np.int32),
+            'center': np.asarray(centers, dtype=np.int32).reshape(n, 2),
+            'prev_center': np.zeros((n, 2), dtype=np.int32),
+            'has_prev': np.zeros(n, dtype=bool),
+            'bbox': np.zeros((n, 4), dtype=np.int32) if boxes is None else np.asarray(boxes, dtype=np.int32),
+            'has_bbox': np.full(n, boxes is not None),
+            'conf': np.zeros(n, dtype=np.float32) if confidences is None else np.asarray(confidences, dtype=np.float32),
+            'missing': np.zeros(n, dtype=np.int32),
+        }
+        for name in ('side_pos', 'side_neg', 'crossed', 'in_zone'):
+            bits = getattr(self, name)
+            new[name] = np.zeros((n, bits.shape[1]), dtype=np.uint64)
+        for name in self._ROW_FIELDS:
+            setattr(self, name, np.concatenate([getattr(self, name), new[name]]))
+
+    def move(self, rows: np.ndarray, centers: np.ndarray, boxes: np.ndarray, confidences: np.ndarray):
+        """Record new detections of existing tracks (the old center becomes the previous one)."""
+        self.prev_center[rows] = self.center[rows]
+        self.has_prev[rows] = True
+        self.center[rows] = centers
+        self.bbox[rows] = boxes
+        self.has_bbox[rows] = True
+        self.conf[rows] = confidences
+
+    def prune(self, max_missing: int) -> np.ndarray:
+        """Drop every track missing for more than max_missing frames; returns their IDs."""
+        expired = self.missing > max_missing
+        if not expired.any():
+            return np.zeros(0, dtype=np.int64)
+        removed = self.ids[expired]
+        for name in self._ROW_FIELDS:
+            setattr(self, name, getattr(self, name)[~expired])
+        return removed
+
+    def set_layout(self, line_ids: List[str], zone_ids: List[str]):
+        """Re-map the line and zone bits to new line/zone lists (matched by ID)."""
+        if line_ids != self.line_ids:
+            for name in ('side_pos', 'side_neg', 'crossed'):
+                setattr(self, name, self._remap(getattr(self, name), self.line_ids, line_ids))
+            self.line_ids = list(line_ids)
+        if zone_ids != self.zone_ids:
+            self.in_zone = self._remap(self.in_zone, self.zone_ids, zone_ids)
+            self.zone_ids = list(zone_ids)
+
+    @staticmethod
+    def _remap(bits: np.ndarray, old_ids: List[str], new_ids: List[str]) -> np.ndarray:
+        old = unpack_bits(bits, len(old_ids))
+        new = np.zeros((len(bits), len(new_ids)), dtype=bool)
+        position = {key: i for i, key in enumerate(old_ids)}
+        for j, key in enumerate(new_ids):
+            if key in position:
+                new[:, j] = old[:, position[key]]
+        return pack_bits(new)
+
+    def class_name(self, class_id: int) -> str:
+        return self.class_names.get(int(class_id), f"class_{int(class_id)}")
+
+
+class TrackedObject:
+    """
+    View of one track in a TrackTable.
+
+    Kept for API compatibility with code that used per-track objects; the
+    data lives in the table, so a view stays valid until its track is pruned.
+    """
+
+    __slots__ = ('_table', 'track_id')
+
+    def __init__(self, table: TrackTable, track_id: int):
+        self._table = table
+        self.track_id = track_id
+
+    @property
+    def _row(self) -> int:
+        row = self._table.row(self.track_id)
+        if row is None:
+            raise KeyError(f"Track {self.track_id} no longer exists")
+        return row
+
+    @property
+    def class_id(self) -> int:
+        return int(self._table.class_id[self._row])
+
+    @property
+    def class_name(self) -> str:
+        return self._table.class_name(self.class_id)
+
+    @property
+    def current_center(self) -> Tuple[int, int]:
+        return tuple(self._table.center[self._row].tolist())
+
+    @property
+    def previous_center(self) -> Optional[Tuple[int, int]]:
+        row = self._row
+        return tuple(self._table.prev_center[row].tolist()) if self._table.has_prev[row] else None
+
+    @property
+    def bbox(self) -> Optional[List[int]]:
+        row = self._row
+        return self._table.bbox[row].tolist() if self._table.has_bbox[row] else None
+
+    @property
+    def confidence(self) -> float:
+        return float(self._table.conf[self._row])
+
+    @property
+    def line_sides(self) -> Dict[str, int]:
+        row = slice(self._row, self._row + 1)
+        n = len(self._table.line_ids)
+        pos = unpack_bits(self._table.side_pos[row], n)[0]
+        neg = unpack_bits(self._table.side_neg[row], n)[0]
+        return {
+            line_id: 1 if p else -1
+            for line_id, p, q in zip(self._table.line_ids, pos, neg) if p or q
+        }
+
+    @property
+    def crossed_lines(self) -> Set[str]:
+        row = slice(self._row, self._row + 1)
+        crossed = unpack_bits(self._table.crossed[row], len(self._table.line_ids))[0]
+        return {line_id for line_id, c in zip(self._table.line_ids, crossed) if c}
+
+    @property
+    def in_zones(self) -> Set[str]:
+        row = slice(self._row, self._row + 1)
+        inside = unpack_bits(self._table.in_zone[row], len(self._table.zone_ids))[0]
+        return {zone_id for zone_id, z in zip(self._table.zone_ids, inside) if z}
+
+    def update_position(self, new_center: Tuple[int, int], bbox: List[int], confidence: float):
+        """Update object position."""
+        self._table.move(np.array([self._row]), [new_center], [bbox], [confidence])
+
+    def __repr__(self) -> str:
+        return (f"TrackedObject(track_id={self.track_id}, class_name={self.class_name!r}, "
+                f"current_center={self.current_center})")
+
+
+class TrackViews(Mapping):
+    """Read-only mapping of track ID -> TrackedObject view over a TrackTable."""
+
+    def __init__(self, table: TrackTable):
+        self._table = table
+
+    def __getitem__(self, track_id: int) -> TrackedObject:
+        if self._table.row(track_id) is None:
+            raise KeyError(track_id)
+        return TrackedObject(self._table, track_id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._table.ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self._table)
@@ -0,0 +1,296 @@
+"""
+Multi-Process Detector Pool
+Runs several detector processes fed through a shared-memory frame ring
+"""
+
+import inspect
+import itertools
+import math
+import multiprocessing as mp
+import os
+import queue
+from collections import deque
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+import numpy as np
+import cv2
+
+from .backends import get_backend
+from .detections import Detections
+
+
+class FrameRing:
+    """
+    Fixed number of frame-sized slots in shared memory.
+
+    Images are copied into a slot once by the producer; workers map the same
+    memory and read the slot in place, so frames are never pickled.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, name: Optional[str] = None):
+        """
+        Create a ring, or attach to an existing one when name is given.
+
+        Args:
+            slots: Number of slots
+            slot_bytes: Capacity of a slot in bytes (the largest image it can hold)
+            name: Shared memory block name of an existing ring
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=slots * slot_bytes)
+        self.buffer = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, slot: int, image: np.ndarray) -> Tuple[int, ...]:
+        """Copy an image into a slot and return its shape."""
+        if image.nbytes > self.slot_bytes:
+            raise ValueError(f"Image of {image.nbytes} bytes does not fit a {self.slot_bytes} byte slot")
+        np.copyto(self.buffer[slot, :image.nbytes].reshape(image.shape), image)
+        return image.shape
+
+    def read(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        """Get a view of the image stored in a slot."""
+        return self.buffer[slot, :int(np.prod(shape))].reshape(shape)
+
+    def close(self):
+        """Detach from the shared memory."""
+        self.buffer = None
+        self.shm.close()
+
+    def unlink(self):
+        """Free the shared memory (owner only)."""
+        self.shm.unlink()
+
+
+def _worker_main(ring_name, slots, slot_bytes, detector_kwargs, threads, tasks, results):
+    """Detector process: load a model, then serve tasks until None is received."""
+    # Split the cores between workers instead of letting every process use all of them
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    cv2.setNumThreads(threads)
+
+    from .detector import ObjectDetector
+
+    ring = FrameRing(slots, slot_bytes, name=ring_name)
+    try:
+        detector = ObjectDetector(**detector_kwargs)
+    except Exception as e:
+        results.put(('error', None, f"{type(e).__name__}: {e}"))
+        ring.close()
+        return
+    results.put(('ready', None, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        task_id, items, target_classes, confidence, imgsz = task
+        if imgsz != detector.imgsz:
+            detector.set_input_size(imgsz)
+
+        try:
+            images = [ring.read(slot, shape) for slot, shape in items]
+            detections = detector.detect_batch(images, target_classes, confidence)
+            results.put(('done', task_id, [(d.xyxy, d.conf, d.class_id) for d in detections]))
+        except Exception as e:
+            results.put(('error', task_id, f"{type(e).__name__}: {e}"))
+
+    ring.close()
+
+
+class DetectorPool:
+    """
+    Pool of detector processes with the same detect_batch() contract as
+    ObjectDetector.
+
+    Each worker process holds its own copy of the model. A batch is split
+    into one chunk per worker; results come back in any order and are put
+    back in frame order before they are returned.
+    """
+
+    def __init__(self, detector, workers: int = 2, slots_per_worker: int = 4):
+        """
+        Initialize the pool (processes are started by start()).
+
+        Args:
+            detector: Loaded ObjectDetector whose configuration the workers copy;
+                its confidence, input size and class names are followed at runtime
+            workers: Number of detector processes
+            slots_per_worker: Frame ring slots per worker
+        """
+        self.detector = detector
+        self.workers = max(1, workers)
+        self.slots = self.workers * max(1, slots_per_worker)
+
+        self.ring: Optional[FrameRing] = None
+        self._processes: List[mp.Process] = []
+        self._tasks = None
+        self._results = None
+        self._free_slots: List[int] = []
+        self._task_ids = itertools.count()
+
+    @property
+    def confidence(self) -> float:
+        return self.detector.confidence
+
+    @property
+    def class_names(self):
+        return self.detector.class_names
+
+    def _detector_kwargs(self, threads: int) -> dict:
+        """Constructor arguments reproducing the detector in a worker."""
+        options = dict(self.detector.backend_options)
+        backend_params = inspect.signature(get_backend(self.detector.backend)).parameters
+        if 'num_threads' in backend_params:
+            options.setdefault('num_threads', threads)
+        return dict(
+            weights_path=self.detector.weights_path,
+            classes_path=self.detector.classes_path,
+            confidence=self.detector.confidence,
+            device=self.detector.device,
+            backend=self.detector.backend,
+            cache_dir=self.detector.model_cache.cache_dir,
+            backend_options=options
+        )
+
+    def start(self, frame_w: int, frame_h: int, timeout: float = 300.0):
+        """
+        Start the workers and wait until every model is loaded.
+
+        Args:
+            frame_w: Width of the largest image that will be submitted
+            frame_h: Height of the largest image that will be submitted
+            timeout: Seconds to wait for the models to load
+        """
+        ctx = mp.get_context("spawn")  # Safe with Qt and running threads
+        self.ring = FrameRing(self.slots, frame_w * frame_h * 3)
+        self._free_slots = list(range(self.slots))
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        kwargs = self._detector_kwargs(threads)
+        for _ in range(self.workers):
+            process = ctx.Process(
+                target=_worker_main,
+                args=(self.ring.name, self.slots, self.ring.slot_bytes, kwargs, threads,
+                      self._tasks, self._results),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+        for _ in range(self.workers):
+            try:
+                status, _, message = self._results.get(timeout=timeout)
+            except queue.Empty:
+                self.shutdown()
+                raise RuntimeError("Detector workers did not start in time")
+            if status == 'error':
+                self.shutdown()
+                raise RuntimeError(f"Detector worker failed to load the model: {message}")
+
+    def _next_result(self):
+        """Wait for the next worker message, failing if a worker died."""
+        while True:
+            try:
+                return self._results.get(timeout=1.0)
+            except queue.Empty:
+                if not all(p.is_alive() for p in self._processes):
+                    raise RuntimeError("A detector worker exited unexpectedly")
+
+    def detect_batch(
+        self,
+        frames: List[np.ndarray],
+        target_classes: Optional[List[int]] = None,
+        confidence: Optional[float] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None
+    ) -> List[Detections]:
+        """
+        Run detection on several frames across the worker processes.
+
+        Arguments and results match ObjectDetector.detect_batch().
+        """
+        if not frames:
+            return []
+        if self.ring is None:
+            raise RuntimeError("DetectorPool.start() must be called first")
+
+        if confidence is None:
+            confidence = self.detector.confidence
+
+        images = list(frames)
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            images = [image[y1:y2, x1:x2] for image in images]
+        for image in images:
+            if image.nbytes > self.ring.slot_bytes:
+                raise ValueError(f"Image of {image.nbytes} bytes does not fit a {self.ring.slot_bytes} byte slot")
+
+        chunk = max(1, math.ceil(len(images) / self.workers))
+        pending = deque(range(len(images)))
+        in_flight = {}
+        outputs: List[Optional[tuple]] = [None] * len(images)
+        error = None
+
+        while pending or in_flight:
+            # Fill free ring slots with the next chunks
+            while pending and self._free_slots:
+                indices = [pending.popleft() for _ in range(min(chunk, len(pending), len(self._free_slots)))]
+                items = []
+                for index in indices:
+                    slot = self._free_slots.pop()
+                    items.append((slot, self.ring.write(slot, images[index])))
+                task_id = next(self._task_ids)
+                self._tasks.put((task_id, items, target_classes, confidence, self.detector.imgsz))
+                in_flight[task_id] = (indices, [slot for slot, _ in items])
+
+            status, task_id, payload = self._next_result()
+            if task_id not in in_flight:
+                continue
+            indices, slots = in_flight.pop(task_id)
+            self._free_slots.extend(slots)
+            if status == 'error':
+                # Submit nothing more, but collect the tasks still running so
+                # their slots are reclaimed and no late result is left queued
+                error = error or payload
+                pending.clear()
+                continue
+
+            # Results are placed by frame index, whatever order workers finish in
+            for index, output in zip(indices, payload):
+                outputs[index] = output
+
+        if error is not None:
+            raise RuntimeError(f"Detector worker failed: {error}")
+
+        offset = None
+        if roi is not None:
+            offset = np.array([x1, y1, x1, y1], dtype=np.float32)
+
+        results = []
+        for boxes, confidences, class_ids in outputs:
+            if offset is not None:
+                boxes = boxes + offset
+            results.append(Detections.from_arrays(boxes, confidences, class_ids, self.detector.class_names))
+        return results
+
+    def shutdown(self):
+        """Stop the workers and free the shared memory."""
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
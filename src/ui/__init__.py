@@ -1,15 +1,37 @@
 """
 UI components for Object Detection & Counting application.
+
+Submodules are imported lazily on first attribute access, so PyQt6 is only
+loaded when a UI component is actually used.
 """
 
-from .desktop_app import MainWindow, run_desktop_app
-from .widgets import VideoLabel
-from .styles import STYLESHEET, COLORS
-
-__all__ = [
-    "MainWindow",
-    "run_desktop_app",
-    "VideoLabel",
-    "STYLESHEET",
-    "COLORS",
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule that defines it
+_LAZY_ATTRS = {
+    "MainWindow": ".desktop_app",
+    "run_desktop_app": ".desktop_app",
+    "VideoLabel": ".widgets",
+    "STYLESHEET": ".styles",
+    "COLORS": ".styles",
+}
+
+if TYPE_CHECKING:
+    from .desktop_app import MainWindow, run_desktop_app
+    from .widgets import VideoLabel
+    from .styles import STYLESHEET, COLORS
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -6,6 +6,7 @@ PyQt6-based desktop UI with clean, professional design.
 import os
 import sys
 import cv2
+import numpy as np
 import threading
 import time
 from typing import Optional, List
@@ -23,7 +24,19 @@ from PyQt6.QtGui import QImage, QPixmap, QFont, QPainter, QColor, QPen, QBrush
 
 from .styles import STYLESHEET
 from .widgets import VideoLabel
-from ..core import ObjectDetector, draw_detections, DrawingCanvas, ObjectCounter
+from ..core import (
+    ObjectDetector, draw_detections, DrawingCanvas, ObjectCounter,
+    available_backends, preload_backend
+)
+from ..core.detection_store import DetectionStore
+from ..core.propagation import StridedDetection
+from ..core.resolution import ResolutionController, rect_shape
+from ..core.tiling import TiledDetection
+from ..core.motion import MotionGate
+from ..core.worker_pool import DetectorPool
+from ..core.quantization import quantize_for_video, compare_models, read_clip, sample_frames
+from ..core.autotune import AutoTuner, supports_threads, warmup
+from ..core.cascade import CascadeDetector
 
 
 class BarChartWidget(QWidget):
@@ -198,6 +211,45 @@ class MainWindow(QMainWindow):
         self._should_save_video = False
         self._last_output_path = None
         
+        # Processing settings (captured from UI when processing starts)
+        self._batch_size = 1
+        self._use_detection_store = True
+        self._detect_stride = 1
+        self._adaptive_stride = True
+        self._strided: Optional[StridedDetection] = None
+        self._input_size = 640
+        self._target_fps = 0
+        self.resolution: Optional[ResolutionController] = None
+        self._use_roi = False
+        self._roi_pad = 100
+        self._roi = None  # (x1, y1, x2, y2) crop sent to the detector
+        self._use_tiles = False
+        self._tile_size = 640
+        self._tiled: Optional[TiledDetection] = None
+        self._use_motion_gate = False
+        self._motion_method = "diff"
+        self._motion_gate: Optional[MotionGate] = None
+        self._workers = 1
+        self._pool: Optional[DetectorPool] = None
+        self._inference = None  # detector, worker pool or cascade used by the current run
+        self._use_cascade = False
+        self._cascade_weights = ""
+        self._cascade: Optional[CascadeDetector] = None
+        self._large_detector: Optional[ObjectDetector] = None
+        
+        # Per-video detection store (detect once, re-filter many times)
+        self.detection_store = DetectionStore()
+        
+        # Per-host tuned settings (backend, threads, input and batch size)
+        self.tuner = AutoTuner()
+        self._num_threads = 0
+        self._background_job = False  # Quantization or auto-tune using the detector
+        self._store_reader = None
+        self._store_recorder = None
+        
+        # Import the ML framework in the background once the window is up
+        QTimer.singleShot(0, self._preload_backend)
+        
         # Auto-load default video after UI is built
         QTimer.singleShot(500, self._auto_load_defaults)
     
@@ -264,6 +316,11 @@ class MainWindow(QMainWindow):
         self.video_status.setStyleSheet("color: #8b949e;")
         self.statusBar.addPermanentWidget(self.video_status)
         
+        # Inference input size and achieved FPS
+        self.perf_label = QLabel("Input: - | FPS: -")
+        self.perf_label.setStyleSheet("color: #a371f7;")
+        self.statusBar.addPermanentWidget(self.perf_label)
+        
         # Zoom level
         self.zoom_label = QLabel(f"Zoom: {self.zoom_level}%")
         self.zoom_label.setStyleSheet("color: #1f6feb;")
@@ -292,11 +349,20 @@ class MainWindow(QMainWindow):
         
         # Settings groups
         self._build_model_settings(s_layout)
+        self._build_performance_settings(s_layout)
         self._build_class_filter(s_layout)
         self._build_video_input(s_layout)
         
         s_layout.addStretch()
-        layout.addWidget(sidebar)
+        
+        # Scroll when the settings do not fit the window height
+        scroll = QScrollArea()
+        scroll.setWidget(sidebar)
+        scroll.setWidgetResizable(True)
+        scroll.setFixedWidth(316)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        scroll.setFrameShape(QFrame.Shape.NoFrame)
+        layout.addWidget(scroll)
     
     def _build_model_settings(self, layout):
         """Build model settings group."""
@@ -332,6 +398,51 @@ class MainWindow(QMainWindow):
         c_row.addWidget(c_btn)
         g_layout.addLayout(c_row)
         
+        # Inference backend
+        backend_row = QHBoxLayout()
+        backend_row.addWidget(QLabel("Backend:"))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(available_backends())
+        self.backend_combo.currentTextChanged.connect(self._preload_backend)
+        self.backend_combo.setToolTip(
+            "ultralytics: PyTorch | onnxruntime / opencv: exported ONNX graph (CPU friendly)\n"
+            "blobs: background subtraction for fixed cameras (no model, one class)"
+        )
+        backend_row.addWidget(self.backend_combo, 1)
+        g_layout.addLayout(backend_row)
+
+        # Size filter of the 'blobs' engine (area in frame pixels)
+        blob_row = QHBoxLayout()
+        blob_row.addWidget(QLabel("Blob Area:"))
+        self.blob_min_spin = QSpinBox()
+        self.blob_min_spin.setRange(1, 1000000)
+        self.blob_min_spin.setSingleStep(100)
+        self.blob_min_spin.setValue(400)
+        self.blob_min_spin.setToolTip("Smallest blob area in pixels ('blobs' backend)")
+        blob_row.addWidget(self.blob_min_spin)
+        blob_row.addWidget(QLabel("-"))
+        self.blob_max_spin = QSpinBox()
+        self.blob_max_spin.setRange(0, 10000000)
+        self.blob_max_spin.setSingleStep(1000)
+        self.blob_max_spin.setValue(0)
+        self.blob_max_spin.setSpecialValueText("Any")
+        self.blob_max_spin.setToolTip("Largest blob area in pixels ('blobs' backend)")
+        blob_row.addWidget(self.blob_max_spin)
+        g_layout.addLayout(blob_row)
+
+        # Cascade: a larger model re-scores uncertain boxes and boxes near lines/zones
+        cascade_row = QHBoxLayout()
+        self.cascade_check = QCheckBox("Cascade:")
+        self.cascade_check.setToolTip(
+            "Re-score uncertain boxes and boxes near lines/zones with a larger model\n"
+            "(must use the same classes as the main model)"
+        )
+        cascade_row.addWidget(self.cascade_check)
+        self.cascade_edit = QLineEdit()
+        self.cascade_edit.setPlaceholderText("yolov8l.pt")
+        cascade_row.addWidget(self.cascade_edit)
+        g_layout.addLayout(cascade_row)
+        
         # Confidence slider
         conf_row = QHBoxLayout()
         conf_row.addWidget(QLabel("Confidence:"))
@@ -345,12 +456,182 @@ class MainWindow(QMainWindow):
         self.conf_slider.setValue(50)
         self.conf_slider.valueChanged.connect(self._on_conf_change)
         g_layout.addWidget(self.conf_slider)
-        
+
         # Load button
         self.load_btn = QPushButton("Load Model")
         self.load_btn.setProperty("class", "blue")
         self.load_btn.clicked.connect(self._load_model)
         g_layout.addWidget(self.load_btn)
+
+        # INT8 quantization calibrated on the loaded video
+        self.quantize_btn = QPushButton("Quantize INT8")
+        self.quantize_btn.setToolTip(
+            "Build an INT8 model calibrated on frames of the loaded video (ONNX Runtime)\n"
+            "and compare its speed and counts against the current model"
+        )
+        self.quantize_btn.clicked.connect(self._quantize_model)
+        g_layout.addWidget(self.quantize_btn)
+        
+        layout.addWidget(group)
+    
+    def _build_performance_settings(self, layout):
+        """Build inference performance settings group."""
+        group = QGroupBox("Performance")
+        g_layout = QVBoxLayout(group)
+        g_layout.setSpacing(6)
+        
+        # Batch size (frames per forward pass)
+        batch_row = QHBoxLayout()
+        batch_row.addWidget(QLabel("Batch Size:"))
+        self.batch_spin = QSpinBox()
+        self.batch_spin.setRange(1, 16)
+        self.batch_spin.setValue(1)
+        self.batch_spin.setToolTip("Frames sent to the model per forward pass")
+        batch_row.addWidget(self.batch_spin)
+        batch_row.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(1)
+        self.workers_spin.setToolTip(
+            "Detector processes, each with its own model copy\n"
+            "(frames are shared with them through shared memory)"
+        )
+        batch_row.addWidget(self.workers_spin)
+        g_layout.addLayout(batch_row)
+
+        # Inference input size (long side, aspect-matched) and FPS target
+        size_row = QHBoxLayout()
+        size_row.addWidget(QLabel("Input Size:"))
+        self.imgsz_spin = QSpinBox()
+        self.imgsz_spin.setRange(256, 1280)
+        self.imgsz_spin.setSingleStep(32)
+        self.imgsz_spin.setValue(640)
+        self.imgsz_spin.setToolTip("Long side of the network input; the short side follows the video aspect ratio")
+        size_row.addWidget(self.imgsz_spin)
+        size_row.addWidget(QLabel("FPS:"))
+        self.target_fps_spin = QSpinBox()
+        self.target_fps_spin.setRange(0, 120)
+        self.target_fps_spin.setValue(0)
+        self.target_fps_spin.setSpecialValueText("Off")
+        self.target_fps_spin.setToolTip("Target processing FPS; the input size is lowered/raised at runtime to hit it")
+        size_row.addWidget(self.target_fps_spin)
+        g_layout.addLayout(size_row)
+
+        # Detection stride (keyframes + optical-flow propagation)
+        stride_row = QHBoxLayout()
+        stride_row.addWidget(QLabel("Detect Every:"))
+        self.stride_spin = QSpinBox()
+        self.stride_spin.setRange(1, 16)
+        self.stride_spin.setValue(1)
+        self.stride_spin.setSuffix(" fr")
+        self.stride_spin.setToolTip(
+            "Run the detector every N frames and carry boxes forward\n"
+            "with optical flow in between (1 = detect every frame)"
+        )
+        stride_row.addWidget(self.stride_spin)
+        self.adaptive_stride_check = QCheckBox("Adaptive")
+        self.adaptive_stride_check.setChecked(True)
+        self.adaptive_stride_check.setToolTip("Lower the interval when objects move fast")
+        stride_row.addWidget(self.adaptive_stride_check)
+        g_layout.addLayout(stride_row)
+
+        # Detection store
+        self.reuse_dets_check = QCheckBox("Reuse Stored Detections")
+        self.reuse_dets_check.setChecked(True)
+        self.reuse_dets_check.setToolTip(
+            "Detect each video once; later runs only re-filter the stored\n"
+            "detections by confidence and class (lines/zones can change freely)"
+        )
+        g_layout.addWidget(self.reuse_dets_check)
+
+        # Region of interest around drawn lines/zones
+        roi_row = QHBoxLayout()
+        self.roi_check = QCheckBox("ROI Only")
+        self.roi_check.setToolTip(
+            "Run detection only on the area around the drawn lines and zones\n"
+            "(objects outside it are not tracked)"
+        )
+        roi_row.addWidget(self.roi_check)
+        roi_row.addWidget(QLabel("Pad:"))
+        self.roi_pad_spin = QSpinBox()
+        self.roi_pad_spin.setRange(0, 500)
+        self.roi_pad_spin.setSingleStep(10)
+        self.roi_pad_spin.setValue(100)
+        self.roi_pad_spin.setSuffix(" px")
+        roi_row.addWidget(self.roi_pad_spin)
+        g_layout.addLayout(roi_row)
+
+        # Tiled inference for high-resolution sources
+        tile_row = QHBoxLayout()
+        self.tiles_check = QCheckBox("Tiles")
+        self.tiles_check.setToolTip(
+            "Detect on overlapping tiles at native resolution (for small objects\n"
+            "in 4K video); tiles away from lines/zones (plus Pad) are skipped"
+        )
+        tile_row.addWidget(self.tiles_check)
+        tile_row.addWidget(QLabel("Size:"))
+        self.tile_size_spin = QSpinBox()
+        self.tile_size_spin.setRange(320, 1280)
+        self.tile_size_spin.setSingleStep(32)
+        self.tile_size_spin.setValue(640)
+        self.tile_size_spin.setSuffix(" px")
+        tile_row.addWidget(self.tile_size_spin)
+        g_layout.addLayout(tile_row)
+
+        # Motion gate (skip the detector while the counting area is static)
+        motion_row = QHBoxLayout()
+        self.motion_check = QCheckBox("Skip Static Frames")
+        self.motion_check.setToolTip(
+            "Skip detection while nothing moves around the lines/zones;\n"
+            "the previous detections are carried forward"
+        )
+        motion_row.addWidget(self.motion_check)
+        self.motion_method_combo = QComboBox()
+        self.motion_method_combo.addItems(["diff", "mog2"])
+        self.motion_method_combo.setToolTip("Frame differencing or MOG2 background subtraction")
+        motion_row.addWidget(self.motion_method_combo)
+        g_layout.addLayout(motion_row)
+
+        # Tracker motion model and track assignment
+        match_row = QHBoxLayout()
+        match_row.addWidget(QLabel("Tracker:"))
+        self.tracker_combo = QComboBox()
+        self.tracker_combo.addItems(["centroid", "kalman", "bytetrack"])
+        self.tracker_combo.setToolTip(
+            "Match detections against each track's last position (centroid),\n"
+            "its constant-velocity prediction (kalman, keeps fast objects), or the\n"
+            "predicted box by IoU, keeping occluded objects with low-confidence\n"
+            "boxes that cannot start new tracks (bytetrack)"
+        )
+        match_row.addWidget(self.tracker_combo)
+        match_row.addWidget(QLabel("Matching:"))
+        self.assignment_combo = QComboBox()
+        self.assignment_combo.addItems(["greedy", "optimal"])
+        self.assignment_combo.setToolTip(
+            "How detections are matched to tracks: nearest pairs first (greedy) or the\n"
+            "lowest total distance per cluster of nearby objects (optimal, fewer ID\n"
+            "swaps in dense traffic)"
+        )
+        match_row.addWidget(self.assignment_combo)
+        g_layout.addLayout(match_row)
+
+        # Hardware auto-tuning
+        tune_row = QHBoxLayout()
+        self.tune_btn = QPushButton("Auto-Tune")
+        self.tune_btn.setToolTip(
+            "Time backends, threads, input and batch sizes on this machine and keep\n"
+            "the largest input size that reaches the FPS target (per host and model)"
+        )
+        self.tune_btn.clicked.connect(self._auto_tune)
+        tune_row.addWidget(self.tune_btn)
+        self.use_tuned_check = QCheckBox("Use Tuned")
+        self.use_tuned_check.setChecked(False)
+        self.use_tuned_check.setToolTip(
+            "Apply this machine's tuned settings (backend, threads, input and batch size)\n"
+            "when a model is loaded, replacing the ones selected above"
+        )
+        tune_row.addWidget(self.use_tuned_check)
+        g_layout.addLayout(tune_row)
         
         layout.addWidget(group)
     
@@ -1012,6 +1293,147 @@ class MainWindow(QMainWindow):
     
     # ==================== Event Handlers ====================
     
+    def _preload_backend(self, *_):
+        """Import the selected backend's framework in a background thread."""
+        backend = self.backend_combo.currentText()
+        threading.Thread(target=preload_backend, args=(backend,), daemon=True).start()
+    
+    def _set_background_job(self, running: bool):
+        """Block processing and model loads while a background job uses the detector."""
+        self._background_job = running
+        for button in (self.process_btn, self.load_btn, self.quantize_btn, self.tune_btn):
+            button.setEnabled(not running)
+    
+    def _quantize_model(self):
+        """Quantize the loaded model on the current video and report the difference."""
+        if not self.detector:
+            QMessageBox.warning(self, "Warning", "Load a model first!")
+            return
+        if not self.video_path:
+            QMessageBox.warning(self, "Warning", "Load a video first (frames are used for calibration)!")
+            return
+        if self.processing or self._background_job:
+            return
+        
+        # Calibrate and compare at the processing size; the detector's own
+        # size is restored afterwards
+        frame_w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        frame_h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        previous_size = self.detector.imgsz
+        self.detector.set_input_size(
+            ResolutionController(self.imgsz_spin.value()).configure(frame_w, frame_h)
+        )
+        
+        self._set_background_job(True)
+        self.status_msg.setText("Calibrating INT8 model...")
+        self.status_msg.setStyleSheet("color: #ffa500;")
+        
+        detector = self.detector
+        video_path = self.video_path
+        classes = self.selected_classes
+        lines = list(self.drawing_canvas.lines)
+        polygons = list(self.drawing_canvas.polygons)
+        
+        def run():
+            try:
+                int8_path = quantize_for_video(detector, video_path)
+                int8 = ObjectDetector(
+                    int8_path, detector.classes_path, detector.confidence, backend="onnxruntime"
+                )
+                report = compare_models(
+                    detector, int8, read_clip(video_path, 0, 300), classes, lines, polygons
+                )
+                QTimer.singleShot(0, lambda: self._on_quantization_done(int8, report, None))
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                message = f"{type(e).__name__}: {e}"
+                QTimer.singleShot(0, lambda: self._on_quantization_done(None, None, message))
+            finally:
+                detector.set_input_size(previous_size)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _on_quantization_done(self, int8_detector, report, error):
+        """Show the fp32/INT8 comparison and optionally switch to the INT8 model."""
+        self._set_background_job(False)
+        if error:
+            self.status_msg.setText("INT8 quantization failed")
+            self.status_msg.setStyleSheet("color: #f85149;")
+            QMessageBox.critical(self, "Quantization Failed", error)
+            return
+        
+        self.status_msg.setText(f"INT8 model ready ({report.speedup:.2f}x)")
+        self.status_msg.setStyleSheet("color: #7ee787;")
+        
+        box = QMessageBox(self)
+        box.setWindowTitle("INT8 vs FP32")
+        box.setText("Use the INT8 model for processing?")
+        box.setDetailedText(report.format())
+        box.setInformativeText(
+            f"Latency {report.fp32_ms:.1f} ms -> {report.int8_ms:.1f} ms "
+            f"({report.speedup:.2f}x), detections {report.fp32_detections} -> "
+            f"{report.int8_detections} on {report.frames} frames"
+        )
+        box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if box.exec() == QMessageBox.StandardButton.Yes:
+            self.detector = int8_detector
+            self.status_msg.setText("Using INT8 model (onnxruntime)")
+    
+    def _auto_tune(self):
+        """Benchmark configurations on this machine and apply the best one."""
+        if not self.detector:
+            QMessageBox.warning(self, "Warning", "Load a model first!")
+            return
+        if self.processing or self._background_job:
+            return
+        
+        self._set_background_job(True)
+        self.status_msg.setText("Auto-tuning...")
+        self.status_msg.setStyleSheet("color: #ffa500;")
+        
+        detector = self.detector
+        video_path = self.video_path
+        target_fps = self.target_fps_spin.value()
+        
+        def progress(message):
+            QTimer.singleShot(0, lambda: self.status_msg.setText(f"Tuning: {message}"))
+        
+        def run():
+            try:
+                frames = sample_frames(video_path, 16) if video_path else []
+                if not frames:
+                    rng = np.random.default_rng(0)
+                    frames = [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(16)]
+                best, _ = self.tuner.calibrate(detector, frames, target_fps, progress=progress)
+                QTimer.singleShot(0, lambda: self._on_tuning_done(best, target_fps))
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                QTimer.singleShot(0, lambda: self._on_tuning_done(None, target_fps))
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _on_tuning_done(self, best, target_fps):
+        """Apply the tuned setting by reloading the model."""
+        self._set_background_job(False)
+        if best is None:
+            self.status_msg.setText("Auto-tune failed: no configuration could run")
+            self.status_msg.setStyleSheet("color: #f85149;")
+            return
+        
+        self.backend_combo.setCurrentText(best.backend)
+        self.imgsz_spin.setValue(best.input_size)
+        self.batch_spin.setValue(best.batch_size)
+        self._num_threads = best.threads
+        self._load_model()
+        
+        met = "meets" if best.fps >= target_fps else "below"
+        self.status_msg.setText(
+            f"Tuned: {best.backend}, {best.threads or 'auto'} threads, size {best.input_size}, "
+            f"batch {best.batch_size} - {best.fps:.1f} FPS ({met} target)"
+        )
+    
     def _on_conf_change(self, value):
         """Handle confidence slider change."""
         self.conf_label.setText(f"{value}%")
@@ -1230,7 +1652,7 @@ class MainWindow(QMainWindow):
     def _browse_weights(self):
         """Browse for weights file."""
         path, _ = QFileDialog.getOpenFileName(
-            self, "Select Weights", "", "PyTorch Model (*.pt)"
+            self, "Select Weights", "", "Model Weights (*.pt *.onnx)"
         )
         if path:
             self.weights_edit.setText(path)
@@ -1286,16 +1708,47 @@ class MainWindow(QMainWindow):
     
     def _load_model(self):
         """Load the YOLO model."""
+        if self._background_job:
+            return
         weights = self.weights_edit.text().strip() or "yolov8n.pt"
         classes = self.classes_edit.text().strip() or None
         conf = self.conf_slider.value() / 100.0
         
+        # With Use Tuned, settings tuned for this host and model override the current ones
+        tuning = self.tuner.load(weights) if self.use_tuned_check.isChecked() else None
+        tuned_note = ""
+        if tuning is not None and tuning.backend in available_backends():
+            self.backend_combo.setCurrentText(tuning.backend)
+            self.imgsz_spin.setValue(tuning.input_size)
+            self.batch_spin.setValue(tuning.batch_size)
+            self._num_threads = tuning.threads
+            tuned_note = (
+                f" - tuned: {tuning.backend}, {tuning.threads or 'auto'} threads, "
+                f"size {tuning.input_size}, batch {tuning.batch_size}"
+            )
+        backend = self.backend_combo.currentText()
+        
         self.status_msg.setText("Loading model...")
         self.status_msg.setStyleSheet("color: #ffa500;")
         QApplication.processEvents()
         
         try:
-            self.detector = ObjectDetector(weights, classes, conf)
+            options = {}
+            if self._num_threads and supports_threads(backend):
+                options['num_threads'] = self._num_threads
+            if backend == "blobs":
+                options['min_area'] = self.blob_min_spin.value()
+                options['max_area'] = self.blob_max_spin.value()
+            self.detector = ObjectDetector(weights, classes, conf, backend=backend, backend_options=options)
+            
+            # Warm up at the size processing will use (avoids a slow first frame)
+            if self.cap:
+                frame_w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                frame_h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            else:
+                frame_w, frame_h = 1280, 720
+            self.detector.set_input_size(rect_shape(frame_w, frame_h, self.imgsz_spin.value()))
+            warmup(self.detector, frame_w, frame_h, self.batch_spin.value())
             
             # Populate class list with checkboxes
             self.class_list.clear()
@@ -1315,7 +1768,7 @@ class MainWindow(QMainWindow):
             self.selected_classes = None
             self._update_class_count()
             
-            self.status_msg.setText(f"Model loaded: {num_classes} classes")
+            self.status_msg.setText(f"Model loaded ({backend}): {num_classes} classes{tuned_note}")
             self.status_msg.setStyleSheet("color: #7ee787;")
             
         except Exception as e:
@@ -1532,16 +1985,35 @@ class MainWindow(QMainWindow):
         if not self.detector:
             QMessageBox.warning(self, "Warning", "Load a model first!")
             return
+        if self._background_job:
+            return
         
         self.processing = True
         self.stop_flag = False
         
-        # Capture save setting before thread starts (UI access must be in main thread)
+        # Capture settings before thread starts (UI access must be in main thread)
         self._should_save_video = self.save_video_check.isChecked()
+        self._batch_size = self.batch_spin.value()
+        self._use_detection_store = self.reuse_dets_check.isChecked()
+        self._detect_stride = self.stride_spin.value()
+        self._adaptive_stride = self.adaptive_stride_check.isChecked()
+        self._input_size = self.imgsz_spin.value()
+        self._target_fps = self.target_fps_spin.value()
+        self._use_roi = self.roi_check.isChecked()
+        self._roi_pad = self.roi_pad_spin.value()
+        self._use_tiles = self.tiles_check.isChecked()
+        self._tile_size = self.tile_size_spin.value()
+        self._use_motion_gate = self.motion_check.isChecked()
+        self._motion_method = self.motion_method_combo.currentText()
+        self._workers = self.workers_spin.value()
+        self._use_cascade = self.cascade_check.isChecked()
+        self._cascade_weights = self.cascade_edit.text().strip() or "yolov8l.pt"
         
         # Reset video to start
         self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
         
+        self.counter.assignment = self.assignment_combo.currentText()
+        self.counter.tracker = self.tracker_combo.currentText()
         self.counter.reset()
         self.progress.setValue(0)
         self.progress_label.setText("0%")
@@ -1682,9 +2154,11 @@ class MainWindow(QMainWindow):
         
         video_writer = None
         self._last_output_path = None
+        completed = False
         
         try:
-            total = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            video_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            total = video_frames
             if total <= 0:
                 total = 1
             frame_count = 0
@@ -1707,49 +2181,156 @@ class MainWindow(QMainWindow):
                 else:
                     print(f"Video writer opened: {self._last_output_path}")
             
+            batch_size = max(1, self._batch_size)
+            
+            # Engines with per-video state (background models) need every frame, in order
+            self.detector.reset_state()
+            stateful = self.detector.model.stateful
+            
+            # Aspect-matched input shape, optionally tuned to the target FPS
+            frame_w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            frame_h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            
+            # Only the region around lines and zones is sent to the detector
+            self._roi = None
+            if self._use_roi and not self._use_tiles:
+                roi = self.drawing_canvas.get_roi(self._roi_pad)
+                if roi is not None and roi[2] > roi[0] and roi[3] > roi[1]:
+                    self._roi = roi
+            
+            # Tiles at native resolution, limited to the area around lines/zones
+            self._tiled = None
+            if self._use_tiles and not stateful:
+                self._tiled = TiledDetection(self._tile_size)
+                regions = self.drawing_canvas.get_regions(self._roi_pad)
+                self._tiled.configure(frame_w, frame_h, regions or None)
+                tile_w, tile_h = min(self._tile_size, frame_w), min(self._tile_size, frame_h)
+                self.resolution = ResolutionController(self._tile_size, self._target_fps)
+                self.detector.set_input_size(self.resolution.configure(tile_w, tile_h))
+            elif self._roi is not None:
+                # Keep the pixel density of the full-frame setting on the crop
+                x1, y1, x2, y2 = self._roi
+                roi_w, roi_h = x2 - x1, y2 - y1
+                base = max(64, int(self._input_size * max(roi_w, roi_h) / max(frame_w, frame_h)))
+                self.resolution = ResolutionController(base, self._target_fps)
+                self.detector.set_input_size(self.resolution.configure(roi_w, roi_h))
+            else:
+                self.resolution = ResolutionController(self._input_size, self._target_fps)
+                self.detector.set_input_size(self.resolution.configure(frame_w, frame_h))
+            
+            # Replay stored detections or record them on this run
+            self._open_detection_store()
+            
+            # Detector worker processes (one chunk of each batch per worker)
+            self._inference = self.detector
+            if self._workers > 1 and self._store_reader is None and not stateful:
+                self._pool = DetectorPool(self.detector, self._workers)
+                self._pool.start(frame_w, frame_h)
+                self._inference = self._pool
+                batch_size = max(batch_size, self._workers)
+            
+            # Cascade: the loaded model everywhere, the large model on selected crops
+            self._cascade = None
+            if self._use_cascade and self._store_reader is None and not stateful:
+                self._cascade = CascadeDetector(self._inference, self._get_large_detector())
+                self._cascade.set_geometry(self.drawing_canvas.get_segments())
+                self._inference = self._cascade
+            
+            # Motion gate on the area around lines/zones (whole frame if none)
+            self._motion_gate = None
+            if self._use_motion_gate and self._store_reader is None and not stateful:
+                self._motion_gate = MotionGate(method=self._motion_method)
+                roi = self.drawing_canvas.get_roi(self._roi_pad)
+                if roi is not None and not (roi[2] > roi[0] and roi[3] > roi[1]):
+                    roi = None
+                self._motion_gate.reset(roi)
+            
+            # Keyframe detection with optical-flow propagation in between
+            self._strided = None
+            if self._detect_stride > 1 and self._store_reader is None and not stateful:
+                self._strided = StridedDetection(self._detect_stride, self._adaptive_stride)
+            
             while self.processing and not self.stop_flag:
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
-                
-                self.current_frame = frame
-                frame_count += 1
-                
-                # Calculate progress
-                percent = int((frame_count / total) * 100)
+                # Read up to batch_size frames
+                frames = []
+                while len(frames) < batch_size:
+                    ret, frame = self.cap.read()
+                    if not ret:
+                        break
+                    frames.append(frame)
                 
-                # Detect objects
-                detections = self.detector.detect(frame, self.selected_classes)
-                
-                # Update counts
-                self.counter.update(
-                    detections,
-                    self.drawing_canvas.lines,
-                    self.drawing_canvas.polygons
-                )
-                
-                # Draw results (pass None for color_map, not class_names)
-                result = draw_detections(frame, detections, None)
-                
-                # Draw lines/polygons with counts
-                counts = self.counter.get_all_counts()
-                result = self.drawing_canvas.draw_on_frame(result, show_labels=True, counts=counts)
+                if not frames:
+                    break
                 
-                # Write frame to video if saving
-                if video_writer is not None:
-                    video_writer.write(result)
+                # Detect objects on the whole batch in one forward pass (only
+                # this is timed: the input size can't speed up the rest)
+                detect_start = time.perf_counter()
+                batch_detections = self._detect_frames(frames, frame_count)
+                detect_time = time.perf_counter() - detect_start
+                self.counter.high_confidence = self.detector.confidence
                 
-                # Store frames for display and emit signal
-                self._orig_frame = frame.copy()
-                self._result_frame = result.copy()
-                self.progress_signal.emit(frame_count, total, percent)
+                for frame, detections in zip(frames, batch_detections):
+                    if self.stop_flag:
+                        break
+                    
+                    self.current_frame = frame
+                    frame_count += 1
+                    
+                    # Calculate progress
+                    percent = int((frame_count / total) * 100)
+                    
+                    # Update counts
+                    self.counter.update(
+                        detections,
+                        self.drawing_canvas.lines,
+                        self.drawing_canvas.polygons,
+                        self.drawing_canvas.get_zone_mask()
+                    )
+                    
+                    # Draw results (pass None for color_map, not class_names);
+                    # low-confidence boxes kept for tracking are not shown
+                    if self.counter.tracker == "bytetrack":
+                        detections = detections.filter(self.detector.confidence)
+                    result = draw_detections(frame, detections, None)
+                    
+                    # Draw lines/polygons with counts
+                    counts = self.counter.get_all_counts()
+                    result = self.drawing_canvas.draw_on_frame(result, show_labels=True, counts=counts)
+                    
+                    # Write frame to video if saving
+                    if video_writer is not None:
+                        video_writer.write(result)
+                    
+                    # Store frames for display and emit signal (neither is
+                    # modified after this point, so no copies are needed)
+                    self._orig_frame = frame
+                    self._result_frame = result
+                    self.progress_signal.emit(frame_count, total, percent)
+                    
+                    time.sleep(0.01)
                 
-                time.sleep(0.01)
+                # Adjust the input size towards the target detection FPS
+                new_shape = self.resolution.update(len(frames), detect_time)
+                if new_shape is not None:
+                    self.detector.set_input_size(new_shape)
+            
+            completed = not self.stop_flag
             
         except Exception as e:
             import traceback
             traceback.print_exc()
         finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            if self._store_recorder is not None:
+                # Only complete recordings can be replayed
+                if completed:
+                    if self._store_recorder.finish(frame_count, video_frames) is None:
+                        print(f"Detections not stored: {frame_count} of {video_frames} frames read")
+                else:
+                    self._store_recorder.abort()
+                self._store_recorder = None
             if video_writer is not None:
                 video_writer.release()
                 print(f"Video saved successfully: {self._last_output_path}")
@@ -1757,6 +2338,101 @@ class MainWindow(QMainWindow):
         self.processing = False
         QTimer.singleShot(0, lambda: self._on_processing_done())
     
+    def _open_detection_store(self):
+        """Open stored detections for the current video/model or start recording."""
+        self._store_reader = None
+        self._store_recorder = None
+        
+        if not self._use_detection_store or not self.video_path or self._tiled is not None \
+                or self._use_cascade:
+            return
+        
+        model_id = self.detector.model_id
+        imgsz = self.detector.imgsz
+        frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._store_reader = self.detection_store.open(self.video_path, model_id, imgsz, frames)
+        
+        # Only full-frame runs that detect every frame at a fixed input size can be recorded
+        adaptive_size = self.resolution is not None and self.resolution.adaptive
+        if self._roi is not None:
+            # A cropped run is not recorded, but can replay a full-frame recording
+            if self._store_reader is None:
+                self._store_reader = self.detection_store.open(
+                    self.video_path, model_id, self._full_frame_imgsz(), frames
+                )
+            return
+        if self._store_reader is None and self._detect_stride <= 1 and not adaptive_size \
+                and not self._use_motion_gate:
+            self._store_recorder = self.detection_store.recorder(self.video_path, model_id, imgsz)
+    
+    def _get_large_detector(self):
+        """Load (or reuse) the cascade's large model with the current backend."""
+        large = self._large_detector
+        if large is None or large.weights_path != self._cascade_weights \
+                or large.backend != self.detector.backend:
+            large = ObjectDetector(
+                self._cascade_weights, self.detector.classes_path, self.detector.confidence,
+                backend=self.detector.backend, backend_options=self.detector.backend_options
+            )
+            self._large_detector = large
+        return large
+    
+    def _full_frame_imgsz(self):
+        """Input shape a full-frame run of the current video would use."""
+        frame_w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        frame_h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return ResolutionController(self._input_size).configure(frame_w, frame_h)
+    
+    def _detect_frames(self, frames, first_index):
+        """Get detections for a batch of frames (runs in background thread)."""
+        confidence = self.detector.confidence
+        if self.counter.tracker == "bytetrack":
+            # Low-confidence boxes are needed to keep occluded tracks alive
+            confidence = min(confidence, self.counter.low_confidence)
+        
+        # Stored run: filter recorded detections, no inference
+        if self._store_reader is not None:
+            batch = [
+                self._store_reader.get(
+                    first_index + i, confidence, self.selected_classes, self.detector.class_names
+                )
+                for i in range(len(frames))
+            ]
+            if self._roi is not None:
+                batch = [d.in_region(self._roi) for d in batch]
+            return batch
+        
+        def detect(images):
+            if self._tiled is not None:
+                return self._tiled.run(
+                    images, lambda tiles: self._inference.detect_batch(tiles, self.selected_classes, confidence)
+                )
+            return self._inference.detect_batch(images, self.selected_classes, confidence, roi=self._roi)
+        
+        def detect_moving(images):
+            # Keyframe run: detect every N frames, propagate boxes in between
+            if self._strided is not None:
+                return self._strided.run(images, detect)
+            return detect(images)
+        
+        # Gated run: static frames reuse the previous detections
+        if self._motion_gate is not None:
+            return self._motion_gate.run(frames, detect_moving)
+        
+        if self._strided is not None:
+            return detect_moving(frames)
+        
+        # Recording run: detect everything at the floor confidence, then filter
+        if self._store_recorder is not None:
+            batch = self._inference.detect_batch(
+                frames, None, self.detection_store.floor_confidence
+            )
+            for detections in batch:
+                self._store_recorder.append(detections)
+            return [d.filter(confidence, self.selected_classes) for d in batch]
+        
+        return detect(frames)
+    
     def _on_progress_update(self, frame_count, total, percent):
         """Handle progress update signal (runs in main thread)."""
         # Update progress bar and label
@@ -1786,8 +2462,14 @@ class MainWindow(QMainWindow):
                 f"{int(total_sec//60):02d}:{int(total_sec%60):02d}"
             )
         
+        # Update input size / FPS display
+        if self.resolution is not None and self.resolution.shape is not None:
+            h, w = self.resolution.shape
+            self.perf_label.setText(f"Input: {w}x{h} | Detect FPS: {self.resolution.fps:.1f}")
+        
         # Update status message
-        self.status_msg.setText(f"Processing... {percent}%")
+        source = " (stored detections)" if self._store_reader is not None else ""
+        self.status_msg.setText(f"Processing{source}... {percent}%")
         self.status_msg.setStyleSheet("color: #ffa500;")
         
         # Update video displays with counts
@@ -1812,7 +2494,19 @@ class MainWindow(QMainWindow):
             self.output_path_label.setText(f"Output: {self._last_output_path}")
             QMessageBox.information(self, "Video Saved", f"Output saved to:\n{self._last_output_path}")
         else:
-            self.status_msg.setText("Processing complete!")
+            message = "Processing complete!"
+            if self._strided is not None:
+                detected = self._strided.keyframes
+                frames = detected + self._strided.propagated
+                message += f" Detector ran on {detected}/{frames} frames"
+            if self._tiled is not None:
+                message += f" ({len(self._tiled.tiles)}/{self._tiled.total_tiles} tiles)"
+            if self._cascade is not None:
+                message += f" Large model refined {self._cascade.refined}/{self._cascade.candidates} boxes"
+            if self._motion_gate is not None:
+                gate = self._motion_gate
+                message += f" Skipped {gate.skipped}/{gate.checked} static frames"
+            self.status_msg.setText(message)
         self.status_msg.setStyleSheet("color: #7ee787;")
     
     def _update_ui(self, orig, result, pos, total):
@@ -1851,18 +2545,19 @@ class MainWindow(QMainWindow):
     
     def _update_counts(self):
         """Update counts display with chart and text."""
-        # Get counts for chart
+        # Get counts for chart (each property builds its dict from the count arrays)
         chart_data = {}
+        line_counts, zone_counts = self.counter.line_counts, self.counter.zone_counts
         
         # Line counts (in/out/total)
         for line in self.drawing_canvas.lines:
-            lc = self.counter.line_counts.get(line.id, {})
+            lc = line_counts.get(line.id, {})
             total = lc.get('total', 0)
             chart_data[line.name] = total
         
         # Zone counts (current occupancy)
         for poly in self.drawing_canvas.polygons:
-            zc = self.counter.zone_counts.get(poly.id, {})
+            zc = zone_counts.get(poly.id, {})
             count = zc.get('count', 0)
             chart_data[poly.name] = count
         
@@ -1872,13 +2567,13 @@ class MainWindow(QMainWindow):
         # Update detailed text
         lines_text = []
         for line in self.drawing_canvas.lines:
-            lc = self.counter.line_counts.get(line.id, {})
+            lc = line_counts.get(line.id, {})
             lines_text.append(f"{line.name}:")
             lines_text.append(f"  In: {lc.get('in', 0)}  Out: {lc.get('out', 0)}")
             lines_text.append(f"  Total: {lc.get('total', 0)}")
         
         for poly in self.drawing_canvas.polygons:
-            zc = self.counter.zone_counts.get(poly.id, {})
+            zc = zone_counts.get(poly.id, {})
             lines_text.append(f"{poly.name}:")
             lines_text.append(f"  Current: {zc.get('count', 0)}")
             lines_text.append(f"  Entered: {zc.get('entered', 0)}")
@@ -0,0 +1,145 @@
+"""
+ObjectCounter regression scenarios with hand-computed track IDs, positions and counts
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.counter import ObjectCounter  # noqa: E402
+from src.core.detections import Detections  # noqa: E402
+from src.core.drawing_tools import CountingLine, CountingPolygon  # noqa: E402
+
+NAMES = {0: "car", 1: "person", 2: "bus"}
+
+
+def frame(*objects):
+    """Detections for (x, y, class_id) centers with 20 px boxes."""
+    if not objects:
+        return Detections.empty()
+    centers = np.array([(x, y) for x, y, _ in objects], dtype=np.float32)
+    boxes = np.concatenate([centers - 10, centers + 10], axis=1)
+    classes = np.array([c for _, _, c in objects])
+    return Detections.from_arrays(boxes, np.ones(len(objects)), classes, NAMES)
+
+
+def traffic():
+    """
+    Three objects over 13 frames, against a vertical line at x=100 and a zone x=150..250:
+
+    - A (car, y=50) moves right 20 px/frame from x=60, lands on the line
+      at frame 2, crosses it at frame 3, is occluded at frame 4 and is
+      picked up again at frame 5 (40 px away); it is in the zone for
+      frames 5-9 and leaves it at frame 10.
+    - B (person, y=150) moves left from x=300, enters the zone at frame 3,
+      disappears for frames 5-7 (pruned at frame 7 while in the zone),
+      comes back as a new track at frame 8, lands on the line at frame 10
+      and crosses it at frame 11.
+    - C (car, stationary at 50, 180) is reported as a bus from frame 6,
+      which starts a new track; the car track is pruned at frame 8.
+    """
+    for f in range(13):
+        objects = []
+        if f != 4:
+            objects.append((60 + 20 * f, 50, 0))
+        if f <= 4 or f >= 8:
+            objects.append((300 - 20 * f, 150, 1))
+        objects.append((50, 180, 0 if f < 6 else 2))
+        yield f, frame(*objects)
+
+
+@pytest.fixture
+def counter():
+    counter = ObjectCounter(max_distance=50, max_frames_missing=2)
+    counter.set_lines([CountingLine("line", (100, 0), (100, 200))])
+    counter.set_polygons([CountingPolygon("zone", [(150, 0), (250, 0), (250, 200), (150, 200)])])
+    counter.reset_counts()
+    return counter
+
+
+@pytest.mark.parametrize("assignment", ["greedy", "optimal"])
+def test_traffic_ids_positions_and_counts(counter, assignment):
+    counter.assignment = assignment
+    snapshots = {}
+    for f, detections in traffic():
+        tracks = counter.update(detections)
+        snapshots[f] = {tid: (t.current_center, t.previous_center, t.class_name) for tid, t in tracks.items()}
+
+    # IDs in detection order on the first frame
+    assert snapshots[0] == {1: ((60, 50), None, "car"), 2: ((300, 150), None, "person"), 3: ((50, 180), None, "car")}
+
+    # Occluded A keeps its last position, then is matched again
+    assert snapshots[4][1] == ((120, 50), (100, 50), "car")
+    assert snapshots[5][1] == ((160, 50), (120, 50), "car")
+
+    # Class change starts track 4; B is pruned at frame 7, the car track C at frame 8
+    assert set(snapshots[6]) == {1, 2, 3, 4}
+    assert set(snapshots[7]) == {1, 3, 4}
+    assert set(snapshots[8]) == {1, 4, 5}
+    assert snapshots[8][5] == ((140, 150), None, "person")
+
+    # Final state
+    assert snapshots[12] == {
+        1: ((300, 50), (280, 50), "car"),
+        4: ((50, 180), (50, 180), "bus"),
+        5: ((60, 150), (80, 150), "person"),
+    }
+    assert counter.frames_missing == {1: 0, 4: 0, 5: 0}
+
+    assert counter.line_counts == {"line": {"in": 1, "out": 1, "total": 2}}
+    assert counter.line_class_counts == {"line": {"car": {"in": 1, "out": 0}, "person": {"in": 0, "out": 1}}}
+
+    # B was pruned inside the zone, so it never exits
+    assert counter.zone_counts == {"zone": {"count": 0, "entered": 2, "exited": 1}}
+    assert counter.zone_class_counts == {"zone": {"car": 0, "person": 1}}
+
+
+def test_occupancy_while_in_zone(counter):
+    for f, detections in traffic():
+        counter.update(detections)
+        if f == 6:
+            # A at 180 and the missing B (last seen at 220) are both inside
+            assert counter.zone_counts["zone"]["count"] == 2
+            assert counter.tracked_objects[2].in_zones == {"zone"}
+
+
+def test_layout_change_keeps_bits_by_id():
+    l1 = CountingLine("l1", (100, 0), (100, 200))
+    l2 = CountingLine("l2", (200, 0), (200, 200))
+    z1 = CountingPolygon("z1", [(0, 0), (150, 0), (150, 200), (0, 200)])
+    z2 = CountingPolygon("z2", [(180, 0), (260, 0), (260, 200), (180, 200)])
+
+    counter = ObjectCounter(max_distance=50)
+    counter.set_lines([l1, l2])
+    counter.set_polygons([z1, z2])
+    counter.reset_counts()
+
+    # Right along y=50: crosses l1 at 120 and l2 at 220, z1 -> z2
+    for x in (60, 80, 100, 120, 140, 160, 180, 200, 220):
+        counter.update(frame((x, 50, 0)))
+    track = counter.tracked_objects[1]
+    assert track.crossed_lines == {"l1", "l2"}
+    assert track.in_zones == {"z2"}
+
+    # Remove the first line and zone: the remaining bits follow their IDs
+    counter.update(frame((180, 50, 0)), lines=[l2], polygons=[z2])
+    assert track.crossed_lines == {"l2"}
+    assert track.line_sides == {"l2": -1}
+    assert track.in_zones == {"z2"}
+    # Crossing l2 back is not counted again and staying in z2 is not a new entry
+    assert counter.line_counts["l2"] == {"in": 1, "out": 0, "total": 1}
+    assert counter.zone_counts["z2"] == {"count": 1, "entered": 1, "exited": 0}
+
+    # Re-added l1 starts fresh for the track; removed geometry keeps its counts
+    counter.update(frame((140, 50, 0)), lines=[l1, l2])
+    assert track.crossed_lines == {"l2"}
+    assert counter.zone_counts["z2"] == {"count": 0, "entered": 1, "exited": 1}
+    counter.update(frame((110, 50, 0)))
+    counter.update(frame((90, 50, 0)))
+    assert track.crossed_lines == {"l1", "l2"}
+    assert counter.line_counts["l1"] == {"in": 1, "out": 1, "total": 2}
+    assert counter.zone_counts["z1"] == {"count": 0, "entered": 1, "exited": 1}
@@ -0,0 +1,73 @@
+"""
+Detection store: only complete recordings are published and replayed, within the LRU limits
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.detection_store import DetectionStore  # noqa: E402
+from src.core.detections import Detections  # noqa: E402
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"not really a video")
+    return str(path)
+
+
+def _detections(k):
+    boxes = np.array([[k, k, k + 10, k + 10]], dtype=np.float32)
+    return Detections.from_arrays(boxes, np.array([0.5]), np.array([k % 3]))
+
+
+def _record(store, video, model_id, frames, frames_read=None, video_frames=0):
+    recorder = store.recorder(video, model_id)
+    for k in range(frames):
+        recorder.append(_detections(k))
+    return recorder.finish(frames if frames_read is None else frames_read, video_frames)
+
+
+def test_complete_recording_replays(tmp_path, video):
+    store = DetectionStore(str(tmp_path / "store"))
+    assert _record(store, video, "m", 5, video_frames=5) is not None
+
+    recording = store.open(video, "m", frames=5)
+    assert len(recording) == 5
+    assert recording.get(3).xyxy.tolist() == [[3, 3, 13, 13]]
+    assert recording.get(3, confidence=0.6).xyxy.shape == (0, 4)
+
+
+def test_incomplete_recordings_are_not_published(tmp_path, video):
+    store = DetectionStore(str(tmp_path / "store"))
+    # Fewer frames recorded than read, or fewer than the container reports
+    assert _record(store, video, "m", 4, frames_read=5) is None
+    assert _record(store, video, "m", 4, video_frames=5) is None
+    assert store.open(video, "m") is None
+    assert store.entries() == []
+    assert os.listdir(store.root) == []
+
+
+def test_short_recordings_are_rejected(tmp_path, video):
+    store = DetectionStore(str(tmp_path / "store"))
+    _record(store, video, "m", 4)
+    assert store.open(video, "m", frames=4) is not None
+    assert store.open(video, "m", frames=5) is None
+
+
+def test_lru_eviction(tmp_path, video):
+    store = DetectionStore(str(tmp_path / "store"), max_entries=2)
+    _record(store, video, "a", 3)
+    _record(store, video, "b", 3)
+    assert store.open(video, "a") is not None     # Now more recent than b
+    _record(store, video, "c", 3)
+
+    assert store.open(video, "b") is None
+    assert store.open(video, "a") is not None
+    assert store.open(video, "c") is not None
+    assert len(store.entries()) == 2
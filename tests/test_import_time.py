@@ -0,0 +1,92 @@
+"""
+Import-time budget: the app's imports must not load the ML frameworks and must stay fast
+"""
+
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once a backend is actually used
+HEAVY_MODULES = ("torch", "ultralytics", "onnxruntime")
+
+# Import time allowed on top of the third-party modules the code needs anyway, in seconds
+BUDGET = 0.25
+
+# Repeats per measurement; the fastest run is used to keep the test stable
+REPEATS = 3
+
+CORE_IMPORT = "from src.core import ObjectDetector, ObjectCounter, DrawingCanvas"
+CORE_BASELINE = "import numpy, cv2"
+UI_IMPORT = "from src.ui.desktop_app import MainWindow"
+UI_BASELINE = "import numpy, cv2, PyQt6.QtCore, PyQt6.QtGui, PyQt6.QtWidgets"
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+requires_qt = pytest.mark.skipif(importlib.util.find_spec("PyQt6") is None, reason="PyQt6 not installed")
+
+
+def _importtime(code: str):
+    """
+    Run code with -X importtime.
+
+    Returns:
+        (names of all imported modules, total import time in seconds)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules, total = set(), 0
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        modules.add(match.group(4))
+        if len(match.group(3)) == 1:    # Top-level import: count its cumulative time
+            total += int(match.group(2))
+    return modules, total / 1e6
+
+
+def _overhead(code: str, baseline: str) -> float:
+    """Import time of code beyond the time of the baseline imports (best of REPEATS)."""
+    best = min(_importtime(code)[1] for _ in range(REPEATS))
+    base = min(_importtime(baseline)[1] for _ in range(REPEATS))
+    return best - base
+
+
+def _heavy(modules):
+    return sorted(name for name in modules if name.split('.')[0] in HEAVY_MODULES)
+
+
+def test_package_import_skips_heavy_modules():
+    modules, _ = _importtime("import src.core, src.ui")
+    assert not _heavy(modules), f"Heavy modules imported at package import: {_heavy(modules)}"
+    assert not any(name.startswith("PyQt6") for name in modules), "PyQt6 imported by import src.ui"
+
+
+def test_core_import_skips_heavy_modules():
+    modules, _ = _importtime(CORE_IMPORT)
+    assert not _heavy(modules), f"Heavy modules imported by {CORE_IMPORT!r}: {_heavy(modules)}"
+
+
+def test_core_import_within_budget():
+    overhead = _overhead(CORE_IMPORT, CORE_BASELINE)
+    assert overhead < BUDGET, f"{CORE_IMPORT!r} took {overhead:.3f}s beyond numpy/cv2 (budget {BUDGET}s)"
+
+
+@requires_qt
+def test_ui_import_skips_heavy_modules():
+    modules, _ = _importtime(UI_IMPORT)
+    assert not _heavy(modules), f"Heavy modules imported by {UI_IMPORT!r}: {_heavy(modules)}"
+
+
+@requires_qt
+def test_ui_import_within_budget():
+    overhead = _overhead(UI_IMPORT, UI_BASELINE)
+    assert overhead < BUDGET, f"{UI_IMPORT!r} took {overhead:.3f}s beyond numpy/cv2/PyQt6 (budget {BUDGET}s)"
@@ -0,0 +1,137 @@
+"""
+Line crossing edge cases: segment endpoints, landing on a line and counting once per track
+"""
+
+import os
+import sys
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.counter import ObjectCounter  # noqa: E402
+from src.core.detections import Detections  # noqa: E402
+from src.core.drawing_tools import CountingLine  # noqa: E402
+from src.core.ops import line_sides, segment_crossings  # noqa: E402
+
+# Vertical line from (100, 0) to (100, 200); its positive ('in') side is x > 100
+SEGMENT = np.array([[100, 0, 100, 200]], dtype=np.float64)
+
+
+def crossings(start, end, start_sides=None):
+    starts = np.array([start], dtype=np.float64)
+    ends = np.array([end], dtype=np.float64)
+    if start_sides is not None:
+        start_sides = np.array([[start_sides]], dtype=np.int8)
+    i, _, directions = segment_crossings(starts, ends, SEGMENT, start_sides=start_sides)
+    return directions.tolist() if len(i) else []
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ((50, 100), (150, 100), [1]),       # Through the middle, ending on the positive side
+    ((150, 100), (50, 100), [-1]),
+    ((50, -10), (150, -10), []),        # Beyond the first endpoint
+    ((50, 210), (150, 210), []),        # Beyond the second endpoint
+    ((50, -100), (150, 100), [1]),      # Meets the line at y=0: touches the endpoint exactly
+    ((50, 300), (150, 100), [1]),       # Meets the line at y=200
+    ((50, -102), (150, 100), []),       # Misses the endpoint by one pixel
+    ((50, 100), (100, 100), []),        # Lands on the line: not a crossing yet
+    ((100, 100), (150, 100), []),       # Leaves the line without a known side
+    ((100, 50), (100, 150), []),        # Moves along the line
+])
+def test_segment_crossings(start, end, expected):
+    assert crossings(start, end) == expected
+
+
+def test_start_side_from_memory():
+    # Leaving the line to the other side is a crossing, back to the same side is not
+    assert crossings((100, 100), (150, 100), start_sides=-1) == [1]
+    assert crossings((100, 100), (50, 100), start_sides=1) == [-1]
+    assert crossings((100, 100), (50, 100), start_sides=-1) == []
+    assert crossings((100, 100), (150, 100), start_sides=1) == []
+
+
+def _reference(start, end, segment):
+    """Exact intersection of the open motion segment with the closed line segment, or None."""
+    (px, py), (qx, qy) = start, end
+    x1, y1, x2, y2 = segment
+    rx, ry, sx, sy = qx - px, qy - py, x2 - x1, y2 - y1
+    denom = rx * sy - ry * sx
+    if denom == 0:
+        return None
+    t = Fraction((x1 - px) * sy - (y1 - py) * sx, denom)
+    u = Fraction((x1 - px) * ry - (y1 - py) * rx, denom)
+    if 0 < t < 1 and 0 <= u <= 1:
+        return 1 if sy * qx - sx * qy + (x2 * y1 - x1 * y2) > 0 else -1
+    return None
+
+
+def test_segment_crossings_match_exact_intersection():
+    rng = np.random.default_rng(0)
+    # A small integer grid makes endpoint touches and collinear cases common
+    starts = rng.integers(-3, 4, (400, 2))
+    ends = rng.integers(-3, 4, (400, 2))
+    segments = rng.integers(-3, 4, (30, 4))
+    segments = segments[(segments[:, :2] != segments[:, 2:]).any(axis=1)]
+
+    i, j, directions = segment_crossings(starts, ends, segments)
+    found = {(a, b): d for a, b, d in zip(i.tolist(), j.tolist(), directions.tolist())}
+
+    expected = {}
+    for a in range(len(starts)):
+        for b in range(len(segments)):
+            direction = _reference(starts[a].tolist(), ends[a].tolist(), segments[b].tolist())
+            if direction is not None:
+                expected[a, b] = direction
+    assert found == expected
+
+    sides = line_sides(ends, segments)
+    assert all(sides[a, b] == d for (a, b), d in found.items())
+
+
+def _counter():
+    counter = ObjectCounter(max_distance=300)
+    counter.set_lines([CountingLine("line", (100, 0), (100, 200))])
+    counter.reset_counts()
+    return counter
+
+
+def _run(counter, path):
+    for x, y in path:
+        box = np.array([[x - 5, y - 5, x + 5, y + 5]], dtype=np.float32)
+        counter.update(Detections.from_arrays(box, np.ones(1), np.zeros(1, dtype=np.int64), {0: "car"}))
+    return counter.line_counts["line"]
+
+
+@pytest.mark.parametrize("path, expected", [
+    ([(50, 100), (100, 100), (150, 100)], (1, 0)),              # Lands on the line, leaves to the other side
+    ([(50, 100), (100, 100), (50, 100)], (0, 0)),               # Lands on the line, goes back
+    ([(150, 100), (100, 100), (100, 120), (50, 120)], (0, 1)),  # Slides along the line before leaving
+    ([(50, -10), (150, -10)], (0, 0)),                          # Passes beyond the endpoint
+    ([(50, -100), (150, 100)], (1, 0)),                         # Touches the endpoint
+    ([(50, 100), (150, 100), (50, 100), (150, 100)], (1, 0)),   # Counted once per line per track
+])
+def test_counter_crossings(path, expected):
+    counts = _run(_counter(), path)
+    assert (counts["in"], counts["out"]) == expected
+
+
+def test_once_per_line_per_track():
+    counter = _counter()
+    counter.max_frames_missing = 1
+    counter.set_lines([
+        CountingLine("line", (100, 0), (100, 200)),
+        CountingLine("second", (130, 0), (130, 200)),
+    ])
+    _run(counter, [(50, 100), (150, 100), (50, 100)])
+    assert counter.line_counts["line"] == {"in": 1, "out": 0, "total": 1}
+    assert counter.line_counts["second"] == {"in": 1, "out": 0, "total": 1}
+
+    # Once the track is dropped, a new track crossing the same line is counted again
+    counter.update(Detections.empty())
+    counter.update(Detections.empty())
+    assert len(counter.tracked_objects) == 0
+    _run(counter, [(150, 150), (50, 150)])
+    assert counter.line_counts["line"] == {"in": 1, "out": 1, "total": 2}
@@ -0,0 +1,158 @@
+"""
+Assignment solvers checked against brute force on small random cost matrices
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import ops  # noqa: E402
+
+
+@pytest.fixture(params=["numpy", "scipy"])
+def solver(request, monkeypatch):
+    """Run a test on the NumPy fallback and, when it is installed, on scipy."""
+    if request.param == "scipy":
+        if ops._scipy() is None:
+            pytest.skip("scipy not installed")
+    else:
+        monkeypatch.setattr(ops, "_scipy", lambda: None)
+    return request.param
+
+
+def _matchings(pairs, used_rows=frozenset(), used_cols=frozenset()):
+    """All one-to-one matchings (including partial ones) drawn from a list of (row, col) pairs."""
+    yield []
+    for k, (r, c) in enumerate(pairs):
+        if r in used_rows or c in used_cols:
+            continue
+        for rest in _matchings(pairs[k + 1:], used_rows | {r}, used_cols | {c}):
+            yield [(r, c)] + rest
+
+
+def _best(cost, valid):
+    """(Maximum number of pairs, minimum total cost among matchings of that size)."""
+    pairs = list(zip(*np.nonzero(valid)))
+    return max((len(m), -sum(cost[r, c] for r, c in m)) for m in _matchings(pairs))
+
+
+def _cases(seed, count=300):
+    """Small cost matrices: rectangular, gated, all-gated rows and columns, tied integer costs."""
+    rng = np.random.default_rng(seed)
+    for k in range(count):
+        n_rows, n_cols = rng.integers(1, 6, 2)
+        if k % 2:
+            cost = rng.integers(0, 4, (n_rows, n_cols)).astype(np.float64)   # Many ties
+        else:
+            cost = rng.random((n_rows, n_cols)) * 100
+        valid = rng.random((n_rows, n_cols)) < rng.choice([0.3, 0.6, 1.0])
+        if k % 5 == 0:
+            valid[rng.integers(n_rows)] = False
+        if k % 7 == 0:
+            valid[:, rng.integers(n_cols)] = False
+        yield cost, valid
+
+
+def _check_matching(rows, cols, cost, valid):
+    assert len(set(rows.tolist())) == len(rows)
+    assert len(set(cols.tolist())) == len(cols)
+    assert valid[rows, cols].all()
+    assert np.all(np.diff(cost[rows, cols]) >= 0), "pairs not in order of increasing cost"
+
+
+def test_hungarian_matches_brute_force():
+    rng = np.random.default_rng(1)
+    for k in range(300):
+        n_rows, n_cols = rng.integers(1, 6, 2)
+        cost = rng.integers(0, 4, (n_rows, n_cols)).astype(np.float64) if k % 2 else rng.random((n_rows, n_cols))
+        rows, cols = ops._hungarian(cost)
+
+        assert len(rows) == min(n_rows, n_cols)
+        assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+        wide = cost if n_rows <= n_cols else cost.T
+        best = min(
+            wide[np.arange(len(wide)), list(perm)].sum()
+            for perm in itertools.permutations(range(wide.shape[1]), len(wide))
+        )
+        assert cost[rows, cols].sum() == pytest.approx(best)
+
+
+def test_optimal_match_maximizes_pairs_then_minimizes_cost(solver):
+    for cost, valid in _cases(seed=2):
+        rows, cols = ops.optimal_match(cost, valid)
+        _check_matching(rows, cols, cost, valid)
+
+        size, neg_cost = _best(cost, valid)
+        assert len(rows) == size
+        assert cost[rows, cols].sum() == pytest.approx(-neg_cost)
+
+
+def test_optimal_match_pairs_sparse_input(solver):
+    for cost, valid in _cases(seed=3, count=100):
+        rows, cols = np.nonzero(valid)
+        # Shuffled pair lists must give the same optimum
+        shuffle = np.random.default_rng(4).permutation(len(rows))
+        got_rows, got_cols = ops.optimal_match_pairs(
+            rows[shuffle], cols[shuffle], cost[rows, cols][shuffle], *cost.shape
+        )
+        _check_matching(got_rows, got_cols, cost, valid)
+
+        size, neg_cost = _best(cost, valid)
+        assert len(got_rows) == size
+        assert cost[got_rows, got_cols].sum() == pytest.approx(-neg_cost)
+
+
+def test_cardinality_beats_cost(solver):
+    # Taking the cheap pair (0, 0) would leave row 1 unmatched
+    cost = np.array([[0.0, 1.0], [10.0, 100.0]])
+    valid = np.array([[True, True], [True, False]])
+    rows, cols = ops.optimal_match(cost, valid)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 0)]
+
+
+def test_all_gated(solver):
+    rows, cols = ops.optimal_match(np.ones((3, 2)), np.zeros((3, 2), dtype=bool))
+    assert len(rows) == len(cols) == 0
+
+
+def _sorted_greedy(rows, cols, cost):
+    """Take candidate pairs by (cost, row, column) while their row and column are free."""
+    matched, used_rows, used_cols = [], set(), set()
+    for _, r, c in sorted(zip(cost.tolist(), rows.tolist(), cols.tolist())):
+        if r not in used_rows and c not in used_cols:
+            matched.append((r, c))
+            used_rows.add(r)
+            used_cols.add(c)
+    return matched
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.float64])
+def test_greedy_match_pairs_matches_sorted_greedy(dtype):
+    rng = np.random.default_rng(5)
+    for k in range(500):
+        n_rows, n_cols = rng.integers(1, 12, 2)
+        count = rng.integers(0, n_rows * n_cols + 1)
+        cells = rng.choice(n_rows * n_cols, count, replace=False)
+        rows, cols = cells // n_cols, cells % n_cols
+        # A small cost range gives many ties; integer costs take the packed-key sort
+        high = 3 if k % 2 else 1000
+        cost = rng.integers(0, high, count).astype(dtype)
+
+        got_rows, got_cols = ops.greedy_match_pairs(rows, cols, cost, n_rows, n_cols)
+        assert list(zip(got_rows.tolist(), got_cols.tolist())) == _sorted_greedy(rows, cols, cost)
+
+
+def test_greedy_match_dense_ties():
+    cost = np.zeros((3, 3))
+    rows, cols = ops.greedy_match(cost)
+    # All tied: row-major order picks the diagonal
+    assert rows.tolist() == [0, 1, 2] and cols.tolist() == [0, 1, 2]
+
+    valid = np.array([[False, True, True], [True, True, False], [True, False, False]])
+    rows, cols = ops.greedy_match(cost, valid)
+    assert list(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 0)]
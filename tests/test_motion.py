@@ -0,0 +1,28 @@
+"""
+Motion gate regions of interest
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.motion import MotionGate  # noqa: E402
+
+
+@pytest.mark.parametrize("method", ["diff", "mog2"])
+@pytest.mark.parametrize("roi", [(10, 10, 10, 50), (10, 50, 60, 50), (300, 10, 400, 50), (10, 10, 11, 12)])
+def test_degenerate_or_off_frame_roi(method, roi):
+    gate = MotionGate(method=method)
+    gate.reset(roi)
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    assert 0.0 <= gate.motion(frame) <= 1.0
+
+
+def test_empty_roi_tests_whole_frame():
+    gate = MotionGate()
+    gate.reset((10, 10, 10, 50))
+    assert gate.roi is None
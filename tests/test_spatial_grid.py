@@ -0,0 +1,95 @@
+"""
+SpatialGrid candidates checked against an all-pairs distance gate
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.spatial_grid import SpatialGrid  # noqa: E402
+
+
+def _points(rng, count, cell_size):
+    """Integer points around the origin, a third of them exactly on cell boundaries."""
+    points = rng.integers(-5 * cell_size, 5 * cell_size + 1, (count, 2)).astype(np.float64)
+    on_edge = rng.random((count, 2)) < 0.33
+    points[on_edge] = np.round(points[on_edge] / cell_size) * cell_size
+    return points
+
+
+def _pairs(track_ids, point_idx):
+    pairs = list(zip(track_ids.tolist(), point_idx.tolist()))
+    assert len(pairs) == len(set(pairs)), "duplicate candidate pairs"
+    return set(pairs)
+
+
+def _check(grid, tracks, points, classes, cell_size):
+    """Every same-class track within cell_size is a candidate; candidates lie in the 3x3 cells."""
+    found = _pairs(*grid.candidates(points, classes))
+
+    within, neighbours = set(), set()
+    for track_id, (center, class_id) in tracks.items():
+        d = np.hypot(*(points - center).T)
+        cell_gap = np.abs(np.floor(points / cell_size) - np.floor(np.asarray(center) / cell_size)).max(axis=1)
+        same = classes == class_id
+        within |= {(track_id, k) for k in np.flatnonzero(same & (d <= cell_size)).tolist()}
+        neighbours |= {(track_id, k) for k in np.flatnonzero(same & (cell_gap <= 1)).tolist()}
+
+    assert within <= found
+    assert found == neighbours
+
+
+@pytest.mark.parametrize("cell_size", [10, 7.5, 1])
+def test_candidates_cover_distance_gate(cell_size):
+    rng = np.random.default_rng(int(cell_size * 10))
+    for _ in range(50):
+        grid = SpatialGrid(cell_size)
+        centers = _points(rng, rng.integers(0, 40), cell_size)
+        track_classes = rng.integers(0, 3, len(centers))
+        tracks = {}
+        for track_id, (center, class_id) in enumerate(zip(centers, track_classes), start=1):
+            grid.add(track_id, tuple(center), int(class_id))
+            tracks[track_id] = (center, class_id)
+
+        points = _points(rng, rng.integers(0, 40), cell_size)
+        classes = rng.integers(0, 3, len(points))
+        _check(grid, tracks, points, classes, cell_size)
+
+
+def test_candidates_after_moves_and_removals():
+    rng = np.random.default_rng(7)
+    cell_size = 10
+    grid = SpatialGrid(cell_size)
+    tracks = {}
+    for step in range(200):
+        track_id = int(rng.integers(1, 30))
+        center = _points(rng, 1, cell_size)[0]
+        class_id = int(rng.integers(0, 2))
+        action = rng.random()
+        if action < 0.2:
+            grid.remove(track_id)
+            tracks.pop(track_id, None)
+        elif track_id in tracks:
+            grid.move(track_id, tuple(center), class_id)
+            tracks[track_id] = (center, class_id)
+        else:
+            grid.add(track_id, tuple(center), class_id)
+            tracks[track_id] = (center, class_id)
+
+        assert len(grid) == len(tracks)
+        if step % 10 == 0:
+            points = _points(rng, 30, cell_size)
+            _check(grid, tracks, points, rng.integers(0, 2, 30), cell_size)
+
+
+def test_empty():
+    grid = SpatialGrid(10)
+    track_ids, point_idx = grid.candidates(np.zeros((3, 2)), np.zeros(3, dtype=np.int64))
+    assert len(track_ids) == len(point_idx) == 0
+    grid.add(1, (0.0, 0.0))
+    track_ids, point_idx = grid.candidates(np.zeros((0, 2)), np.zeros(0, dtype=np.int64))
+    assert len(track_ids) == len(point_idx) == 0
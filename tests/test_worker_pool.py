@@ -0,0 +1,53 @@
+"""
+DetectorPool recovery: a failing worker task must not leak ring slots or leave results queued
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.detector import ObjectDetector  # noqa: E402
+from src.core.worker_pool import DetectorPool  # noqa: E402
+
+WIDTH, HEIGHT = 1280, 720
+
+
+@pytest.fixture
+def pool(tmp_path):
+    # The model-free blob backend runs in worker processes without an ML framework
+    detector = ObjectDetector("unused.pt", backend="blobs", cache_dir=str(tmp_path))
+    pool = DetectorPool(detector, workers=2, slots_per_worker=4)
+    pool.start(WIDTH, HEIGHT)
+    yield pool
+    pool.shutdown()
+
+
+def _frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 255, (HEIGHT, WIDTH, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def test_worker_error_reclaims_slots(pool):
+    # Two chunks in flight; the first fails at once (a 1x1 frame can't be downscaled)
+    frames = [np.zeros((1, 1, 3), dtype=np.uint8)] + _frames(7)
+    with pytest.raises(RuntimeError, match="Detector worker failed"):
+        pool.detect_batch(frames)
+
+    assert sorted(pool._free_slots) == list(range(pool.slots))
+    assert pool._results.empty()
+
+    # The pool keeps working, with every slot available
+    results = pool.detect_batch(_frames(8, seed=1))
+    assert len(results) == 8
+    assert sorted(pool._free_slots) == list(range(pool.slots))
+
+
+def test_oversized_frame_is_rejected_before_submitting(pool):
+    with pytest.raises(ValueError):
+        pool.detect_batch(_frames(2) + [np.zeros((HEIGHT + 1, WIDTH, 3), dtype=np.uint8)])
+    assert sorted(pool._free_slots) == list(range(pool.slots))
+    assert len(pool.detect_batch(_frames(3))) == 3
@@ -0,0 +1,48 @@
+"""
+Rasterized zone masks checked pixel by pixel against the exact point-in-polygon test
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.drawing_tools import CountingPolygon, DrawingCanvas  # noqa: E402
+from src.core.ops import points_in_polygon  # noqa: E402
+
+WIDTH, HEIGHT = 80, 60
+
+
+def _mismatches(polygons):
+    canvas = DrawingCanvas(WIDTH, HEIGHT)
+    canvas.polygons = [CountingPolygon(f"zone_{j}", [tuple(p) for p in poly]) for j, poly in enumerate(polygons)]
+    mask = canvas.get_zone_mask()
+
+    ys, xs = np.mgrid[:HEIGHT, :WIDTH]
+    pixels = np.stack([xs.ravel(), ys.ravel()], axis=1)
+    bad = []
+    for j, poly in enumerate(polygons):
+        raster = ((mask[..., j // 64] >> np.uint64(j % 64)) & np.uint64(1)).astype(bool)
+        exact = points_in_polygon(pixels, np.asarray(poly)).reshape(HEIGHT, WIDTH)
+        bad.extend((j, int(x), int(y)) for y, x in np.argwhere(raster != exact))
+    return bad
+
+
+def test_off_canvas_polygon_border():
+    # Clipped by the left border: fillPoly filled part of x=0 outside the polygon
+    assert _mismatches([[[52, -18], [43, 30], [-35, 120], [11, -39]]]) == []
+
+
+@pytest.mark.parametrize("margin", [0, 40])
+def test_random_polygons_match_exact_test(margin):
+    rng = np.random.default_rng(margin)
+    for _ in range(20):
+        # Over 64 polygons so the second mask word is used; many are self-intersecting
+        polygons = [
+            rng.integers((-margin, -margin), (WIDTH + margin, HEIGHT + margin), (rng.integers(3, 8), 2)).tolist()
+            for _ in range(70)
+        ]
+        assert _mismatches(polygons) == []